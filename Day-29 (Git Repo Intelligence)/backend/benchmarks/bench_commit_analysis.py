@@ -0,0 +1,66 @@
+"""
+Micro-benchmark for single-pass commit analysis.
+
+Builds synthetic GitHub commit payloads and measures CommitAggregator
+throughput. Run from the backend directory:
+
+    python benchmarks/bench_commit_analysis.py --commits 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.analysis_service import CommitAggregator  # noqa: E402
+
+PREFIXES = ["feat: ", "fix(api): ", "docs: ", "style: ", "refactor!: ", "test: ", "chore: ", "Merge pull request ", "Update "]
+
+
+def synthetic_commits(count: int, authors: int = 200, seed: int = 42):
+    rng = random.Random(seed)
+    commits = []
+    for i in range(count):
+        commits.append({
+            "sha": f"{i:040x}",
+            "commit": {
+                "message": rng.choice(PREFIXES) + "change number %d\n\nLonger body text describing the change." % i,
+                "author": {
+                    "name": f"author-{rng.randrange(authors)}",
+                    "date": "20%02d-%02d-%02dT%02d:%02d:00Z" % (
+                        rng.randrange(15, 25), rng.randrange(1, 13), rng.randrange(1, 29),
+                        rng.randrange(24), rng.randrange(60)
+                    )
+                }
+            }
+        })
+    return commits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commits", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--target", type=float, default=300_000,
+                        help="minimum acceptable throughput in commits per second")
+    args = parser.parse_args()
+
+    commits = synthetic_commits(args.commits)
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        aggregator = CommitAggregator()
+        aggregator.add_many(commits)
+        aggregator.result()
+        best = min(best, time.perf_counter() - start)
+
+    throughput = args.commits / best
+    print(f"{args.commits} commits in {best * 1000:.1f} ms -> {throughput:,.0f} commits/s "
+          f"(target {args.target:,.0f})")
+    sys.exit(0 if throughput >= args.target else 1)
+
+
+if __name__ == "__main__":
+    main()
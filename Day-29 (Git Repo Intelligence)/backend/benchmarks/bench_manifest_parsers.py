@@ -0,0 +1,131 @@
+"""
+Benchmark for the DependencyService lockfile and manifest parsers.
+
+Generates large synthetic package-lock.json, poetry.lock, Cargo.lock,
+go.sum and pom.xml fixtures and reports throughput and peak Python heap
+usage (tracemalloc) for each parser. Run from the backend directory:
+
+    python benchmarks/bench_manifest_parsers.py --packages 50000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.dependency_service import DependencyService  # noqa: E402
+
+
+def package_lock(count: int, rng: random.Random) -> str:
+    packages = {"": {"name": "app", "version": "1.0.0", "dependencies": {"pkg-0": "^1.0.0"}}}
+    for i in range(count):
+        path = f"node_modules/pkg-{i}"
+        if i % 10 == 0 and i:
+            path = f"node_modules/pkg-{i - 1}/node_modules/pkg-{i}"
+        packages[path] = {
+            "version": f"{rng.randrange(10)}.{rng.randrange(20)}.{rng.randrange(50)}",
+            "resolved": f"https://registry.npmjs.org/pkg-{i}/-/pkg-{i}-1.0.0.tgz",
+            "integrity": "sha512-" + "a" * 86 + "==",
+            "dev": i % 3 == 0,
+            "dependencies": {f"pkg-{rng.randrange(count)}": "^1.0.0" for _ in range(rng.randrange(4))}
+        }
+    # v2 lockfiles repeat the tree in the legacy "dependencies" section
+    legacy = {f"pkg-{i}": {"version": "1.0.0"} for i in range(count)}
+    return json.dumps({"name": "app", "lockfileVersion": 2, "packages": packages, "dependencies": legacy}, indent=2)
+
+
+def poetry_lock(count: int, rng: random.Random) -> str:
+    chunks = []
+    for i in range(count):
+        requires = sorted({rng.randrange(count) for _ in range(rng.randrange(4))})
+        deps = "\n".join(f'pkg-{j} = ">=1.0"' for j in requires)
+        chunks.append(
+            f'[[package]]\nname = "pkg-{i}"\nversion = "1.{i % 50}.0"\ndescription = "Package {i}"\n'
+            f'optional = false\npython-versions = ">=3.8"\ngroups = ["{"dev" if i % 3 == 0 else "main"}"]\n'
+            f'files = [\n    {{file = "pkg_{i}-1.0.0-py3-none-any.whl", hash = "sha256:{"b" * 64}"}},\n]\n\n'
+            f'[package.dependencies]\n{deps}\n'
+        )
+    chunks.append('[metadata]\nlock-version = "2.0"\npython-versions = "^3.11"\ncontent-hash = "abc"\n')
+    return "\n".join(chunks)
+
+
+def cargo_lock(count: int, rng: random.Random) -> str:
+    chunks = ["version = 3\n"]
+    for i in range(count):
+        deps = "".join(f' "crate-{rng.randrange(count)}",\n' for _ in range(rng.randrange(4)))
+        chunks.append(
+            f'[[package]]\nname = "crate-{i}"\nversion = "0.{i % 30}.1"\n'
+            f'source = "registry+https://github.com/rust-lang/crates.io-index"\nchecksum = "{"c" * 64}"\n'
+            + (f"dependencies = [\n{deps}]\n" if deps else "")
+        )
+    return "\n".join(chunks)
+
+
+def go_sum(count: int, rng: random.Random) -> str:
+    lines = []
+    for i in range(count):
+        version = f"v1.{rng.randrange(30)}.{rng.randrange(10)}"
+        lines.append(f"github.com/org/module-{i} {version} h1:{'d' * 43}=")
+        lines.append(f"github.com/org/module-{i} {version}/go.mod h1:{'e' * 43}=")
+    return "\n".join(lines) + "\n"
+
+
+def pom_xml(count: int, rng: random.Random) -> str:
+    dependencies = "".join(
+        f"<dependency><groupId>org.example{i % 100}</groupId><artifactId>artifact-{i}</artifactId>"
+        f"<version>${{v{i % 20}}}</version>{'<scope>test</scope>' if i % 4 == 0 else ''}</dependency>\n"
+        for i in range(count)
+    )
+    properties = "".join(f"<v{i}>{i}.0.{rng.randrange(10)}</v{i}>" for i in range(20))
+    return (
+        '<?xml version="1.0"?>\n<project xmlns="http://maven.apache.org/POM/4.0.0">'
+        f"<groupId>org.example</groupId><artifactId>app</artifactId><version>1.0</version>"
+        f"<properties>{properties}</properties><dependencies>\n{dependencies}</dependencies></project>\n"
+    )
+
+
+FIXTURES = {
+    "package-lock.json": package_lock,
+    "poetry.lock": poetry_lock,
+    "Cargo.lock": cargo_lock,
+    "go.sum": go_sum,
+    "pom.xml": pom_xml,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    service = DependencyService()
+    rng = random.Random(42)
+    print(f"{'manifest':<18} {'size':>9} {'best':>9} {'throughput':>12} {'peak heap':>10} {'resolved':>9}")
+    for name, build in FIXTURES.items():
+        content = build(args.packages, rng)
+        analyzer = service.package_files[name]
+
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = analyzer(content)
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        analyzer(content)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size_mb = len(content) / 1e6
+        resolved = len(result["dependencies"]) + len(result.get("dev_dependencies", {}))
+        print(f"{name:<18} {size_mb:>7.1f}MB {best * 1000:>7.0f}ms {size_mb / best:>9.1f}MB/s "
+              f"{peak / 1e6:>8.1f}MB {resolved:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark for response serialization on a large-repository fixture.
+
+Builds /analyze and /tree payloads from synthetic data run through the real
+services, then compares FastAPI's generic path for untyped dicts
+(jsonable_encoder + json.dumps) with the typed path (response model
+validated and dumped to JSON bytes by pydantic-core), plus orjson when
+installed. Also reports gzip / brotli sizes and compression time. Run from
+the backend directory:
+
+    python benchmarks/bench_serialization.py --packages 20000 --files 50000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from benchmarks.bench_manifest_parsers import package_lock  # noqa: E402
+from models.schemas import RepositoryAnalysis, TreePage  # noqa: E402
+from services.analysis_service import AnalysisService  # noqa: E402
+from services.dependency_service import DependencyService  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def tree_entries(count: int, rng: random.Random) -> list:
+    extensions = ["py", "js", "ts", "md", "json", "go", "rs", "yml", "txt", "css"]
+    return [
+        {
+            "path": f"src/module{i % 200}/pkg{i % 37}/file{i}.{rng.choice(extensions)}",
+            "type": "blob",
+            "size": rng.randrange(100, 50_000),
+            "sha": f"{rng.getrandbits(160):040x}"
+        }
+        for i in range(count)
+    ]
+
+
+def commits(count: int, rng: random.Random) -> list:
+    messages = ["fix: crash on start", "feat: add export", "docs: update readme", "refactor cache", "test: cover parser"]
+    return [
+        {"commit": {
+            "message": rng.choice(messages),
+            "author": {"name": f"author{rng.randrange(40)}", "date": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}T10:00:00Z"}
+        }}
+        for _ in range(count)
+    ]
+
+
+def analysis_payload(packages: int, files: int, rng: random.Random) -> dict:
+    """Dict shaped like run_repository_analysis() output for a large repository"""
+    analysis_service = AnalysisService()
+    dependency_service = DependencyService()
+
+    lockfile = dependency_service.package_files["package-lock.json"](package_lock(packages, rng))
+    dependencies = dependency_service.empty_result()
+    dependencies["package_managers"] = ["package-lock.json"]
+    dependencies["dependencies"]["package-lock.json"] = lockfile["dependencies"]
+    dependencies["dev_dependencies"]["package-lock.json"] = lockfile["dev_dependencies"]
+    dependencies["dependency_graph"]["package-lock.json"] = lockfile["graph"]
+    dependencies["resolved_dependencies"] = len(lockfile["dependencies"])
+
+    tree = {"sha": "f" * 40, "tree": tree_entries(files, rng), "truncated": False}
+    return {
+        "repository": {
+            "name": "app", "full_name": "org/app", "description": "Synthetic large repository",
+            "stars": 1000, "forks": 100, "open_issues": 10, "watchers": 1000, "license": "MIT",
+            "default_branch": "main", "created_at": "2020-01-01T00:00:00Z",
+            "updated_at": "2025-01-01T00:00:00Z", "size": 123456, "language": "Python"
+        },
+        "languages": analysis_service.analyze_languages({"Python": 500_000, "JavaScript": 300_000, "Go": 10_000}),
+        "commits": analysis_service.analyze_commits(commits(5000, rng)),
+        "dependencies": dependencies,
+        "file_structure": analysis_service.analyze_file_structure(tree),
+        "readme_analysis": analysis_service.analyze_readme("# App\n\nInstall with pip.\n\n```\npip install app\n```\n"),
+        "failed_sources": []
+    }, tree
+
+
+def best_of(repeat: int, function) -> tuple:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=20_000)
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--page", type=int, default=10_000, help="/tree page size (the endpoint allows up to 10000)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    analysis, tree = analysis_payload(args.packages, args.files, rng)
+    tree_page = {
+        "repository": "org/app", "sha": tree["sha"], "next_cursor": None,
+        "tree": [{key: entry[key] for key in ("path", "type", "size", "sha")} for entry in tree["tree"][:args.page]]
+    }
+
+    print(f"{'payload':<10} {'method':<34} {'time':>9} {'size':>9}")
+    for name, payload, model in (("analyze", analysis, RepositoryAnalysis), ("tree", tree_page, TreePage)):
+        adapter = TypeAdapter(model)
+        methods = {
+            "untyped (jsonable_encoder + json)": lambda: json.dumps(
+                jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+            ).encode(),
+            "typed (validate + dump_json)": lambda: adapter.dump_json(adapter.validate_python(payload)),
+        }
+        if orjson is not None:
+            methods["orjson (untyped)"] = lambda: orjson.dumps(payload)
+
+        body = None
+        for method, function in methods.items():
+            elapsed, body = best_of(args.repeat, function)
+            print(f"{name:<10} {method:<34} {elapsed * 1000:>7.1f}ms {len(body) / 1e6:>7.2f}MB")
+
+        elapsed, compressed = best_of(args.repeat, lambda: gzip.compress(body, compresslevel=6))
+        print(f"{name:<10} {'gzip level 6':<34} {elapsed * 1000:>7.1f}ms {len(compressed) / 1e6:>7.2f}MB")
+        if brotli is not None:
+            elapsed, compressed = best_of(args.repeat, lambda: brotli.compress(body, quality=4))
+            print(f"{name:<10} {'brotli quality 4':<34} {elapsed * 1000:>7.1f}ms {len(compressed) / 1e6:>7.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,78 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from typing import Dict, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from contextlib import asynccontextmanager
+import base64
+import fnmatch
+import json
 import os
+import re
 from dotenv import load_dotenv
 
-from services.github_service import GitHubService
+from services.repository_source import create_repository_source
 from services.analysis_service import AnalysisService
 from services.dependency_service import DependencyService
+from services.execution_plan import ExecutionPlan
+from services.commit_index import CommitIndex
+from services.commit_table import CommitTable, INTERVALS
+from services.code_metrics import CodeMetricsEngine
+from services.batch_jobs import batch_queue_from_env
+from services.result_cache import result_cache_from_env
+from services.tree_index import TreeListing, TreeListingCache
+from models.schemas import (
+    BatchAnalysisRequest,
+    CodeQualityResponse,
+    CommitAnalysisResponse,
+    ContributorsResponse,
+    DependencyAnalysisResponse,
+    FileContent,
+    RepositoryAnalysis,
+    TreePage,
+)
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 load_dotenv()
 
+# Upper bound on concurrent upstream calls made by a single /analyze request
+ANALYZE_CONCURRENCY = int(os.getenv('ANALYZE_CONCURRENCY', 6))
+
+# Initialize services
+# REST API client, or a local bare-clone source when REPO_SOURCE=local
+github_service = create_repository_source()
+analysis_service = AnalysisService()
+dependency_service = DependencyService()
+commit_index = CommitIndex(os.getenv('COMMIT_INDEX_PATH', '.cache/commit_index.sqlite'))
+code_metrics_engine = CodeMetricsEngine()
+batch_queue = batch_queue_from_env()
+# Endpoint results keyed by repository head SHA (None when disabled)
+result_cache = result_cache_from_env()
+# Flattened /tree walks, so later pages resume without listing the tree again
+tree_listings = TreeListingCache()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared GitHub connection pool and release worker processes on shutdown"""
+    await github_service.start()
+    await batch_queue.start(cached_repository_analysis)
+    yield
+    await batch_queue.close()
+    await github_service.close()
+    commit_index.close()
+    code_metrics_engine.close()
+    if result_cache:
+        result_cache.close()
+
 app = FastAPI(
     title="Git Repository Intelligence Hub",
     description="AI-powered repository analysis",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 app.add_middleware(
     CORSMiddleware,
@@ -23,17 +82,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-github_service = GitHubService()
-analysis_service = AnalysisService()
-dependency_service = DependencyService()
+class SelectiveCompression:
+    """
+    Compression middleware that leaves some requests alone: Range requests
+    (Content-Range offsets count uncompressed bytes) and NDJSON streams
+    (the compressor would buffer lines that should reach the client now)
+    """
+
+    def __init__(self, app, compressor, **options):
+        self.app = app
+        self.compressed = compressor(app, **options)
+
+    @staticmethod
+    def compressible(scope) -> bool:
+        if any(name == b"range" for name, _ in scope["headers"]):
+            return False
+        if b"format=ndjson" in scope.get("query_string", b""):
+            return False
+        return not (scope["path"].startswith("/analyze/batch/") and scope["path"].endswith("/results"))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.compressible(scope):
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed(scope, receive, send)
+
+# Compress large responses (trees, commit and dependency payloads).
+# RESPONSE_COMPRESSION=brotli needs brotli-asgi and falls back to gzip for
+# clients that do not accept br.
+RESPONSE_COMPRESSION = os.getenv('RESPONSE_COMPRESSION', 'gzip').lower()
+COMPRESSION_MIN_SIZE = int(os.getenv('RESPONSE_COMPRESSION_MIN_SIZE', 1024))
+if RESPONSE_COMPRESSION == 'brotli' and BrotliMiddleware is not None:
+    app.add_middleware(SelectiveCompression, compressor=BrotliMiddleware,
+                       quality=int(os.getenv('RESPONSE_BROTLI_QUALITY', 4)),
+                       minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+elif RESPONSE_COMPRESSION in ('gzip', 'brotli'):
+    app.add_middleware(SelectiveCompression, compressor=GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE,
+                       compresslevel=int(os.getenv('RESPONSE_GZIP_LEVEL', 6)))
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "Git Repository Intelligence Hub is running!"}
 
-@app.get("/analyze/{owner}/{repo}")
+@app.get("/stats")
+async def service_stats():
+    """Runtime statistics for the GitHub connection pool, rate limit scheduler and caches"""
+    return {
+        "http_pool": github_service.pool_stats(),
+        "http_cache": github_service.cache.stats() if github_service.cache else None,
+        "blob_store": github_service.blobs.stats() if github_service.blobs else None,
+        "rate_limit": github_service.scheduler.stats() if github_service.scheduler else None,
+        "graphql_batching": github_service.repository_batcher.stats() if github_service.use_graphql else None,
+        "tree_index_cache": analysis_service.tree_indexes.stats(),
+        "tree_listing_cache": tree_listings.stats(),
+        "advisory_index": dependency_service.advisories.stats() if dependency_service.advisories else None,
+        "result_cache": result_cache.stats() if result_cache else None,
+        "batch_queue": batch_queue.stats()
+    }
+
+@app.get("/analyze/{owner}/{repo}", response_model=RepositoryAnalysis)
 async def analyze_repository(owner: str, repo: str) -> Dict:
     """
     Comprehensive repository analysis including:
@@ -44,92 +152,266 @@ async def analyze_repository(owner: str, repo: str) -> Dict:
     - Code structure and README analysis
     """
     try:
-        # Fetch basic repository data
-        repo_data = await github_service.get_repository(owner, repo)
-        languages = await github_service.get_languages(owner, repo)
-        commits = await github_service.get_commits(owner, repo, per_page=100)
-        readme = await github_service.get_readme(owner, repo)
-        tree = await github_service.get_tree(owner, repo)
-        
-        # Perform analysis
-        language_analysis = analysis_service.analyze_languages(languages)
-        commit_analysis = analysis_service.analyze_commits(commits)
-        readme_analysis = analysis_service.analyze_readme(readme)
-        structure_analysis = analysis_service.analyze_file_structure(tree)
-        dependency_analysis = await dependency_service.analyze_dependencies(
-            github_service, owner, repo
-        )
-
-        return {
-            "repository": {
-                "name": repo_data.get('name'),
-                "full_name": repo_data.get('full_name'),
-                "description": repo_data.get('description'),
-                "stars": repo_data.get('stargazers_count', 0),
-                "forks": repo_data.get('forks_count', 0),
-                "open_issues": repo_data.get('open_issues_count', 0),
-                "watchers": repo_data.get('watchers_count', 0),
-                "license": repo_data.get('license', {}).get('name') if repo_data.get('license') else None,
-                "default_branch": repo_data.get('default_branch'),
-                "created_at": repo_data.get('created_at'),
-                "updated_at": repo_data.get('updated_at'),
-                "size": repo_data.get('size', 0),
-                "language": repo_data.get('language')
-            },
-            "languages": language_analysis,
-            "commits": commit_analysis,
-            "dependencies": dependency_analysis,
-            "file_structure": structure_analysis,
-            "readme_analysis": readme_analysis
-        }
-        
+        return await cached_repository_analysis(owner, repo)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-@app.get("/commit-analysis/{owner}/{repo}")
-async def detailed_commit_analysis(owner: str, repo: str, limit: int = 200):
+async def cached_response(endpoint: str, owner: str, repo: str, params: Optional[Dict], compute, cacheable=None):
     """
-    Detailed commit analysis with categorization and patterns
+    Serve `compute()` through the result cache. A cheap head SHA lookup
+    decides staleness; repositories without a head are never cached.
     """
-    try:
-        commits = await github_service.get_commits(owner, repo, per_page=limit)
-        analysis = analysis_service.analyze_commits(commits)
-        
+    if result_cache is None:
+        return await compute()
+    head_sha = await github_service.get_head_sha(owner, repo)
+    if head_sha is None:
+        return await compute()
+    key = result_cache.make_key(endpoint, owner, repo, head_sha, params)
+    return await result_cache.get_or_compute(key, compute, cacheable)
+
+def advisory_params() -> Optional[Dict]:
+    """Advisory index version for keys of results that include a dependency audit"""
+    if dependency_service.advisories is None:
+        return None
+    return {"advisories": dependency_service.advisories.version()}
+
+async def cached_repository_analysis(owner: str, repo: str) -> Dict:
+    """Full analysis through the result cache; partial results are not stored"""
+    return await cached_response(
+        "analyze", owner, repo, advisory_params(),
+        lambda: run_repository_analysis(owner, repo),
+        cacheable=lambda result: not result["failed_sources"]
+    )
+
+async def run_repository_analysis(owner: str, repo: str) -> Dict:
+    """Full repository analysis shared by /analyze and batch jobs"""
+    # Independent fetches run concurrently; the analysis steps only wait
+    # for the sources they need. README and dependency failures are not
+    # fatal and are reported in "failed_sources".
+    plan = ExecutionPlan(max_concurrency=ANALYZE_CONCURRENCY)
+    if github_service.use_graphql:
+        # One GraphQL query covers repository info, languages, commits and README
+        plan.add("bundle", lambda: github_service.get_repository_bundle(owner, repo))
+    else:
+        plan.add("repo_data", lambda: github_service.get_repository(owner, repo))
+        plan.add("languages", lambda: github_service.get_languages(owner, repo), critical=False, default={})
+        plan.add("commits", lambda: github_service.get_commits(owner, repo, per_page=100), critical=False, default=[])
+        plan.add("readme", lambda: github_service.get_readme(owner, repo), critical=False)
+    plan.add("tree", lambda: github_service.get_tree(owner, repo), critical=False, default={})
+    plan.add(
+        "dependency_analysis",
+        lambda tree: dependency_service.analyze_dependencies(github_service, owner, repo, tree=tree),
+        depends_on=["tree"],
+        critical=False,
+        default=dependency_service.empty_result()
+    )
+    result = await plan.run()
+
+    sources = result["bundle"] if github_service.use_graphql else {
+        "repository": result["repo_data"],
+        "languages": result["languages"],
+        "commits": result["commits"],
+        "readme": result["readme"]
+    }
+
+    # Perform analysis
+    repo_data = sources["repository"]
+    language_analysis = analysis_service.analyze_languages(sources["languages"])
+    commit_analysis = analysis_service.analyze_commits(sources["commits"])
+    readme_analysis = analysis_service.analyze_readme(sources["readme"])
+    structure_analysis = analysis_service.analyze_file_structure(result["tree"])
+    dependency_analysis = result["dependency_analysis"]
+
+    return {
+        "repository": {
+            "name": repo_data.get('name'),
+            "full_name": repo_data.get('full_name'),
+            "description": repo_data.get('description'),
+            "stars": repo_data.get('stargazers_count', 0),
+            "forks": repo_data.get('forks_count', 0),
+            "open_issues": repo_data.get('open_issues_count', 0),
+            "watchers": repo_data.get('watchers_count', 0),
+            "license": repo_data.get('license', {}).get('name') if repo_data.get('license') else None,
+            "default_branch": repo_data.get('default_branch'),
+            "created_at": repo_data.get('created_at'),
+            "updated_at": repo_data.get('updated_at'),
+            "size": repo_data.get('size', 0),
+            "language": repo_data.get('language')
+        },
+        "languages": language_analysis,
+        "commits": commit_analysis,
+        "dependencies": dependency_analysis,
+        "file_structure": structure_analysis,
+        "readme_analysis": readme_analysis,
+        "failed_sources": result.failed_sources
+    }
+
+@app.post("/analyze/batch")
+async def submit_batch_analysis(request: BatchAnalysisRequest):
+    """
+    Queue a full analysis of many `owner/repo` repositories. Returns a job
+    ID; poll /analyze/batch/{job_id}/status and stream finished results
+    from /analyze/batch/{job_id}/results.
+    """
+    invalid = [name for name in request.repositories if name.count('/') != 1 or not all(name.split('/'))]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Expected owner/repo names, got: {', '.join(invalid[:5])}")
+    if not request.repositories:
+        raise HTTPException(status_code=400, detail="No repositories given")
+    return await batch_queue.submit(request.repositories)
+
+@app.get("/analyze/batch/{job_id}/status")
+async def batch_analysis_status(job_id: str):
+    """Progress of a batch analysis job"""
+    progress = await batch_queue.progress(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return progress
+
+@app.get("/analyze/batch/{job_id}/results")
+async def batch_analysis_results(job_id: str, after: int = 0):
+    """
+    NDJSON stream of finished repositories in completion order; stays open
+    until the job completes. Pass the last `sequence` seen as `after` to resume.
+    """
+    if await batch_queue.progress(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def stream():
+        async for item in batch_queue.results(job_id, after):
+            yield json.dumps(item) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/commit-analysis/{owner}/{repo}", response_model=CommitAnalysisResponse)
+async def detailed_commit_analysis(owner: str, repo: str, limit: int = 200, incremental: bool = False):
+    """
+    Detailed commit analysis with categorization and patterns.
+    With incremental=true the full history is analyzed through the persistent
+    commit index, which only fetches commits added since the last refresh.
+    """
+    async def compute():
+        if incremental:
+            analysis = await commit_index.refresh(github_service, owner, repo)
+        else:
+            # Pages are fetched concurrently and folded into the analysis as they arrive
+            pages = github_service.iter_commits(owner, repo, limit=limit)
+            analysis = await analysis_service.analyze_commit_pages(pages)
+
         return {
             "repository": f"{owner}/{repo}",
             "analysis_date": "2025-08-28",
             "commit_analysis": analysis
         }
+
+    try:
+        return await cached_response(
+            "commit-analysis", owner, repo, {"limit": limit, "incremental": incremental}, compute
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Commit analysis failed: {str(e)}")
 
-@app.get("/dependencies/{owner}/{repo}")
+async def load_commit_table(owner: str, repo: str, limit: int) -> CommitTable:
+    """Fetch up to `limit` commits straight into a columnar table"""
+    pages = github_service.iter_commits(owner, repo, limit=limit)
+    return await CommitTable.from_pages(pages, analysis_service.classifier)
+
+def check_interval(interval: str) -> None:
+    if interval not in INTERVALS:
+        raise HTTPException(status_code=400, detail=f"interval must be one of: {', '.join(INTERVALS)}")
+
+@app.get("/commit-timeseries/{owner}/{repo}")
+async def commit_timeseries(owner: str, repo: str, interval: str = "week", window: int = Query(4, ge=1),
+                            limit: int = Query(1000, ge=1, le=10000)):
+    """
+    Commits per hour/day/week/month with a rolling activity window,
+    plus hour-of-day and day-of-week histograms
+    """
+    check_interval(interval)
+    try:
+        table = await load_commit_table(owner, repo, limit)
+        return {
+            "repository": f"{owner}/{repo}",
+            "total_commits": len(table),
+            "activity": table.activity(interval, window)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Commit time series failed: {str(e)}")
+
+@app.get("/bus-factor/{owner}/{repo}")
+async def bus_factor(owner: str, repo: str, threshold: float = 0.5, limit: int = Query(1000, ge=1, le=10000)):
+    """Smallest set of authors responsible for `threshold` of the commits"""
+    try:
+        table = await load_commit_table(owner, repo, limit)
+        return {
+            "repository": f"{owner}/{repo}",
+            "total_commits": len(table),
+            **table.bus_factor(threshold)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bus factor analysis failed: {str(e)}")
+
+@app.get("/author-churn/{owner}/{repo}")
+async def author_churn(owner: str, repo: str, interval: str = "month", inactive_days: int = 90,
+                       limit: int = Query(1000, ge=1, le=10000)):
+    """New, active and churned authors per period"""
+    check_interval(interval)
+    try:
+        table = await load_commit_table(owner, repo, limit)
+        return {
+            "repository": f"{owner}/{repo}",
+            "total_commits": len(table),
+            "author_churn": table.author_churn(interval, inactive_days)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Author churn analysis failed: {str(e)}")
+
+@app.get("/dependencies/{owner}/{repo}", response_model=DependencyAnalysisResponse)
 async def repository_dependencies(owner: str, repo: str):
     """
     Analyze repository dependencies across different package managers
     """
-    try:
+    async def compute():
         dependencies = await dependency_service.analyze_dependencies(
             github_service, owner, repo
         )
-        
+
         return {
             "repository": f"{owner}/{repo}",
             "dependency_analysis": dependencies
         }
+
+    try:
+        # Re-importing advisories changes the key, so audits are redone
+        return await cached_response("dependencies", owner, repo, advisory_params(), compute)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dependency analysis failed: {str(e)}")
 
-@app.get("/code-quality/{owner}/{repo}")
-async def code_quality_analysis(owner: str, repo: str):
+@app.get("/code-quality/{owner}/{repo}", response_model=CodeQualityResponse)
+async def code_quality_analysis(owner: str, repo: str, scan: bool = False):
     """
-    Basic code quality metrics and file analysis
+    Code quality metrics and file analysis. With scan=true source files are
+    also scanned for line counts, complexity and duplication; that fetches
+    up to CODE_METRICS_MAX_FILES blobs, so it is opt-in.
     """
-    try:
+    async def compute():
         tree = await github_service.get_tree(owner, repo)
         structure = analysis_service.analyze_file_structure(tree)
+        code_metrics = await code_metrics_engine.analyze(github_service, owner, repo, tree) if scan else None
         
         # Basic quality metrics based on file structure
         quality_score = 0
@@ -159,62 +441,232 @@ async def code_quality_analysis(owner: str, repo: str):
                 "overall_score": min(quality_score, 100),
                 "file_diversity": len(structure['file_types']),
                 "organization_score": min(structure['file_count'] / 50, 1) * 100
-            }
+            },
+            "code_metrics": code_metrics
         }
-        
+
+    try:
+        return await cached_response("code-quality", owner, repo, {"scan": scan}, compute)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code quality analysis failed: {str(e)}")
 
-@app.get("/contributors/{owner}/{repo}")
+@app.get("/structure/{owner}/{repo}")
+async def repository_structure(owner: str, repo: str, path: str = "", top: int = Query(10, ge=1, le=100)):
+    """
+    Directory-level structure statistics: file counts, per-extension sizes,
+    depth histogram and the largest directories under `path`
+    """
+    try:
+        tree = await github_service.get_tree(owner, repo)
+        index = analysis_service.tree_index(tree)
+        directory = index.directory(path)
+        if directory is None:
+            raise HTTPException(status_code=404, detail=f"Directory not found: {path}")
+
+        return {
+            "repository": f"{owner}/{repo}",
+            "sha": index.sha,
+            "truncated": bool(tree.get('truncated')),
+            "directory": directory,
+            "extensions": index.extensions(path),
+            "depth_histogram": index.depth_histogram(path),
+            "largest_directories": index.largest_directories(top, path)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Structure analysis failed: {str(e)}")
+
+@app.get("/contributors/{owner}/{repo}", response_model=ContributorsResponse)
 async def repository_contributors(owner: str, repo: str):
     """
     Analyze repository contributors and their contributions
     """
-    try:
+    async def compute():
         contributors = await github_service.get_contributors(owner, repo)
-        
+
         return {
             "repository": f"{owner}/{repo}",
             "total_contributors": len(contributors),
             "contributors": contributors[:20]  # Top 20 contributors
         }
+
+    try:
+        return await cached_response("contributors", owner, repo, None, compute)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Contributors analysis failed: {str(e)}")
     
-@app.get("/tree/{owner}/{repo}")
-async def get_repository_tree(owner: str, repo: str):
+TREE_SHA_PATTERN = re.compile(r"[0-9a-fA-F]{40}")
+
+def encode_cursor(sha: str, path: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"sha": sha, "after": path}).encode()).decode()
+
+def decode_cursor(cursor: str) -> Dict:
+    """Cursor fields; the tree SHA goes into upstream URLs and git commands, so it must be a full SHA"""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = {"sha": str(data["sha"]), "after": str(data["after"])}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not TREE_SHA_PATTERN.fullmatch(position["sha"]):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+async def tree_listing(owner: str, repo: str, tree_sha: str, prefix: str) -> TreeListing:
+    """Every entry under `prefix` of a (immutable) tree, walked once and cached"""
+    key = (owner.lower(), repo.lower(), tree_sha, prefix)
+    listing = tree_listings.get(key)
+    if listing is None:
+        entries = [
+            (item['path'], item['type'], item.get('size'), item.get('sha'))
+            async for item in github_service.walk_tree(owner, repo, tree_sha, prefix)
+        ]
+        listing = tree_listings.put(key, TreeListing(entries))
+    return listing
+
+@app.get("/tree/{owner}/{repo}", response_model=TreePage)
+async def get_repository_tree(
+    owner: str,
+    repo: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    prefix: str = "",
+    glob: Optional[str] = None,
+    entry_type: Optional[str] = Query(None, alias="type", pattern="^(blob|tree|commit)$"),
+    format: str = Query("json", pattern="^(json|ndjson)$")
+):
     """
-    Get repository file tree structure
+    Get repository file tree structure.
+
+    Entries can be filtered by path prefix, glob (matched against the full
+    path) and type. JSON responses are paginated (default 500 entries) and
+    return a `next_cursor`; format=ndjson streams every matching entry, one
+    JSON object per line, unless a limit is given. The first page walks the
+    tree only as far as it needs; resuming from a cursor lists the tree once
+    and caches that listing per tree SHA for the pages after it.
     """
     try:
-        tree = await github_service.get_tree(owner, repo)
-        
-        if 'tree' in tree:
-            # Format tree data for frontend
-            formatted_tree = []
-            for item in tree['tree']:
-                formatted_tree.append({
-                    'path': item['path'],
-                    'type': item['type'],
-                    'size': item.get('size')
-                })
-            
-            return {
-                "repository": f"{owner}/{repo}",
-                "tree": formatted_tree[:500]  # Limit to 500 items for performance
-            }
+        position = decode_cursor(cursor) if cursor else None
+        # Pin the walk to a tree SHA so later pages see the same snapshot
+        if position:
+            tree_sha = position["sha"]
         else:
-            return {"repository": f"{owner}/{repo}", "tree": []}
-            
+            root = await github_service.get_tree(owner, repo, recursive=False)
+            if 'sha' not in root:
+                return {"repository": f"{owner}/{repo}", "tree": [], "next_cursor": None}
+            tree_sha = root['sha']
+
+        # A first page or NDJSON stream walks the tree lazily and stops at the
+        # limit; only resuming from a cursor goes through a cached listing
+        listing = None
+        start = 0
+        if position:
+            listing = await tree_listing(owner, repo, tree_sha, prefix)
+            start = listing.after(position["after"])
+            if start is None:
+                raise HTTPException(status_code=400, detail="Stale cursor: its entry is not in this listing")
+
+        async def walk():
+            if listing is not None:
+                for index in range(start, len(listing.entries)):
+                    yield listing.entries[index]
+            else:
+                async for item in github_service.walk_tree(owner, repo, tree_sha, prefix):
+                    yield item['path'], item['type'], item.get('size'), item.get('sha')
+
+        async def entries():
+            async for path, kind, size, sha in walk():
+                if entry_type and kind != entry_type:
+                    continue
+                if glob and not fnmatch.fnmatchcase(path, glob):
+                    continue
+                yield {'path': path, 'type': kind, 'size': size, 'sha': sha}
+
+        if format == "ndjson":
+            async def stream():
+                count = 0
+                async for entry in entries():
+                    if limit and count >= limit:
+                        break
+                    count += 1
+                    yield json.dumps(entry) + "\n"
+
+            return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+        page_size = limit or 500
+        formatted_tree = []
+        next_cursor = None
+        async for entry in entries():
+            if len(formatted_tree) == page_size:
+                next_cursor = encode_cursor(tree_sha, formatted_tree[-1]['path'])
+                break
+            formatted_tree.append(entry)
+
+        return {
+            "repository": f"{owner}/{repo}",
+            "sha": tree_sha,
+            "tree": formatted_tree,
+            "next_cursor": next_cursor
+        }
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tree: {str(e)}")
 
 
-@app.get("/file-content/{owner}/{repo}")
-async def get_file_content(owner: str, repo: str, path: str):
-    """Get specific file content from repository"""
+def parse_range(header: str, size: int) -> Optional[tuple]:
+    """Parse a single `bytes=` range into inclusive (start, end); None if unsatisfiable"""
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
     try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+@app.get("/file-content/{owner}/{repo}", response_model=FileContent)
+async def get_file_content(owner: str, repo: str, path: str, range_header: Optional[str] = Header(None, alias="Range")):
+    """Get specific file content from repository; a `Range: bytes=...` header returns raw bytes"""
+    try:
+        if range_header:
+            blob = await github_service.open_file_blob(owner, repo, path)
+            if blob is None:
+                raise HTTPException(status_code=404, detail="File not found")
+            sha, buffer = blob
+            try:
+                size = len(buffer)
+                headers = {"Accept-Ranges": "bytes", "ETag": f'"{sha}"'}
+                byte_range = parse_range(range_header, size)
+                if byte_range is None:
+                    return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+                start, end = byte_range
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                return Response(content=bytes(buffer[start:end + 1]), status_code=206,
+                                media_type="application/octet-stream", headers=headers)
+            finally:
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+
         content = await github_service.get_file_content(owner, repo, path)
         if content:
             return {
@@ -225,6 +677,8 @@ async def get_file_content(owner: str, repo: str, path: str):
             }
         else:
             raise HTTPException(status_code=404, detail="File not found")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch file content: {str(e)}")
 
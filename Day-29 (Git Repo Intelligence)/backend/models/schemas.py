@@ -1,25 +1,24 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
 class RepositoryInfo(BaseModel):
-    name: str
-    full_name: str
+    name: Optional[str]
+    full_name: Optional[str]
     description: Optional[str]
     stars: int
     forks: int
     open_issues: int
     watchers: int
     license: Optional[str]
-    default_branch: str
-    created_at: str
-    updated_at: str
+    default_branch: Optional[str]
+    created_at: Optional[str]
+    updated_at: Optional[str]
     size: int
     language: Optional[str]
 
 class CommitAuthor(BaseModel):
-    name: str
-    email: str
+    name: Optional[str]
     commit_count: int
 
 class CommitAnalysis(BaseModel):
@@ -28,17 +27,57 @@ class CommitAnalysis(BaseModel):
     top_authors: List[CommitAuthor]
     commit_frequency: Dict[str, int]
     avg_commits_per_day: float
+    # Set by the incremental commit index (/commit-analysis?incremental=true)
+    indexed_head: Optional[str] = None
+    new_commits: Optional[int] = None
 
 class LanguageStats(BaseModel):
     languages: Dict[str, int]
     primary_language: str
     language_percentage: Dict[str, float]
 
+class OutdatedDependency(BaseModel):
+    manifest: str
+    package: str
+    current: str
+    latest: str
+
+class Vulnerability(BaseModel):
+    manifest: str
+    ecosystem: str
+    package: str
+    version: str
+    exact_version: bool
+    advisory: str
+    fixed_in: Optional[str]
+    summary: Optional[str]
+    severity: Optional[str]
+    aliases: List[str]
+
 class DependencyInfo(BaseModel):
     package_managers: List[str]
     total_dependencies: int
-    dependencies: Dict[str, List[str]]
-    outdated_dependencies: List[str]
+    resolved_dependencies: int
+    # Manifest path -> package -> requirement (manifests may use tables, e.g. Pipfile)
+    dependencies: Dict[str, Dict[str, Any]]
+    dev_dependencies: Dict[str, Dict[str, Any]]
+    dependency_graph: Dict[str, Dict[str, List[str]]]
+    outdated_dependencies: List[OutdatedDependency]
+    vulnerabilities: List[Vulnerability]
+
+class FileStructure(BaseModel):
+    file_count: int
+    directory_count: int
+    file_types: Dict[str, int]
+    total_size: int = 0
+
+class ReadmeAnalysis(BaseModel):
+    length: int
+    line_count: int
+    header_count: int
+    sections: Dict[str, bool]
+    has_code_blocks: bool
+    word_count: int
 
 class CodeQualityMetrics(BaseModel):
     file_count: int
@@ -47,12 +86,70 @@ class CodeQualityMetrics(BaseModel):
     comment_lines: int
     blank_lines: int
     complexity_score: float
+    max_complexity: int
     duplication_percentage: float
+    languages: Dict[str, Dict[str, int]]
+    files_from_cache: int
+    files_skipped: int
+
+class QualityScores(BaseModel):
+    overall_score: float
+    file_diversity: int
+    organization_score: float
 
 class RepositoryAnalysis(BaseModel):
     repository: RepositoryInfo
     languages: LanguageStats
     commits: CommitAnalysis
     dependencies: DependencyInfo
-    code_quality: CodeQualityMetrics
-    readme_analysis: Optional[Dict[str, Any]]
+    file_structure: FileStructure
+    readme_analysis: Optional[ReadmeAnalysis]
+    failed_sources: List[str]
+
+class CommitAnalysisResponse(BaseModel):
+    repository: str
+    analysis_date: str
+    commit_analysis: CommitAnalysis
+
+class DependencyAnalysisResponse(BaseModel):
+    repository: str
+    dependency_analysis: DependencyInfo
+
+class CodeQualityResponse(BaseModel):
+    repository: str
+    file_structure: FileStructure
+    quality_metrics: QualityScores
+    code_metrics: Optional[CodeQualityMetrics]
+
+class Contributor(BaseModel):
+    # GitHub returns the full user object; everything beyond these is passed through
+    model_config = ConfigDict(extra="allow")
+
+    login: Optional[str] = None
+    contributions: int
+
+class ContributorsResponse(BaseModel):
+    repository: str
+    total_contributors: int
+    contributors: List[Contributor]
+
+class TreeEntry(BaseModel):
+    path: str
+    type: str
+    size: Optional[int]
+    sha: Optional[str]
+
+class TreePage(BaseModel):
+    repository: str
+    sha: Optional[str] = None
+    tree: List[TreeEntry]
+    next_cursor: Optional[str]
+
+class FileContent(BaseModel):
+    repository: str
+    path: str
+    content: str
+    size: int
+
+class BatchAnalysisRequest(BaseModel):
+    repositories: List[str]
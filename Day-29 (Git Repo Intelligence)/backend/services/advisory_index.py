@@ -0,0 +1,445 @@
+"""
+Offline advisory and latest-version index for dependency checks.
+
+The index is a read-only SQLite file (opened memory-mapped) built from an
+OSV-style dump by the import command:
+
+    python -m services.advisory_index import osv-dump.zip [--db .cache/advisories.sqlite]
+
+The dump may be a .zip (like the osv.dev ecosystem exports), a directory,
+a .json file (one record or a list) or a .jsonl file. Records with an
+"affected" list are OSV advisories; records of the form
+{"ecosystem": ..., "name": ..., "latest_version": ...} feed the
+latest-version table. An import writes a new file and swaps it in
+atomically, and running services pick it up on their next check.
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Manifest file name -> OSV ecosystem
+MANIFEST_ECOSYSTEMS = {
+    "package.json": "npm",
+    "package-lock.json": "npm",
+    "requirements.txt": "PyPI",
+    "Pipfile": "PyPI",
+    "poetry.lock": "PyPI",
+    "pom.xml": "Maven",
+    "build.gradle": "Maven",
+    "build.gradle.kts": "Maven",
+    "Gemfile": "RubyGems",
+    "composer.json": "Packagist",
+    "go.mod": "Go",
+    "go.sum": "Go",
+    "Cargo.lock": "crates.io",
+}
+
+_VERSION_TOKEN = re.compile(r"\d+(?:\.\d+)*(?:[-.+]?[A-Za-z][\w.]*)?")
+_SEGMENT = re.compile(r"\d+|[A-Za-z]+")
+# One "<operator> <version>" constraint of a requirement
+_CONSTRAINT = re.compile(r"(~>|===|==|>=|<=|~=|!=|\^|~|=|>|<)?\s*[vV]?(" + _VERSION_TOKEN.pattern + ")")
+# Operators whose version is the lowest the requirement allows ("" is a bare version)
+_LOWER_BOUND = {"", "==", "===", "=", ">=", "^", "~", "~=", "~>"}
+_EXACT = {"", "==", "===", "="}
+_WILDCARD = re.compile(r"(?:\.[xX])+$")
+# Pre-release labels sort below the release; anything else (e.g. "post") above it
+_PRERELEASE = {
+    "dev": -4, "snapshot": -4, "a": -3, "alpha": -3, "b": -2, "beta": -2, "pre": -2, "m": -2,
+    "c": -1, "rc": -1, "cr": -1, "final": 0, "ga": 0, "release": 0,
+}
+
+
+@lru_cache(maxsize=65536)
+def version_key(version: str) -> tuple:
+    """
+    Sortable key for a version string that works across ecosystems
+    (SemVer, PEP 440, Maven, Go): numeric release segments compare
+    numerically, and pre-release labels sort before the plain release.
+    """
+    version = version.strip().lstrip("vV=")
+    release, _, suffix = version.partition("+")[0].partition("-")
+    numbers = []
+    labels = []
+    for segment in _SEGMENT.findall(release):
+        if segment.isdigit() and not labels:
+            numbers.append(int(segment))
+        else:
+            labels.append(segment)
+    while len(numbers) > 1 and numbers[-1] == 0:
+        numbers.pop()
+    labels += _SEGMENT.findall(suffix)
+
+    tail = []
+    for label in labels:
+        if label.isdigit():
+            tail.append((0, int(label)))
+        else:
+            tail.append((_PRERELEASE.get(label.lower(), 1), 0))
+    # A release without labels sorts after its pre-releases and before post-releases
+    return tuple(numbers), tuple(tail) if tail else ((0, 0),)
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    if ecosystem == "PyPI":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+def requirement_version(spec) -> Tuple[Optional[str], bool]:
+    """
+    Version to check for a manifest requirement and whether it is exact.
+    Ranges like "^1.2.0" or ">=2.5,<3" are checked at their lower bound;
+    requirements without one ("<2.0", ">1.0", "*") are not checked.
+    """
+    if not isinstance(spec, str):
+        return None, False
+    # Only the first of several alternatives ("^1.0 || ^2.0"); URLs, paths and aliases are skipped
+    spec = spec.split("||")[0].strip()
+    if not spec or "/" in spec or ":" in spec:
+        return None, False
+    if spec[0] in "[(":
+        # Maven range: only an inclusive lower bound counts
+        lower = spec[1:].split(",")[0].strip().rstrip("])")
+        if spec[0] != "[" or not lower:
+            return None, False
+        return lower, spec.endswith("]") and "," not in spec
+
+    constraints = _CONSTRAINT.findall(spec)
+    for operator, version in constraints:
+        if operator in _LOWER_BOUND:
+            # "1.2.x" / "1.2.*" allow anything from 1.2 on
+            wildcard = "*" in spec or _WILDCARD.search(version) is not None
+            exact = len(constraints) == 1 and operator in _EXACT and not wildcard
+            return _WILDCARD.sub("", version), exact
+    return None, False
+
+
+class AdvisoryIndex:
+    """Read side of the advisory index; lookups never leave the process"""
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024, check_interval: float = 30.0):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.check_interval = check_interval
+        self.lookups = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._mtime = 0.0
+        self._checked_at = 0.0
+        self._packages: Dict[Tuple[str, str], Tuple[List[tuple], Optional[str]]] = {}
+
+    def available(self) -> bool:
+        self._maybe_reload()
+        return self._db is not None
+
+    def version(self) -> Optional[float]:
+        """Modification time of the loaded index (changes with every import); None when absent"""
+        self._maybe_reload()
+        return self._mtime if self._db is not None else None
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self._db is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return
+        if self._db is not None and mtime == self._mtime:
+            return
+        db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        db.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            self._db = db
+            self._mtime = mtime
+            self._packages.clear()
+
+    def _package(self, ecosystem: str, name: str) -> Tuple[List[tuple], Optional[str]]:
+        """(affected ranges, latest version) of one package, cached until the next import"""
+        key = (ecosystem, name)
+        cached = self._packages.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT r.advisory_id, r.introduced, r.fixed, r.last_affected, r.version
+                FROM ranges r WHERE r.ecosystem = ? AND r.package = ?
+            """, key).fetchall()
+            latest = self._db.execute(
+                "SELECT version FROM latest WHERE ecosystem = ? AND package = ?", key
+            ).fetchone()
+        ranges = [
+            (advisory_id,
+             version_key(introduced) if introduced else None,
+             version_key(fixed) if fixed else None,
+             version_key(last_affected) if last_affected else None,
+             version_key(exact) if exact else None,
+             fixed)
+            for advisory_id, introduced, fixed, last_affected, exact in rows
+        ]
+        cached = self._packages[key] = (ranges, latest[0] if latest else None)
+        if len(self._packages) > 100_000:
+            self._packages.clear()
+        return cached
+
+    def check(self, ecosystem: str, package: str, version: str) -> Tuple[List[tuple], Optional[str]]:
+        """
+        Advisories affecting `version` as (advisory id, fixed version) pairs,
+        plus the latest known version of the package
+        """
+        self.lookups += 1
+        ranges, latest = self._package(ecosystem, normalize_package(ecosystem, package))
+        if not ranges:
+            return [], latest
+        key = version_key(version)
+        affected = {}
+        for advisory_id, introduced, fixed, last_affected, exact, fixed_version in ranges:
+            if exact is not None:
+                hit = key == exact
+            else:
+                hit = (introduced is None or key >= introduced) and \
+                      (fixed is None or key < fixed) and \
+                      (last_affected is None or key <= last_affected)
+            if hit:
+                affected.setdefault(advisory_id, fixed_version)
+        return list(affected.items()), latest
+
+    def advisories(self, ids: Iterable[str]) -> Dict[str, Dict]:
+        ids = list(ids)
+        if not ids:
+            return {}
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, summary, severity, aliases FROM advisories WHERE id IN ({','.join('?' * len(ids))})", ids
+            ).fetchall()
+        return {
+            advisory_id: {"id": advisory_id, "summary": summary, "severity": severity, "aliases": json.loads(aliases)}
+            for advisory_id, summary, severity, aliases in rows
+        }
+
+    def audit(self, manifests: Dict[str, Dict[str, str]]) -> Tuple[List[Dict], List[Dict]]:
+        """Outdated dependencies and vulnerabilities for {manifest path: {package: requirement}}"""
+        outdated = []
+        findings = []
+        if not self.available():
+            return outdated, findings
+        for path, packages in manifests.items():
+            ecosystem = MANIFEST_ECOSYSTEMS.get(path.split('/')[-1])
+            if ecosystem is None:
+                continue
+            for package, spec in packages.items():
+                version, exact = requirement_version(spec)
+                if version is None:
+                    continue
+                affected, latest = self.check(ecosystem, package, version)
+                if latest and version_key(latest) > version_key(version):
+                    outdated.append({
+                        "manifest": path,
+                        "package": package,
+                        "current": spec,
+                        "latest": latest
+                    })
+                for advisory_id, fixed in affected:
+                    findings.append({
+                        "manifest": path,
+                        "ecosystem": ecosystem,
+                        "package": package,
+                        "version": version,
+                        "exact_version": exact,
+                        "advisory": advisory_id,
+                        "fixed_in": fixed
+                    })
+
+        details = self.advisories({finding["advisory"] for finding in findings})
+        for finding in findings:
+            detail = details.get(finding["advisory"], {})
+            finding["summary"] = detail.get("summary")
+            finding["severity"] = detail.get("severity")
+            finding["aliases"] = detail.get("aliases", [])
+        return outdated, findings
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "loaded": self._db is not None,
+            "cached_packages": len(self._packages),
+            "lookups": self.lookups
+        }
+
+
+def advisory_index_from_env() -> Optional[AdvisoryIndex]:
+    """Advisory index at ADVISORY_INDEX_PATH (None when ADVISORY_INDEX_ENABLED is false)"""
+    if os.getenv("ADVISORY_INDEX_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return AdvisoryIndex(
+        path=os.getenv("ADVISORY_INDEX_PATH", ".cache/advisories.sqlite"),
+        mmap_size=int(float(os.getenv("ADVISORY_INDEX_MMAP_MB", 256)) * 1024 * 1024),
+    )
+
+
+# Import
+
+SCHEMA = """
+    CREATE TABLE advisories (
+        id TEXT PRIMARY KEY,
+        summary TEXT,
+        severity TEXT,
+        aliases TEXT NOT NULL,
+        modified TEXT
+    );
+    CREATE TABLE ranges (
+        ecosystem TEXT NOT NULL,
+        package TEXT NOT NULL,
+        advisory_id TEXT NOT NULL,
+        introduced TEXT,
+        fixed TEXT,
+        last_affected TEXT,
+        version TEXT
+    );
+    CREATE TABLE latest (
+        ecosystem TEXT NOT NULL,
+        package TEXT NOT NULL,
+        version TEXT NOT NULL,
+        PRIMARY KEY (ecosystem, package)
+    );
+"""
+
+
+def read_records(source: str) -> Iterator[Dict]:
+    """OSV-style records from a .zip, directory, .json or .jsonl dump"""
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.endswith((".json", ".jsonl")):
+                    yield from read_records(os.path.join(root, name))
+        return
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for name in archive.namelist():
+                if name.endswith(".json"):
+                    yield from _records(json.loads(archive.read(name)))
+        return
+    with open(source, encoding="utf-8") as f:
+        if source.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield from _records(json.loads(line))
+        else:
+            yield from _records(json.load(f))
+
+
+def _records(data) -> Iterator[Dict]:
+    if isinstance(data, list):
+        yield from data
+    elif isinstance(data, dict):
+        yield data
+
+
+def _severity(record: Dict) -> Optional[str]:
+    specific = record.get("database_specific") or {}
+    if specific.get("severity"):
+        return str(specific["severity"]).upper()
+    for entry in record.get("severity") or []:
+        if entry.get("score"):
+            return entry["score"]
+    return None
+
+
+def _ranges(affected: Dict) -> Iterator[tuple]:
+    """(introduced, fixed, last_affected, exact version) rows for one affected package"""
+    for version_range in affected.get("ranges") or []:
+        if version_range.get("type") == "GIT":
+            continue
+        introduced = None
+        for event in version_range.get("events") or []:
+            if "introduced" in event:
+                introduced = None if event["introduced"] in ("0", "") else event["introduced"]
+            elif "fixed" in event:
+                yield introduced, event["fixed"], None, None
+                introduced = None
+            elif "last_affected" in event:
+                yield introduced, None, event["last_affected"], None
+                introduced = None
+        # An open-ended introduction with no fix affects every later version
+        events = version_range.get("events") or []
+        if events and "introduced" in events[-1]:
+            yield introduced, None, None, None
+    for version in affected.get("versions") or []:
+        yield None, None, None, version
+
+
+def build_index(source: str, path: str) -> Dict[str, int]:
+    """Build a new index file from `source` and atomically replace `path`"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary):
+        os.remove(temporary)
+
+    counts = {"advisories": 0, "ranges": 0, "latest_versions": 0}
+    db = sqlite3.connect(temporary)
+    db.executescript(SCHEMA)
+    for record in read_records(source):
+        if "latest_version" in record:
+            ecosystem = record.get("ecosystem")
+            db.execute(
+                "INSERT OR REPLACE INTO latest (ecosystem, package, version) VALUES (?, ?, ?)",
+                (ecosystem, normalize_package(ecosystem, record["name"]), record["latest_version"])
+            )
+            counts["latest_versions"] += 1
+            continue
+        if "id" not in record or record.get("withdrawn"):
+            continue
+        db.execute(
+            "INSERT OR REPLACE INTO advisories (id, summary, severity, aliases, modified) VALUES (?, ?, ?, ?, ?)",
+            (record["id"], record.get("summary") or (record.get("details") or "")[:200] or None,
+             _severity(record), json.dumps(record.get("aliases") or []), record.get("modified"))
+        )
+        counts["advisories"] += 1
+        for affected in record.get("affected") or []:
+            package = affected.get("package") or {}
+            ecosystem = (package.get("ecosystem") or "").split(":")[0]
+            if not ecosystem or not package.get("name"):
+                continue
+            name = normalize_package(ecosystem, package["name"])
+            rows = [(ecosystem, name, record["id"], *row) for row in _ranges(affected)]
+            db.executemany("INSERT INTO ranges VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            counts["ranges"] += len(rows)
+
+    db.execute("CREATE INDEX ranges_package ON ranges (ecosystem, package)")
+    db.commit()
+    db.execute("VACUUM")
+    db.close()
+    os.replace(temporary, path)
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline advisory index for dependency analysis")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="build the index from an OSV-style dump")
+    importer.add_argument("source", help=".zip, directory, .json or .jsonl dump")
+    importer.add_argument("--db", default=os.getenv("ADVISORY_INDEX_PATH", ".cache/advisories.sqlite"))
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = build_index(args.source, args.db)
+    print(f"Indexed {counts['advisories']} advisories ({counts['ranges']} ranges) and "
+          f"{counts['latest_versions']} latest versions into {args.db} "
+          f"in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
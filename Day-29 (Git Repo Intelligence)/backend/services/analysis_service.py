@@ -1,14 +1,142 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 from collections import Counter, defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import re
 import json
 
-class AnalysisService:
-    
-    def analyze_commits(self, commits: List[Dict]) -> Dict:
-        """Analyze commit patterns and categorize them"""
-        if not commits:
+from services.tree_index import TreeIndex, TreeIndexCache
+
+# Conventional-commit keywords per category, checked against the message prefix
+DEFAULT_COMMIT_RULES = {
+    "feat": ["feat", "feature"],
+    "fix": ["fix", "bug", "hotfix"],
+    "docs": ["docs", "doc"],
+    "style": ["style", "format"],
+    "refactor": ["refactor", "refact"],
+    "test": ["test", "tests"],
+    "chore": ["chore", "build", "ci"],
+}
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+class CommitClassifier:
+    """
+    Categorizes commit messages with one precompiled regex anchored on the
+    conventional-commit prefix (``type(scope)!: subject``). Rules map a
+    category to its keywords and can be extended with `add_rule`.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, List[str]]] = None, fallback: str = "others"):
+        self.rules = {category: list(keywords) for category, keywords in (rules or DEFAULT_COMMIT_RULES).items()}
+        self.fallback = fallback
+        self._compile()
+
+    def add_rule(self, category: str, keywords: List[str]) -> None:
+        """Add keywords for a (possibly new) category"""
+        self.rules.setdefault(category, []).extend(keywords)
+        self._compile()
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self.rules) + [self.fallback]
+
+    def _compile(self) -> None:
+        # One named group per category, so the match itself names the category
+        seen = set()
+        groups = []
+        self.group_category = {}
+        for index, (category, keywords) in enumerate(self.rules.items()):
+            unique = [keyword.lower() for keyword in keywords if keyword.lower() not in seen]
+            seen.update(unique)
+            if not unique:
+                continue
+            alternation = "|".join(re.escape(keyword) for keyword in sorted(unique, key=len, reverse=True))
+            groups.append(f"(?P<c{index}>{alternation})")
+            self.group_category[f"c{index}"] = category
+        alternation = '|'.join(groups) or '(?!)'
+        self.pattern = re.compile(rf"\s*(?:{alternation})(?:\([^)\n]*\))?!?:", re.IGNORECASE)
+
+    def classify(self, message: str) -> str:
+        match = self.pattern.match(message)
+        if match is None:
+            return self.fallback
+        return self.group_category[match.lastgroup]
+
+
+@lru_cache(maxsize=8192)
+def weekday_name(day: str) -> Optional[str]:
+    """Weekday name for a YYYY-MM-DD date string"""
+    try:
+        return WEEKDAYS[date(int(day[0:4]), int(day[5:7]), int(day[8:10])).weekday()]
+    except ValueError:
+        return None
+
+
+default_classifier = CommitClassifier()
+
+
+class CommitAggregator:
+    """
+    Streaming commit statistics. Commits are folded in one at a time, so
+    memory grows with the number of authors and active days rather than
+    with the number of commits.
+    """
+
+    def __init__(self, classifier: Optional[CommitClassifier] = None):
+        self.classifier = classifier or default_classifier
+        self.total_commits = 0
+        self.categories = {category: 0 for category in self.classifier.categories}
+        self.author_stats = Counter()
+        self.frequency = defaultdict(int)
+        self.active_days = set()
+
+    def add(self, commit: Dict) -> None:
+        self.add_many((commit,))
+
+    def add_many(self, commits: Iterable[Dict]) -> None:
+        # Hot loop: bind lookups to locals and defer weekday resolution to
+        # once per distinct day in the batch
+        match = self.classifier.pattern.match
+        group_category = self.classifier.group_category
+        fallback = self.classifier.fallback
+        categories = self.categories
+        author_stats = self.author_stats
+        day_counts = defaultdict(int)
+        count = 0
+
+        for commit in commits:
+            count += 1
+            info = commit.get('commit') or {}
+            author_info = info.get('author') or {}
+
+            matched = match(info.get('message', ''))
+            categories[group_category[matched.lastgroup] if matched else fallback] += 1
+            author_stats[author_info.get('name', 'Unknown')] += 1
+            date_str = author_info.get('date')
+            if date_str:
+                day_counts[date_str[:10]] += 1
+
+        self.total_commits += count
+        for day, day_count in day_counts.items():
+            self.active_days.add(day)
+            day_name = weekday_name(day)
+            if day_name:
+                self.frequency[day_name] += day_count
+
+    def merge(self, other: "CommitAggregator") -> None:
+        """Fold another aggregator's statistics into this one"""
+        self.total_commits += other.total_commits
+        for category, count in other.categories.items():
+            self.categories[category] = self.categories.get(category, 0) + count
+        self.author_stats.update(other.author_stats)
+        for day, count in other.frequency.items():
+            self.frequency[day] += count
+        self.active_days |= other.active_days
+
+    def result(self) -> Dict:
+        if not self.total_commits:
             return {
                 "total_commits": 0,
                 "commit_categories": {},
@@ -17,66 +145,36 @@ class AnalysisService:
                 "avg_commits_per_day": 0.0
             }
 
-        # Categorize commits by message patterns
-        categories = {
-            "feat": 0, "fix": 0, "docs": 0, "style": 0,
-            "refactor": 0, "test": 0, "chore": 0, "others": 0
-        }
-        
-        author_stats = Counter()
-        commit_dates = []
-
-        for commit in commits:
-            message = commit.get('commit', {}).get('message', '').lower()
-            author = commit.get('commit', {}).get('author', {}).get('name', 'Unknown')
-            date_str = commit.get('commit', {}).get('author', {}).get('date')
-            
-            # Categorize commit
-            if any(keyword in message for keyword in ['feat:', 'feature:']):
-                categories['feat'] += 1
-            elif any(keyword in message for keyword in ['fix:', 'bug:', 'hotfix:']):
-                categories['fix'] += 1
-            elif any(keyword in message for keyword in ['docs:', 'doc:']):
-                categories['docs'] += 1
-            elif any(keyword in message for keyword in ['style:', 'format:']):
-                categories['style'] += 1
-            elif any(keyword in message for keyword in ['refactor:', 'refact:']):
-                categories['refactor'] += 1
-            elif any(keyword in message for keyword in ['test:', 'tests:']):
-                categories['test'] += 1
-            elif any(keyword in message for keyword in ['chore:', 'build:', 'ci:']):
-                categories['chore'] += 1
-            else:
-                categories['others'] += 1
-
-            author_stats[author] += 1
-            if date_str:
-                commit_dates.append(date_str)
-
-        # Calculate commit frequency
-        frequency = self._calculate_commit_frequency(commit_dates)
-        avg_per_day = len(commits) / max(len(set(date[:10] for date in commit_dates)), 1)
+        avg_per_day = self.total_commits / max(len(self.active_days), 1)
 
         return {
-            "total_commits": len(commits),
-            "commit_categories": categories,
-            "top_authors": [{"name": name, "commit_count": count} 
-                          for name, count in author_stats.most_common(10)],
-            "commit_frequency": frequency,
+            "total_commits": self.total_commits,
+            "commit_categories": dict(self.categories),
+            "top_authors": [{"name": name, "commit_count": count}
+                          for name, count in self.author_stats.most_common(10)],
+            "commit_frequency": dict(self.frequency),
             "avg_commits_per_day": round(avg_per_day, 2)
         }
 
-    def _calculate_commit_frequency(self, dates: List[str]) -> Dict[str, int]:
-        """Calculate commit frequency by day of week"""
-        frequency = defaultdict(int)
-        for date_str in dates:
-            try:
-                date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                day_name = date.strftime('%A')
-                frequency[day_name] += 1
-            except:
-                continue
-        return dict(frequency)
+
+class AnalysisService:
+    
+    def __init__(self, classifier: Optional[CommitClassifier] = None):
+        self.classifier = classifier or default_classifier
+        self.tree_indexes = TreeIndexCache()
+
+    def analyze_commits(self, commits: List[Dict]) -> Dict:
+        """Analyze commit patterns and categorize them"""
+        aggregator = CommitAggregator(self.classifier)
+        aggregator.add_many(commits)
+        return aggregator.result()
+
+    async def analyze_commit_pages(self, pages: AsyncIterator[List[Dict]]) -> Dict:
+        """Analyze commits page by page without keeping earlier pages in memory"""
+        aggregator = CommitAggregator(self.classifier)
+        async for page in pages:
+            aggregator.add_many(page)
+        return aggregator.result()
 
     def analyze_languages(self, languages: Dict[str, int]) -> Dict:
         """Analyze programming languages usage"""
@@ -129,27 +227,13 @@ class AnalysisService:
             "word_count": len(readme_content.split())
         }
 
+    def tree_index(self, tree: Dict) -> TreeIndex:
+        """Path index for a tree listing, built once per tree SHA"""
+        return self.tree_indexes.get(tree)
+
     def analyze_file_structure(self, tree: Dict) -> Dict:
         """Analyze repository file structure"""
         if not tree or 'tree' not in tree:
             return {"file_count": 0, "directory_count": 0, "file_types": {}}
 
-        files = tree['tree']
-        file_count = sum(1 for f in files if f['type'] == 'blob')
-        dir_count = sum(1 for f in files if f['type'] == 'tree')
-        
-        # Analyze file types
-        file_types = Counter()
-        for file in files:
-            if file['type'] == 'blob':
-                path = file['path']
-                if '.' in path:
-                    ext = path.split('.')[-1].lower()
-                    file_types[ext] += 1
-
-        return {
-            "file_count": file_count,
-            "directory_count": dir_count,
-            "file_types": dict(file_types.most_common(10)),
-            "total_size": tree.get('size', 0)
-        }
+        return self.tree_index(tree).summary()
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.rate_limiter import BATCH, UsageCounter, request_priority, request_usage
+
+Analyzer = Callable[[str, str], Awaitable[Dict]]
+
+
+class RequestBudget:
+    """
+    Token bucket of upstream API requests shared by every batch worker.
+    A worker waits for the bucket to be out of debt before starting a
+    repository and is charged the calls the rate limit scheduler actually
+    admitted for it afterwards, so the batch as a whole stays under
+    `per_hour` (overshooting by at most the repositories in flight).
+    """
+
+    def __init__(self, per_hour: float, burst: Optional[float] = None):
+        self.rate = per_hour / 3600
+        self.capacity = burst or max(per_hour / 60, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self.charged = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def wait(self) -> None:
+        """Wait until the bucket has budget left"""
+        # Holding the lock while sleeping keeps waiters in FIFO order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens > 0:
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def charge(self, requests: int) -> None:
+        """Deduct the calls a finished repository made (may leave the bucket in debt)"""
+        self._refill()
+        self.tokens -= requests
+        self.charged += requests
+
+    def stats(self) -> Dict:
+        return {
+            "requests_per_hour": round(self.rate * 3600),
+            "available": round(self.tokens, 1),
+            "requests_charged": self.charged,
+            "waited_seconds": round(self.waited, 1)
+        }
+
+
+class BatchJobQueue:
+    """
+    SQLite-backed queue of multi-repository analysis jobs.
+
+    Each job is a list of repositories processed by a fixed pool of
+    workers shared by all jobs (the global concurrency limit). Item state
+    is persisted as it changes, so on restart running items are reset to
+    pending and unfinished jobs resume where they stopped. Finished items
+    get a per-job sequence number that result streams follow.
+    """
+
+    def __init__(self, path: str, concurrency: int = 4, budget: Optional[RequestBudget] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.concurrency = concurrency
+        self.budget = budget
+        self._analyze: Optional[Analyzer] = None
+        self._queue: "asyncio.Queue[Tuple[str, int, str]]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._finished: Optional[asyncio.Condition] = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                repository TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                finished_seq INTEGER,
+                PRIMARY KEY (job_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS job_items_finished ON job_items (job_id, finished_seq);
+        """)
+        self._db.commit()
+
+    async def start(self, analyze: Analyzer) -> None:
+        """Start the worker pool and re-enqueue items left unfinished by a previous run"""
+        self._analyze = analyze
+        self._finished = asyncio.Condition()
+        for item in await asyncio.to_thread(self._resume):
+            self._queue.put_nowait(item)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        with self._lock:
+            self._db.close()
+
+    def _resume(self) -> List[Tuple[str, int, str]]:
+        with self._lock:
+            self._db.execute("UPDATE job_items SET status = 'pending' WHERE status = 'running'")
+            self._db.commit()
+            return self._db.execute("""
+                SELECT job_items.job_id, position, repository FROM job_items
+                JOIN jobs ON jobs.id = job_items.job_id
+                WHERE job_items.status = 'pending'
+                ORDER BY jobs.created_at, position
+            """).fetchall()
+
+    async def submit(self, repositories: List[str]) -> Dict:
+        """Create a job for the given `owner/repo` names and queue its items"""
+        job_id = uuid.uuid4().hex
+        repositories = list(dict.fromkeys(repositories))
+        await asyncio.to_thread(self._create, job_id, repositories)
+        for position, repository in enumerate(repositories):
+            self._queue.put_nowait((job_id, position, repository))
+        return await self.progress(job_id)
+
+    def _create(self, job_id: str, repositories: List[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, total, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, len(repositories), now, now)
+            )
+            self._db.executemany(
+                "INSERT INTO job_items (job_id, position, repository, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, position, repository) for position, repository in enumerate(repositories)]
+            )
+            self._db.commit()
+
+    async def _worker(self) -> None:
+        # GitHub calls made by batch work yield to interactive requests
+        request_priority.set(BATCH)
+        while True:
+            job_id, position, repository = await self._queue.get()
+            try:
+                await self._process(job_id, position, repository)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str, position: int, repository: str) -> None:
+        if self.budget is not None:
+            await self.budget.wait()
+        await asyncio.to_thread(self._mark_running, job_id, position)
+        owner, repo = repository.split('/', 1)
+        usage = UsageCounter()
+        usage_token = request_usage.set(usage)
+        try:
+            result, error = await self._analyze(owner, repo), None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result, error = None, str(e) or type(e).__name__
+        finally:
+            request_usage.reset(usage_token)
+            if self.budget is not None:
+                self.budget.charge(usage.requests)
+        await asyncio.to_thread(self._finish, job_id, position, result, error)
+        async with self._finished:
+            self._finished.notify_all()
+
+    def _mark_running(self, job_id: str, position: int) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE job_items SET status = 'running' WHERE job_id = ? AND position = ?", (job_id, position)
+            )
+            self._db.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+            self._db.commit()
+
+    def _finish(self, job_id: str, position: int, result: Optional[Dict], error: Optional[str]) -> None:
+        with self._lock:
+            self._db.execute("""
+                UPDATE job_items SET status = ?, result = ?, error = ?,
+                    finished_seq = (SELECT COALESCE(MAX(finished_seq), 0) + 1 FROM job_items WHERE job_id = ?)
+                WHERE job_id = ? AND position = ?
+            """, ('failed' if error else 'done', json.dumps(result) if result is not None else None, error,
+                  job_id, job_id, position))
+            self._db.execute("""
+                UPDATE jobs SET updated_at = ?, status = CASE
+                    WHEN EXISTS (SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('pending', 'running'))
+                    THEN status ELSE 'completed' END
+                WHERE id = ?
+            """, (time.time(), job_id, job_id))
+            self._db.commit()
+
+    async def progress(self, job_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._progress, job_id)
+
+    def _progress(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._db.execute(
+                "SELECT status, total, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status", (job_id,)
+            ).fetchall())
+
+        finished = counts.get('done', 0) + counts.get('failed', 0)
+        return {
+            "job_id": job_id,
+            "status": job[0],
+            "total": job[1],
+            "pending": counts.get('pending', 0),
+            "running": counts.get('running', 0),
+            "succeeded": counts.get('done', 0),
+            "failed": counts.get('failed', 0),
+            "progress": round(finished / job[1], 4) if job[1] else 1.0,
+            "created_at": job[2],
+            "updated_at": job[3]
+        }
+
+    def _finished_items(self, job_id: str, after: int) -> Tuple[List[tuple], Optional[str]]:
+        with self._lock:
+            rows = self._db.execute("""
+                SELECT finished_seq, repository, status, result, error FROM job_items
+                WHERE job_id = ? AND finished_seq > ? ORDER BY finished_seq
+            """, (job_id, after)).fetchall()
+            job = self._db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return rows, job[0] if job else None
+
+    async def results(self, job_id: str, after: int = 0) -> AsyncIterator[Dict]:
+        """Yield finished items in completion order, waiting for more until the job completes"""
+        while True:
+            rows, status = await asyncio.to_thread(self._finished_items, job_id, after)
+            for seq, repository, item_status, result, error in rows:
+                after = seq
+                yield {
+                    "sequence": seq,
+                    "repository": repository,
+                    "status": item_status,
+                    "result": json.loads(result) if result is not None else None,
+                    "error": error
+                }
+            if status is None or (status == 'completed' and not rows):
+                return
+            if not rows:
+                async with self._finished:
+                    try:
+                        await asyncio.wait_for(self._finished.wait(), timeout=5)
+                    except asyncio.TimeoutError:
+                        pass
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._workers),
+            "queued_items": self._queue.qsize(),
+            "request_budget": self.budget.stats() if self.budget else None
+        }
+
+
+def batch_queue_from_env() -> BatchJobQueue:
+    """Build the batch queue from BATCH_* settings"""
+    per_hour = float(os.getenv("BATCH_REQUEST_BUDGET", 4000))
+    return BatchJobQueue(
+        path=os.getenv("BATCH_QUEUE_PATH", ".cache/batch_jobs.sqlite"),
+        concurrency=int(os.getenv("BATCH_CONCURRENCY", 4)),
+        budget=RequestBudget(per_hour) if per_hour > 0 else None,
+    )
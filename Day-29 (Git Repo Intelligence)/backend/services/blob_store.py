@@ -0,0 +1,146 @@
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+_SHA_PATTERN = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+class BlobStore:
+    """
+    Content-addressed on-disk store for git blobs, keyed by blob SHA.
+
+    Blob SHAs identify immutable content, so entries never need
+    invalidation; the store is only kept under `max_bytes` by evicting the
+    least recently used blobs. Blobs can be read whole or memory-mapped,
+    which lets large files be served in ranges without loading them into
+    Python strings.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_size = 0
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        """Rebuild the LRU order from file modification times"""
+        found = []
+        for prefix in os.scandir(self.root):
+            if not prefix.is_dir():
+                continue
+            for entry in os.scandir(prefix.path):
+                if entry.name.endswith('.tmp'):
+                    continue
+                stat = entry.stat()
+                found.append((stat.st_mtime, prefix.name + entry.name, stat.st_size))
+        for _, sha, size in sorted(found):
+            self._entries[sha] = size
+            self.total_size += size
+
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.root, sha[:2], sha[2:])
+
+    def _touch(self, sha: str) -> bool:
+        with self._lock:
+            if sha not in self._entries:
+                self.misses += 1
+                return False
+            self.hits += 1
+            self._entries.move_to_end(sha)
+        try:
+            os.utime(self._path(sha))
+        except OSError:
+            pass
+        return True
+
+    def has(self, sha: Optional[str]) -> bool:
+        return sha is not None and sha in self._entries
+
+    def size(self, sha: str) -> Optional[int]:
+        return self._entries.get(sha)
+
+    def get(self, sha: Optional[str]) -> Optional[bytes]:
+        """Whole blob content, or None if it is not stored"""
+        if not sha or not self._touch(sha):
+            return None
+        try:
+            with open(self._path(sha), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            self._forget(sha)
+            return None
+
+    def open(self, sha: Optional[str]) -> Optional[Union[mmap.mmap, bytes]]:
+        """Read-only memory map of a blob (empty bytes for empty blobs); caller closes it"""
+        if not sha or not self._touch(sha):
+            return None
+        if self._entries.get(sha) == 0:
+            return b""
+        try:
+            with open(self._path(sha), 'rb') as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            self._forget(sha)
+            return None
+
+    def put(self, sha: str, data: bytes) -> None:
+        """Store a blob (written atomically) and evict old blobs past the size cap"""
+        if not _SHA_PATTERN.match(sha) or len(data) > self.max_bytes or sha in self._entries:
+            return
+        path = self._path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+        with self._lock:
+            if sha not in self._entries:
+                self._entries[sha] = len(data)
+                self.total_size += len(data)
+            evicted = []
+            while self.total_size > self.max_bytes and self._entries:
+                old_sha, old_size = self._entries.popitem(last=False)
+                self.total_size -= old_size
+                self.evictions += 1
+                evicted.append(old_sha)
+        for old_sha in evicted:
+            try:
+                os.remove(self._path(old_sha))
+            except OSError:
+                pass
+
+    def _forget(self, sha: str) -> None:
+        with self._lock:
+            size = self._entries.pop(sha, None)
+            if size is not None:
+                self.total_size -= size
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.total_size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+def blob_store_from_env() -> Optional[BlobStore]:
+    """Build the blob store from BLOB_STORE_* settings (None when disabled)"""
+    if os.getenv("BLOB_STORE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return BlobStore(
+        root=os.getenv("BLOB_STORE_PATH", ".cache/blobs"),
+        max_bytes=int(float(os.getenv("BLOB_STORE_MAX_MB", 1024)) * 1024 * 1024),
+    )
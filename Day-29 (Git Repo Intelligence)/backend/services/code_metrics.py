@@ -0,0 +1,333 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from services.languages import EXTENSION_LANGUAGES
+
+# Lines per duplication shingle and the rolling-hash parameters
+SHINGLE_LINES = 6
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1_000_003
+HASH_BASE_TOP = pow(HASH_BASE, SHINGLE_LINES - 1, HASH_MOD)
+
+C_DECISIONS = r"\b(?:if|for|while|case|catch)\b|&&|\|\||\?(?![.?:])"
+
+# Comment syntax and decision-point pattern per language family
+SYNTAX = {
+    "c": {"line": ("//",), "block": (("/*", "*/"),), "decisions": C_DECISIONS},
+    "python": {
+        "line": ("#",),
+        "block": (('"""', '"""'), ("'''", "'''")),
+        "decisions": r"\b(?:if|elif|for|while|except|and|or|case)\b"
+    },
+    "ruby": {
+        "line": ("#",),
+        "block": (("=begin", "=end"),),
+        "decisions": r"\b(?:if|elsif|unless|while|until|for|when|rescue)\b|&&|\|\|"
+    },
+    "shell": {"line": ("#",), "block": (), "decisions": r"\b(?:if|elif|for|while|case)\b|&&|\|\|"},
+    "lua": {"line": ("--",), "block": (("--[[", "]]"),), "decisions": r"\b(?:if|elseif|for|while|repeat|and|or)\b"},
+    "haskell": {"line": ("--",), "block": (("{-", "-}"),), "decisions": r"\b(?:if|case|guard)\b|\|\||&&"},
+    "sql": {"line": ("--",), "block": (("/*", "*/"),), "decisions": r"\b(?:case|when|and|or)\b"},
+    "markup": {"line": (), "block": (("<!--", "-->"),), "decisions": r"(?!)"},
+}
+
+EXTENSION_SYNTAX = {
+    **dict.fromkeys([
+        "c", "h", "cc", "cpp", "cxx", "hpp", "hh", "java", "js", "jsx", "mjs", "cjs", "ts", "tsx",
+        "go", "rs", "swift", "kt", "kts", "scala", "cs", "php", "dart", "groovy", "m", "mm",
+        "css", "scss", "less", "sol", "zig"
+    ], "c"),
+    **dict.fromkeys(["py", "pyi"], "python"),
+    **dict.fromkeys(["rb"], "ruby"),
+    **dict.fromkeys(["sh", "bash", "zsh", "pl", "r", "ex", "exs", "jl", "tf", "nix"], "shell"),
+    **dict.fromkeys(["lua"], "lua"),
+    **dict.fromkeys(["hs", "elm"], "haskell"),
+    **dict.fromkeys(["sql"], "sql"),
+    **dict.fromkeys(["html", "htm", "vue", "svelte", "xml"], "markup"),
+}
+
+_DECISION_PATTERNS: Dict[str, "re.Pattern"] = {}
+
+
+def scan_source(text: str, syntax_name: str) -> Dict:
+    """Count blank/comment/code lines, decision points and duplication shingles of one file"""
+    syntax = SYNTAX[syntax_name]
+    decisions = _DECISION_PATTERNS.get(syntax_name)
+    if decisions is None:
+        decisions = _DECISION_PATTERNS[syntax_name] = re.compile(syntax["decisions"])
+    line_prefixes = syntax["line"]
+    blocks = syntax["block"]
+
+    total = code = comment = blank = 0
+    complexity = 1
+    block_end = None
+    line_hashes = []
+
+    for raw in text.splitlines():
+        total += 1
+        line = raw.strip()
+        if not line:
+            blank += 1
+            continue
+        if block_end is not None:
+            comment += 1
+            if block_end in line:
+                block_end = None
+            continue
+        if line_prefixes and line.startswith(line_prefixes):
+            comment += 1
+            continue
+        for start, end in blocks:
+            if line.startswith(start):
+                comment += 1
+                if end not in line[len(start):]:
+                    block_end = end
+                break
+        else:
+            code += 1
+            complexity += len(decisions.findall(line))
+            normalized = " ".join(line.split())
+            # Braces and other trivial lines would make every file look duplicated
+            if len(normalized) > 2:
+                line_hashes.append(zlib.crc32(normalized.encode()))
+
+    return {
+        "total_lines": total,
+        "code_lines": code,
+        "comment_lines": comment,
+        "blank_lines": blank,
+        "complexity": complexity,
+        "shingles": rolling_shingles(line_hashes)
+    }
+
+
+def rolling_shingles(line_hashes: List[int]) -> bytes:
+    """Rolling polynomial hash over every window of SHINGLE_LINES significant lines"""
+    shingles = array("Q")
+    if len(line_hashes) < SHINGLE_LINES:
+        return shingles.tobytes()
+    window = 0
+    for value in line_hashes[:SHINGLE_LINES]:
+        window = (window * HASH_BASE + value) % HASH_MOD
+    shingles.append(window)
+    for index in range(SHINGLE_LINES, len(line_hashes)):
+        window = ((window - line_hashes[index - SHINGLE_LINES] * HASH_BASE_TOP) * HASH_BASE
+                  + line_hashes[index]) % HASH_MOD
+        shingles.append(window)
+    return shingles.tobytes()
+
+
+def scan_batch(syntax_name: str, blobs: List[Tuple[str, str]]) -> List[Tuple[str, Dict]]:
+    """Process-pool entry point: scan a batch of (blob sha, text) for one language family"""
+    return [(sha, scan_source(text, syntax_name)) for sha, text in blobs]
+
+
+class CodeMetricsEngine:
+    """
+    Line-level code metrics for a repository tree.
+
+    Source blobs are fetched with bounded concurrency and streamed, in
+    per-language batches, through a process pool that counts code, comment
+    and blank lines, estimates cyclomatic complexity and computes
+    rolling-hash shingles for duplicate detection. Per-blob results are
+    cached in SQLite by blob SHA, so unchanged files are never re-scanned.
+    """
+
+    IGNORED_DIRS = {"node_modules", "vendor", "third_party", "dist", "build", ".git", "venv", ".venv"}
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_files: Optional[int] = None,
+        max_file_size: Optional[int] = None,
+        fetch_concurrency: int = 8,
+        batch_size: int = 32,
+    ):
+        self.cache_path = cache_path or os.getenv('CODE_METRICS_CACHE_PATH', '.cache/code_metrics.sqlite')
+        self.max_workers = max_workers or int(os.getenv('CODE_METRICS_WORKERS', os.cpu_count() or 2))
+        self.max_files = max_files or int(os.getenv('CODE_METRICS_MAX_FILES', 500))
+        self.max_file_size = max_file_size or int(os.getenv('CODE_METRICS_MAX_FILE_SIZE', 512 * 1024))
+        self.fetch_concurrency = fetch_concurrency
+        self.batch_size = batch_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS blob_metrics (
+                sha TEXT NOT NULL,
+                syntax TEXT NOT NULL,
+                total_lines INTEGER NOT NULL,
+                code_lines INTEGER NOT NULL,
+                comment_lines INTEGER NOT NULL,
+                blank_lines INTEGER NOT NULL,
+                complexity INTEGER NOT NULL,
+                shingles BLOB NOT NULL,
+                PRIMARY KEY (sha, syntax)
+            )
+        """)
+        self._db.commit()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def select_files(self, tree: Dict) -> Tuple[List[Dict], int]:
+        """Source blobs worth scanning, plus the number skipped by the size/count caps"""
+        candidates = []
+        skipped = 0
+        for item in tree.get('tree', []):
+            if item.get('type') != 'blob' or '.' not in item['path']:
+                continue
+            parts = item['path'].split('/')
+            extension = parts[-1].rsplit('.', 1)[-1].lower()
+            syntax = EXTENSION_SYNTAX.get(extension)
+            if syntax is None or any(part in self.IGNORED_DIRS for part in parts[:-1]):
+                continue
+            if (item.get('size') or 0) > self.max_file_size:
+                skipped += 1
+                continue
+            candidates.append({**item, "syntax": syntax, "language": EXTENSION_LANGUAGES.get(extension, syntax)})
+        skipped += max(len(candidates) - self.max_files, 0)
+        return candidates[:self.max_files], skipped
+
+    async def analyze(self, github_service, owner: str, repo: str, tree: Dict) -> Dict:
+        files, skipped = self.select_files(tree)
+        results = await asyncio.to_thread(self._load_cached, files)
+        cached = len(results)
+        missing = [item for item in files if (item['sha'], item['syntax']) not in results]
+
+        if missing:
+            scanned = await self._scan(github_service, owner, repo, missing)
+            results.update(scanned)
+            await asyncio.to_thread(self._store, scanned)
+
+        return self._summarize(files, results, skipped, cached)
+
+    async def _scan(self, github_service, owner: str, repo: str, files: List[Dict]) -> Dict:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        batches: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        futures = []
+        results = {}
+
+        def submit(syntax: str) -> None:
+            batch = batches.pop(syntax)
+            futures.append((syntax, loop.run_in_executor(self._pool, scan_batch, syntax, batch)))
+
+        async def fetch(item: Dict) -> Tuple[Dict, Optional[str]]:
+            async with semaphore:
+                return item, await github_service.get_file_content(owner, repo, item['path'], sha=item['sha'])
+
+        # Submit each language batch to the pool as soon as it fills up
+        for completed in asyncio.as_completed([fetch(item) for item in files]):
+            item, text = await completed
+            if text is None or text.startswith("[Binary file"):
+                continue
+            batches[item['syntax']].append((item['sha'], text))
+            if len(batches[item['syntax']]) >= self.batch_size:
+                submit(item['syntax'])
+        for syntax in list(batches):
+            submit(syntax)
+
+        for syntax, future in futures:
+            for sha, metrics in await future:
+                results[(sha, syntax)] = metrics
+        return results
+
+    def _load_cached(self, files: List[Dict]) -> Dict:
+        keys = {(item['sha'], item['syntax']) for item in files if item.get('sha')}
+        shas = sorted({sha for sha, _ in keys})
+        results = {}
+        with self._lock:
+            for start in range(0, len(shas), 500):
+                chunk = shas[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT sha, syntax, total_lines, code_lines, comment_lines, blank_lines, complexity, shingles "
+                    f"FROM blob_metrics WHERE sha IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for sha, syntax, total, code, comment, blank, complexity, shingles in rows:
+                    if (sha, syntax) in keys:
+                        results[(sha, syntax)] = {
+                            "total_lines": total, "code_lines": code, "comment_lines": comment,
+                            "blank_lines": blank, "complexity": complexity, "shingles": shingles
+                        }
+        return results
+
+    def _store(self, results: Dict) -> None:
+        rows = [
+            (sha, syntax, m["total_lines"], m["code_lines"], m["comment_lines"],
+             m["blank_lines"], m["complexity"], m["shingles"])
+            for (sha, syntax), m in results.items()
+        ]
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO blob_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+
+    def _summarize(self, files: List[Dict], results: Dict, skipped: int, cached: int) -> Dict:
+        totals = Counter()
+        per_language = defaultdict(Counter)
+        complexities = []
+        shingle_counts = Counter()
+        file_shingles = []
+
+        for item in files:
+            metrics = results.get((item['sha'], item['syntax']))
+            if metrics is None:
+                continue
+            language = item['language']
+            for field in ("total_lines", "code_lines", "comment_lines", "blank_lines"):
+                totals[field] += metrics[field]
+                per_language[language][field] += metrics[field]
+            per_language[language]["files"] += 1
+            complexities.append(metrics["complexity"])
+            shingles = array("Q")
+            shingles.frombytes(metrics["shingles"])
+            shingle_counts.update(shingles)
+            file_shingles.append(shingles)
+
+        # A line is duplicated when any shingle covering it occurs more than once
+        duplicated_lines = 0
+        significant_lines = 0
+        for shingles in file_shingles:
+            if not shingles:
+                continue
+            line_count = len(shingles) + SHINGLE_LINES - 1
+            significant_lines += line_count
+            covered = bytearray(line_count)
+            for index, value in enumerate(shingles):
+                if shingle_counts[value] > 1:
+                    covered[index:index + SHINGLE_LINES] = b"\x01" * SHINGLE_LINES
+            duplicated_lines += sum(covered)
+
+        scanned = len(complexities)
+        return {
+            "file_count": scanned,
+            "total_lines": totals["total_lines"],
+            "code_lines": totals["code_lines"],
+            "comment_lines": totals["comment_lines"],
+            "blank_lines": totals["blank_lines"],
+            "complexity_score": round(sum(complexities) / scanned, 2) if scanned else 0.0,
+            "max_complexity": max(complexities, default=0),
+            "duplication_percentage": round(duplicated_lines / significant_lines * 100, 2) if significant_lines else 0.0,
+            "languages": {language: dict(stats) for language, stats in per_language.items()},
+            "files_from_cache": cached,
+            "files_skipped": skipped
+        }
@@ -0,0 +1,146 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from services.analysis_service import CommitAggregator
+
+
+class CommitIndex:
+    """
+    Persistent per-repository commit aggregates (SQLite).
+
+    Stores category counts, per-author counts, day-of-week histograms,
+    active days and the head SHA last indexed. A refresh asks for exactly
+    the commits between that SHA and the current head (a compare, so
+    merged branches with older commit dates are included) and merges them
+    into the stored aggregates, so after the first run its cost depends on
+    the number of new commits rather than on the size of the history.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Repository key -> [lock, holders and waiters]; dropped once unused
+        self._repo_locks: Dict[str, List] = {}
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS repo_state (
+                repo TEXT PRIMARY KEY,
+                head_sha TEXT NOT NULL,
+                total_commits INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS repo_counts (
+                repo TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (repo, kind, key)
+            );
+        """)
+        self._db.commit()
+
+    @asynccontextmanager
+    async def _repo_lock(self, key: str) -> AsyncIterator[None]:
+        entry = self._repo_locks.get(key)
+        if entry is None:
+            entry = self._repo_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._repo_locks[key]
+
+    async def refresh(self, github_service, owner: str, repo: str, branch: Optional[str] = None) -> Dict:
+        """Bring the stored aggregates up to date and return the commit analysis"""
+        key = f"{owner}/{repo}@{branch or 'HEAD'}".lower()
+        async with self._repo_lock(key):
+            indexed_sha, aggregator = await asyncio.to_thread(self._load, key)
+            head_sha = await github_service.get_head_sha(owner, repo, branch or "HEAD")
+
+            delta = CommitAggregator()
+            if head_sha is not None and head_sha != indexed_sha:
+                commits = None
+                if indexed_sha is not None:
+                    commits = await github_service.compare_commits(owner, repo, indexed_sha, head_sha)
+                rebuild = commits is None
+                if rebuild:
+                    # First run, or history was rewritten (force push): index everything
+                    async for page in github_service.iter_commits(owner, repo, sha=head_sha):
+                        delta.add_many(page)
+                else:
+                    delta.add_many(commits)
+
+                await asyncio.to_thread(self._save, key, head_sha, delta, rebuild)
+                if rebuild:
+                    aggregator = delta
+                else:
+                    aggregator.merge(delta)
+
+            analysis = aggregator.result()
+            analysis["indexed_head"] = head_sha or indexed_sha
+            analysis["new_commits"] = delta.total_commits
+            return analysis
+
+    def _load(self, key: str) -> Tuple[Optional[str], CommitAggregator]:
+        aggregator = CommitAggregator()
+        with self._lock:
+            state = self._db.execute(
+                "SELECT head_sha, total_commits FROM repo_state WHERE repo = ?", (key,)
+            ).fetchone()
+            if state is None:
+                return None, aggregator
+            rows = self._db.execute(
+                "SELECT kind, key, count FROM repo_counts WHERE repo = ?", (key,)
+            ).fetchall()
+
+        aggregator.total_commits = state[1]
+        for kind, name, count in rows:
+            if kind == 'category':
+                aggregator.categories[name] = count
+            elif kind == 'author':
+                aggregator.author_stats[name] = count
+            elif kind == 'weekday':
+                aggregator.frequency[name] = count
+            elif kind == 'day':
+                aggregator.active_days.add(name)
+        return state[0], aggregator
+
+    def _save(self, key: str, head_sha: str, delta: CommitAggregator, rebuild: bool) -> None:
+        rows = [(key, 'category', name, count) for name, count in delta.categories.items() if count]
+        rows += [(key, 'author', name, count) for name, count in delta.author_stats.items()]
+        rows += [(key, 'weekday', name, count) for name, count in delta.frequency.items()]
+        rows += [(key, 'day', day, 1) for day in delta.active_days]
+
+        with self._lock:
+            if rebuild:
+                self._db.execute("DELETE FROM repo_counts WHERE repo = ?", (key,))
+                self._db.execute("DELETE FROM repo_state WHERE repo = ?", (key,))
+            self._db.executemany("""
+                INSERT INTO repo_counts (repo, kind, key, count) VALUES (?, ?, ?, ?)
+                ON CONFLICT (repo, kind, key) DO UPDATE SET
+                    count = CASE WHEN repo_counts.kind = 'day' THEN 1
+                                 ELSE repo_counts.count + excluded.count END
+            """, rows)
+            self._db.execute("""
+                INSERT INTO repo_state (repo, head_sha, total_commits, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (repo) DO UPDATE SET
+                    head_sha = excluded.head_sha,
+                    total_commits = repo_state.total_commits + excluded.total_commits,
+                    updated_at = excluded.updated_at
+            """, (key, head_sha, delta.total_commits, time.time()))
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
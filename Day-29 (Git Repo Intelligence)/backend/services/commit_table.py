@@ -0,0 +1,221 @@
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.analysis_service import CommitClassifier, default_classifier
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+# 1970-01-01 was a Thursday; shifting by 3 days makes week buckets start on Monday
+WEEK_OFFSET = 3 * DAY
+
+INTERVALS = ("hour", "day", "week", "month")
+
+
+class CommitTable:
+    """
+    Columnar view of a commit history: one NumPy array per field
+    (timestamp, author code, category code) so time-series aggregations
+    run vectorized instead of looping over dicts. Line counts are not
+    included: commit listings carry no per-commit stats.
+    """
+
+    def __init__(self, timestamps: np.ndarray, authors: np.ndarray, categories: np.ndarray,
+                 author_names: List[str], category_names: List[str]):
+        self.timestamps = timestamps
+        self.authors = authors
+        self.categories = categories
+        self.author_names = author_names
+        self.category_names = category_names
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_commits(cls, commits: Iterable[Dict], classifier: Optional[CommitClassifier] = None) -> "CommitTable":
+        builder = CommitTableBuilder(classifier)
+        builder.add_many(commits)
+        return builder.build()
+
+    @classmethod
+    async def from_pages(cls, pages: AsyncIterator[List[Dict]],
+                         classifier: Optional[CommitClassifier] = None) -> "CommitTable":
+        builder = CommitTableBuilder(classifier)
+        async for page in pages:
+            builder.add_many(page)
+        return builder.build()
+
+    def bucket(self, interval: str, timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """Integer period index of each timestamp for the given interval"""
+        ts = self.timestamps if timestamps is None else timestamps
+        if interval == "hour":
+            return ts // HOUR
+        if interval == "day":
+            return ts // DAY
+        if interval == "week":
+            return (ts + WEEK_OFFSET) // WEEK
+        if interval == "month":
+            return ts.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+        raise ValueError(f"Unsupported interval '{interval}', expected one of {', '.join(INTERVALS)}")
+
+    @staticmethod
+    def period_label(period: int, interval: str) -> str:
+        if interval == "hour":
+            return str(np.datetime64(int(period) * HOUR, "s").astype("datetime64[h]"))
+        if interval == "day":
+            return str(np.datetime64(int(period), "D"))
+        if interval == "week":
+            return str(np.datetime64(int(period) * WEEK - WEEK_OFFSET, "s").astype("datetime64[D]"))
+        return str(np.datetime64(int(period), "M"))
+
+    def activity(self, interval: str = "week", window: int = 4) -> Dict:
+        """Commits per period with a trailing rolling sum, plus hour/weekday histograms"""
+        if not len(self):
+            return {"interval": interval, "window": window, "series": [],
+                    "hour_of_day": [0] * 24, "day_of_week": [0] * 7}
+
+        buckets = self.bucket(interval)
+        first = int(buckets.min())
+        counts = np.bincount(buckets - first)
+        window = max(1, window)
+        cumulative = np.concatenate(([0], np.cumsum(counts)))
+        rolling = cumulative[1:] - cumulative[np.maximum(np.arange(1, len(counts) + 1) - window, 0)]
+
+        category_counts = np.zeros((len(counts), len(self.category_names)), dtype=np.int64)
+        np.add.at(category_counts, (buckets - first, self.categories), 1)
+
+        days = self.timestamps // DAY
+        return {
+            "interval": interval,
+            "window": window,
+            "series": [
+                {
+                    "period": self.period_label(first + offset, interval),
+                    "commits": int(counts[offset]),
+                    "rolling_commits": int(rolling[offset]),
+                    "categories": {
+                        name: int(category_counts[offset, code])
+                        for code, name in enumerate(self.category_names) if category_counts[offset, code]
+                    }
+                }
+                for offset in range(len(counts))
+            ],
+            "hour_of_day": np.bincount((self.timestamps % DAY) // HOUR, minlength=24).tolist(),
+            "day_of_week": np.bincount((days + 3) % 7, minlength=7).tolist()
+        }
+
+    def bus_factor(self, threshold: float = 0.5) -> Dict:
+        """Smallest number of authors that together made `threshold` of the commits"""
+        if not len(self):
+            return {"bus_factor": 0, "threshold": threshold, "total_authors": 0, "key_authors": []}
+
+        counts = np.bincount(self.authors, minlength=len(self.author_names))
+        order = np.argsort(counts)[::-1]
+        shares = np.cumsum(counts[order]) / len(self)
+        factor = int(np.searchsorted(shares, threshold) + 1)
+        factor = min(factor, int(np.count_nonzero(counts)))
+        return {
+            "bus_factor": factor,
+            "threshold": threshold,
+            "total_authors": int(np.count_nonzero(counts)),
+            "key_authors": [
+                {
+                    "name": self.author_names[code],
+                    "commit_count": int(counts[code]),
+                    "share": round(float(counts[code]) / len(self), 4)
+                }
+                for code in order[:factor]
+            ]
+        }
+
+    def author_churn(self, interval: str = "month", inactive_days: int = 90) -> Dict:
+        """
+        Per period: active authors, authors making their first commit, and
+        authors making their last commit who have since been inactive for
+        `inactive_days` (relative to the newest commit).
+        """
+        if not len(self):
+            return {"interval": interval, "inactive_days": inactive_days, "series": [],
+                    "total_authors": 0, "active_authors": 0, "churned_authors": 0}
+
+        author_count = len(self.author_names)
+        first_seen = np.full(author_count, np.iinfo(np.int64).max, dtype=np.int64)
+        last_seen = np.zeros(author_count, dtype=np.int64)
+        np.minimum.at(first_seen, self.authors, self.timestamps)
+        np.maximum.at(last_seen, self.authors, self.timestamps)
+        churned = last_seen < self.timestamps.max() - inactive_days * DAY
+
+        buckets = self.bucket(interval)
+        first = int(buckets.min())
+        length = int(buckets.max()) - first + 1
+        active_pairs = np.unique((buckets - first) * author_count + self.authors)
+        active = np.bincount(active_pairs // author_count, minlength=length)
+        joined = np.bincount(self.bucket(interval, first_seen) - first, minlength=length)
+        left = np.bincount(self.bucket(interval, last_seen[churned]) - first, minlength=length)
+
+        return {
+            "interval": interval,
+            "inactive_days": inactive_days,
+            "series": [
+                {
+                    "period": self.period_label(first + offset, interval),
+                    "active_authors": int(active[offset]),
+                    "new_authors": int(joined[offset]),
+                    "churned_authors": int(left[offset])
+                }
+                for offset in range(length)
+            ],
+            "total_authors": author_count,
+            "active_authors": int(author_count - churned.sum()),
+            "churned_authors": int(churned.sum())
+        }
+
+
+class CommitTableBuilder:
+    """Accumulates commit pages column by column and builds a CommitTable"""
+
+    def __init__(self, classifier: Optional[CommitClassifier] = None):
+        self.classifier = classifier or default_classifier
+        self.category_names = self.classifier.categories
+        self._category_codes = {name: code for code, name in enumerate(self.category_names)}
+        self._author_codes: Dict[str, int] = {}
+        self._dates: List[str] = []
+        self._authors: List[int] = []
+        self._categories: List[int] = []
+
+    def add_many(self, commits: Iterable[Dict]) -> None:
+        classify = self.classifier.classify
+        author_codes = self._author_codes
+        category_codes = self._category_codes
+        for commit in commits:
+            info = commit.get('commit') or {}
+            author_info = info.get('author') or {}
+            date_str = author_info.get('date')
+            if not date_str:
+                continue
+            self._dates.append(date_str)
+            self._authors.append(author_codes.setdefault(author_info.get('name', 'Unknown'), len(author_codes)))
+            self._categories.append(category_codes[classify(info.get('message', ''))])
+
+    def build(self) -> CommitTable:
+        return CommitTable(
+            timestamps=parse_timestamps(self._dates),
+            authors=np.asarray(self._authors, dtype=np.int64),
+            categories=np.asarray(self._categories, dtype=np.int64),
+            author_names=list(self._author_codes),
+            category_names=self.category_names
+        )
+
+
+def parse_timestamps(dates: List[str]) -> np.ndarray:
+    """Parse ISO-8601 dates to epoch seconds; UTC ('Z') dates are parsed vectorized"""
+    if not dates:
+        return np.zeros(0, dtype=np.int64)
+    if all(date_str.endswith('Z') for date_str in dates):
+        return np.array([date_str[:19] for date_str in dates], dtype="datetime64[s]").astype(np.int64)
+    return np.array(
+        [int(datetime.fromisoformat(date_str.replace('Z', '+00:00')).timestamp()) for date_str in dates],
+        dtype=np.int64
+    )
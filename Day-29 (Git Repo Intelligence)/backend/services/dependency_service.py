@@ -1,21 +1,48 @@
+import asyncio
 import json
 import re
 from typing import Dict, List, Optional
+from xml.etree import ElementTree
+
+from services.advisory_index import AdvisoryIndex, advisory_index_from_env
+from services.manifest_parsers import (
+    decode_json_value, iter_lines, iter_toml_tables, iter_xml_events,
+    parse_toml, read_json_object, skip_json_value, tomllib
+)
+
+# Gradle dependency declarations, in string ("g:a:v") and map (group: ..., name: ...) notation
+GRADLE_CONFIGURATIONS = (
+    r"(implementation|api|compile|compileOnly|runtimeOnly|runtime|annotationProcessor|kapt|"
+    r"testImplementation|testCompile|testCompileOnly|testRuntimeOnly|androidTestImplementation)"
+)
+GRADLE_STRING_DEPENDENCY = re.compile(
+    GRADLE_CONFIGURATIONS
+    + r"""\s*\(?\s*(?:(?:enforced)?[pP]latform\s*\(\s*)?['"]([^'":\s]+):([^'":\s]+)(?::([^'"\s@]+))?[^'"]*['"]"""
+)
+GRADLE_MAP_DEPENDENCY = re.compile(
+    GRADLE_CONFIGURATIONS
+    + r"""\s*\(?\s*group\s*[:=]\s*['"]([^'"]+)['"]\s*,\s*name\s*[:=]\s*['"]([^'"]+)['"]"""
+    + r"""(?:\s*,\s*version\s*[:=]\s*['"]([^'"]+)['"])?"""
+)
+GRADLE_VARIABLE = re.compile(r"""^\s*(?:ext\.|val\s+|def\s+|set\(\s*['"])?(\w+)['"]?\s*[=,]\s*['"]([^'"$]+)['"]""")
+MAVEN_PROPERTY = re.compile(r"\$\{([^}]+)\}")
+GO_VERSION = re.compile(r"v(\d+)\.(\d+)\.(\d+)")
 
 class DependencyService:
-    
-    async def analyze_dependencies(self, github_service, owner: str, repo: str) -> Dict:
-        """Analyze project dependencies from various package managers"""
-        dependencies = {
-            "package_managers": [],
-            "total_dependencies": 0,
-            "dependencies": {},
-            "dev_dependencies": {},
-            "outdated_dependencies": []
-        }
 
-        # Check for different package manager files
-        package_files = {
+    # Directories that hold vendored or generated code rather than project manifests
+    IGNORED_DIRS = {
+        "node_modules", "vendor", "third_party", "bower_components",
+        ".git", ".venv", "venv", "site-packages", "dist", "build"
+    }
+
+    def __init__(self, max_manifests: int = 50, max_concurrency: int = 8,
+                 advisories: Optional[AdvisoryIndex] = None):
+        self.max_manifests = max_manifests
+        self.max_concurrency = max_concurrency
+        # Offline advisory / latest-version index (None when disabled)
+        self.advisories = advisories if advisories is not None else advisory_index_from_env()
+        self.package_files = {
             "package.json": self._analyze_npm_dependencies,
             "requirements.txt": self._analyze_python_dependencies,
             "Pipfile": self._analyze_pipfile_dependencies,
@@ -23,19 +50,99 @@ class DependencyService:
             "build.gradle": self._analyze_gradle_dependencies,
             "Gemfile": self._analyze_ruby_dependencies,
             "composer.json": self._analyze_composer_dependencies,
-            "go.mod": self._analyze_go_dependencies
+            "go.mod": self._analyze_go_dependencies,
+            "build.gradle.kts": self._analyze_gradle_dependencies,
+            # Lockfiles: every resolved package, plus the dependency graph where recorded
+            "package-lock.json": self._analyze_npm_lockfile,
+            "poetry.lock": self._analyze_poetry_lockfile,
+            "Cargo.lock": self._analyze_cargo_lockfile,
+            "go.sum": self._analyze_go_sum
+        }
+        self.lockfiles = {"package-lock.json", "poetry.lock", "Cargo.lock", "go.sum"}
+
+    def empty_result(self) -> Dict:
+        """Dependency analysis result with nothing detected"""
+        return {
+            "package_managers": [],
+            "total_dependencies": 0,
+            "resolved_dependencies": 0,
+            "dependencies": {},
+            "dev_dependencies": {},
+            "dependency_graph": {},
+            "outdated_dependencies": [],
+            "vulnerabilities": []
         }
 
-        for filename, analyzer in package_files.items():
-            content = await github_service.get_file_content(owner, repo, filename)
+    def find_manifests(self, tree: Optional[Dict]) -> List[str]:
+        """
+        List manifest paths present in a recursive tree listing, including
+        nested manifests in monorepos (e.g. packages/*/package.json).
+        Falls back to the root manifest names when no listing is available.
+        """
+        if not tree or 'tree' not in tree:
+            return list(self.package_files)
+
+        manifests = []
+        for item in tree['tree']:
+            if item.get('type') != 'blob':
+                continue
+            parts = item['path'].split('/')
+            if parts[-1] not in self.package_files:
+                continue
+            if any(part in self.IGNORED_DIRS for part in parts[:-1]):
+                continue
+            manifests.append(item['path'])
+
+        if tree.get('truncated'):
+            # The listing is incomplete, so make sure root manifests are probed
+            manifests.extend(name for name in self.package_files if name not in manifests)
+
+        manifests.sort(key=lambda path: (path.count('/'), path))
+        return manifests[:self.max_manifests]
+    
+    async def analyze_dependencies(self, github_service, owner: str, repo: str, tree: Optional[Dict] = None) -> Dict:
+        """Analyze project dependencies from various package managers"""
+        dependencies = self.empty_result()
+
+        if tree is None:
+            tree = await github_service.get_tree(owner, repo)
+        manifests = self.find_manifests(tree)
+        blob_shas = {item['path']: item.get('sha') for item in tree.get('tree', []) if item.get('type') == 'blob'}
+
+        # Fetch only manifests that exist, concurrently
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(path: str) -> Optional[str]:
+            async with semaphore:
+                return await github_service.get_file_content(owner, repo, path, sha=blob_shas.get(path))
+
+        contents = await asyncio.gather(*(fetch(path) for path in manifests))
+
+        for path, content in zip(manifests, contents):
             if content:
+                analyzer = self.package_files[path.split('/')[-1]]
                 result = analyzer(content)
                 if result:
-                    dependencies["package_managers"].append(filename)
-                    dependencies["dependencies"][filename] = result.get("dependencies", {})
+                    dependencies["package_managers"].append(path)
+                    dependencies["dependencies"][path] = result.get("dependencies", {})
                     if "dev_dependencies" in result:
-                        dependencies["dev_dependencies"][filename] = result["dev_dependencies"]
-                    dependencies["total_dependencies"] += len(result.get("dependencies", {}))
+                        dependencies["dev_dependencies"][path] = result["dev_dependencies"]
+                    if "graph" in result:
+                        dependencies["dependency_graph"][path] = result["graph"]
+                    # Lockfiles list transitive packages too, so they are counted separately
+                    if path.split('/')[-1] in self.lockfiles:
+                        dependencies["resolved_dependencies"] += len(result.get("dependencies", {}))
+                    else:
+                        dependencies["total_dependencies"] += len(result.get("dependencies", {}))
+
+        if self.advisories is not None:
+            declared = {
+                path: {**dependencies["dependencies"].get(path, {}), **dependencies["dev_dependencies"].get(path, {})}
+                for path in dependencies["package_managers"]
+            }
+            outdated, vulnerabilities = await asyncio.to_thread(self.advisories.audit, declared)
+            dependencies["outdated_dependencies"] = outdated
+            dependencies["vulnerabilities"] = vulnerabilities
 
         return dependencies
 
@@ -76,63 +183,112 @@ class DependencyService:
 
     def _analyze_pipfile_dependencies(self, content: str) -> Optional[Dict]:
         """Analyze Pipfile dependencies"""
-        # Simple parsing for [packages] and [dev-packages] sections
-        dependencies = {}
-        dev_dependencies = {}
-        
-        lines = content.split('\n')
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('[packages]'):
-                current_section = 'packages'
-            elif line.startswith('[dev-packages]'):
-                current_section = 'dev-packages'
-            elif line.startswith('['):
-                current_section = None
-            elif current_section and '=' in line:
-                package, version = line.split('=', 1)
-                package = package.strip()
-                version = version.strip().strip('"')
-                
-                if current_section == 'packages':
-                    dependencies[package] = version
-                elif current_section == 'dev-packages':
-                    dev_dependencies[package] = version
-        
+        data = parse_toml(content)
+        if data is None:
+            return None
+
+        def requirement(spec) -> str:
+            if isinstance(spec, dict):
+                return spec.get('version') or spec.get('ref') or spec.get('git') or spec.get('path') or "*"
+            return str(spec)
+
+        dependencies = {name: requirement(spec) for name, spec in data.get('packages', {}).items()}
+        dev_dependencies = {name: requirement(spec) for name, spec in data.get('dev-packages', {}).items()}
         return {
             "dependencies": dependencies,
             "dev_dependencies": dev_dependencies
         } if dependencies or dev_dependencies else None
 
     def _analyze_maven_dependencies(self, content: str) -> Optional[Dict]:
-        """Analyze Maven pom.xml dependencies"""
+        """Analyze Maven pom.xml dependencies (streamed through a pull parser)"""
+        properties = {}
+        declared = []
+        fields: Dict[str, str] = {}
+        path: List[str] = []
+        try:
+            for event, element in iter_xml_events(content):
+                tag = element.tag.rsplit('}', 1)[-1]
+                if event == "start":
+                    path.append(tag)
+                    continue
+
+                text = (element.text or '').strip()
+                if len(path) == 3 and path[1] == 'properties':
+                    properties[tag] = text
+                elif len(path) == 2 and tag in ('groupId', 'artifactId', 'version'):
+                    properties[f"project.{tag}"] = text
+                elif len(path) == 3 and path[1] == 'parent' and tag in ('groupId', 'version'):
+                    properties[f"project.parent.{tag}"] = text
+                elif len(path) >= 2 and path[-2] == 'dependency':
+                    fields[tag] = text
+                elif tag == 'dependency':
+                    # Plugin dependencies are build tooling, not project dependencies
+                    if 'plugin' not in path:
+                        declared.append(('dependencyManagement' in path, fields))
+                    fields = {}
+                path.pop()
+                element.clear()
+        except ElementTree.ParseError:
+            return None
+
+        properties.setdefault('project.version', properties.get('project.parent.version', ''))
+        properties.setdefault('project.groupId', properties.get('project.parent.groupId', ''))
+
+        def resolve(value: str) -> str:
+            for _ in range(5):
+                resolved = MAVEN_PROPERTY.sub(lambda m: properties.get(m.group(1), m.group(0)), value)
+                if resolved == value:
+                    break
+                value = resolved
+            return value
+
+        managed = {}
         dependencies = {}
-        
-        # Simple regex to find dependencies (this is basic, XML parsing would be better)
-        dep_pattern = r'<dependency>.*?<groupId>(.*?)</groupId>.*?<artifactId>(.*?)</artifactId>.*?<version>(.*?)</version>.*?</dependency>'
-        matches = re.findall(dep_pattern, content, re.DOTALL)
-        
-        for group_id, artifact_id, version in matches:
-            package_name = f"{group_id}:{artifact_id}"
-            dependencies[package_name] = version.strip()
-        
-        return {"dependencies": dependencies} if dependencies else None
+        dev_dependencies = {}
+        # Managed versions first: <dependencyManagement> may follow <dependencies>
+        for in_management, dep in sorted(declared, key=lambda item: not item[0]):
+            if 'groupId' not in dep or 'artifactId' not in dep:
+                continue
+            package_name = f"{resolve(dep['groupId'])}:{resolve(dep['artifactId'])}"
+            version = resolve(dep['version']) if dep.get('version') else None
+            if in_management:
+                managed[package_name] = version or "managed"
+                continue
+            target = dev_dependencies if dep.get('scope') == 'test' else dependencies
+            target[package_name] = version or managed.get(package_name, "managed")
+
+        if not dependencies and not dev_dependencies:
+            return None
+        result = {"dependencies": dependencies, "dev_dependencies": dev_dependencies}
+        if managed:
+            result["managed_dependencies"] = managed
+        return result
 
     def _analyze_gradle_dependencies(self, content: str) -> Optional[Dict]:
-        """Analyze Gradle build.gradle dependencies"""
+        """Analyze Gradle build.gradle / build.gradle.kts dependencies (line scan)"""
         dependencies = {}
-        
-        # Find implementation, compile, api dependencies
-        dep_pattern = r'(?:implementation|compile|api)\s+[\'"]([^:]+):([^:]+):([^\'\"]+)[\'"]'
-        matches = re.findall(dep_pattern, content)
-        
-        for group, name, version in matches:
-            package_name = f"{group}:{name}"
-            dependencies[package_name] = version
-        
-        return {"dependencies": dependencies} if dependencies else None
+        dev_dependencies = {}
+        variables = {}
+
+        for line in iter_lines(content):
+            if line.lstrip().startswith('//'):
+                continue
+            variable = GRADLE_VARIABLE.match(line)
+            if variable:
+                variables[variable.group(1)] = variable.group(2)
+            match = GRADLE_STRING_DEPENDENCY.search(line) or GRADLE_MAP_DEPENDENCY.search(line)
+            if not match:
+                continue
+            configuration, group, name, version = match.groups()
+            if version and '$' in version:
+                key = version.strip('${}').split('.')[-1]
+                version = variables.get(key, version)
+            target = dev_dependencies if configuration.startswith(('test', 'androidTest')) else dependencies
+            target[f"{group}:{name}"] = version or "managed"
+
+        if not dependencies and not dev_dependencies:
+            return None
+        return {"dependencies": dependencies, "dev_dependencies": dev_dependencies}
 
     def _analyze_ruby_dependencies(self, content: str) -> Optional[Dict]:
         """Analyze Ruby Gemfile dependencies"""
@@ -180,7 +336,138 @@ class DependencyService:
                 # Parse "module version" format
                 parts = line.replace('require ', '').split()
                 if len(parts) >= 2:
-                    module, version = parts, parts[1]
+                    module, version = parts[0], parts[1]
                     dependencies[module] = version
         
         return {"dependencies": dependencies} if dependencies else None
+
+    def _analyze_npm_lockfile(self, content: str) -> Optional[Dict]:
+        """
+        Resolved packages and dependency graph from package-lock.json. The
+        document is walked member by member; each package entry is decoded
+        on its own and the legacy "dependencies" tree is skipped unless it is
+        the only one present (lockfile v1).
+        """
+        resolved: Dict[str, tuple] = {}
+        graph: Dict[str, List[str]] = {}
+        seen_packages = False
+
+        def record(name: str, depth: int, version: Optional[str], dev: bool, requires) -> None:
+            current = resolved.get(name)
+            # Hoisted (shallowest) copies win over nested duplicates
+            if current is None or depth < current[0]:
+                resolved[name] = (depth, version or "unknown", dev)
+                if requires:
+                    graph[name] = sorted(requires)
+
+        def package_entry(key: str, pos: int) -> int:
+            entry, end = decode_json_value(content, pos)
+            if not key or not isinstance(entry, dict) or entry.get('link'):
+                return end
+            name = entry.get('name') or key.rsplit('node_modules/', 1)[-1]
+            requires = {**entry.get('dependencies', {}), **entry.get('optionalDependencies', {})}
+            record(name, key.count('node_modules/'), entry.get('version'),
+                   bool(entry.get('dev') or entry.get('devOptional')), requires)
+            return end
+
+        def legacy_entry(name: str, pos: int, depth: int) -> int:
+            entry = {}
+
+            def field(key: str, value_pos: int) -> int:
+                if key == 'dependencies':
+                    return read_json_object(content, value_pos, lambda n, p: legacy_entry(n, p, depth + 1))
+                if key in ('version', 'dev', 'requires'):
+                    entry[key], end = decode_json_value(content, value_pos)
+                    return end
+                return skip_json_value(content, value_pos)
+
+            end = read_json_object(content, pos, field)
+            record(name, depth, entry.get('version'), bool(entry.get('dev')), entry.get('requires'))
+            return end
+
+        def top_level(key: str, pos: int) -> int:
+            nonlocal seen_packages
+            if key == 'packages':
+                seen_packages = True
+                return read_json_object(content, pos, package_entry)
+            if key == 'dependencies' and not seen_packages:
+                return read_json_object(content, pos, lambda name, p: legacy_entry(name, p, 1))
+            return skip_json_value(content, pos)
+
+        try:
+            read_json_object(content, 0, top_level)
+        except (ValueError, IndexError):
+            return None
+
+        return self._lockfile_result(resolved, graph)
+
+    def _analyze_poetry_lockfile(self, content: str) -> Optional[Dict]:
+        """Resolved packages and dependency graph from poetry.lock, one [[package]] table at a time"""
+        resolved: Dict[str, tuple] = {}
+        graph: Dict[str, List[str]] = {}
+        try:
+            # Per-file hashes are most of a poetry.lock and are not needed
+            for package in iter_toml_tables(content, skip_arrays=("files",)):
+                name = package.get('name')
+                if not name:
+                    continue
+                groups = package.get('groups')
+                dev = package.get('category') == 'dev' or (groups is not None and 'main' not in groups)
+                resolved[name] = (0, package.get('version', 'unknown'), dev)
+                if package.get('dependencies'):
+                    graph[name] = sorted(package['dependencies'])
+        except tomllib.TOMLDecodeError:
+            return None
+        return self._lockfile_result(resolved, graph)
+
+    def _analyze_cargo_lockfile(self, content: str) -> Optional[Dict]:
+        """Resolved crates and dependency graph from Cargo.lock"""
+        resolved: Dict[str, tuple] = {}
+        graph: Dict[str, List[str]] = {}
+        try:
+            for package in iter_toml_tables(content):
+                name = package.get('name')
+                if not name:
+                    continue
+                # Entries are "name", "name version" or "name version (source)"
+                requires = [dependency.split()[0] for dependency in package.get('dependencies', [])]
+                if requires:
+                    graph[name] = sorted(set(requires))
+                # Crates without a source are the workspace's own members
+                if package.get('source'):
+                    resolved[name] = (0, package.get('version', 'unknown'), False)
+        except tomllib.TOMLDecodeError:
+            return None
+        return self._lockfile_result(resolved, graph)
+
+    def _analyze_go_sum(self, content: str) -> Optional[Dict]:
+        """Modules (and the version Go selects) from go.sum"""
+        modules: Dict[str, str] = {}
+        for line in iter_lines(content):
+            parts = line.split()
+            if len(parts) != 3:
+                continue
+            module, version = parts[0], parts[1]
+            # "/go.mod" lines only pin a module's go.mod used during resolution
+            if version.endswith('/go.mod'):
+                continue
+            current = modules.get(module)
+            if current is None or self._go_version_key(version) > self._go_version_key(current):
+                modules[module] = version
+        return {"dependencies": modules} if modules else None
+
+    @staticmethod
+    def _go_version_key(version: str) -> tuple:
+        match = GO_VERSION.match(version)
+        # Pre-releases and pseudo-versions sort before the release they precede
+        return (tuple(int(part) for part in match.groups()), '-' not in version) if match else ((0, 0, 0), False)
+
+    @staticmethod
+    def _lockfile_result(resolved: Dict[str, tuple], graph: Dict[str, List[str]]) -> Optional[Dict]:
+        if not resolved:
+            return None
+        return {
+            "dependencies": {name: version for name, (_, version, dev) in resolved.items() if not dev},
+            "dev_dependencies": {name: version for name, (_, version, dev) in resolved.items() if dev},
+            "graph": graph
+        }
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable
+
+
+class PlanStep:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        critical: bool = True,
+        default: Any = None,
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.critical = critical
+        self.default = default
+
+
+class PlanResult:
+    def __init__(self, results: Dict[str, Any], errors: Dict[str, str]):
+        self.results = results
+        self.errors = errors
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+    @property
+    def failed_sources(self) -> list:
+        return sorted(self.errors)
+
+
+class ExecutionPlan:
+    """
+    Dependency-aware async execution plan.
+
+    Each step starts as soon as the steps it depends on have finished and
+    receives their results as keyword arguments. At most `max_concurrency`
+    steps run at once. A failing non-critical step resolves to its default
+    value and is reported in `PlanResult.errors`; a failing critical step
+    cancels the rest of the plan and re-raises.
+    """
+
+    def __init__(self, max_concurrency: int = 6):
+        self.max_concurrency = max_concurrency
+        self.steps: Dict[str, PlanStep] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        critical: bool = True,
+        default: Any = None,
+    ) -> "ExecutionPlan":
+        """Register a step; dependencies must be added before their dependents"""
+        for dependency in depends_on:
+            if dependency not in self.steps:
+                raise ValueError(f"Unknown dependency '{dependency}' for step '{name}'")
+        self.steps[name] = PlanStep(name, func, depends_on, critical, default)
+        return self
+
+    async def run(self) -> PlanResult:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+        errors: Dict[str, str] = {}
+
+        async def run_step(step: PlanStep) -> Any:
+            kwargs = {}
+            for dependency in step.depends_on:
+                kwargs[dependency] = await tasks[dependency]
+            try:
+                async with semaphore:
+                    return await step.func(**kwargs)
+            except Exception as e:
+                if step.critical:
+                    raise
+                errors[step.name] = str(e) or e.__class__.__name__
+                return step.default
+
+        for step in self.steps.values():
+            tasks[step.name] = asyncio.create_task(run_step(step))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return PlanResult({name: task.result() for name, task in tasks.items()}, errors)
+
@@ -0,0 +1,160 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# Everything /analyze needs from the REST repository, languages, readme and
+# commits endpoints, in one repository selection
+REPOSITORY_FIELDS = """
+fragment RepositoryFields on Repository {
+  name
+  nameWithOwner
+  description
+  stargazerCount
+  forkCount
+  issues(states: OPEN) { totalCount }
+  pullRequests(states: OPEN) { totalCount }
+  watchers { totalCount }
+  licenseInfo { name }
+  createdAt
+  updatedAt
+  diskUsage
+  primaryLanguage { name }
+  languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+  defaultBranchRef {
+    name
+    target {
+      ... on Commit {
+        history(first: $commits) {
+          nodes { oid message author { name email date user { login } } }
+        }
+      }
+    }
+  }
+  readmeMd: object(expression: "HEAD:README.md") { ... on Blob { text } }
+  readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { text } }
+  readmeRst: object(expression: "HEAD:README.rst") { ... on Blob { text } }
+  readmePlain: object(expression: "HEAD:README") { ... on Blob { text } }
+}
+"""
+
+README_ALIASES = ("readmeMd", "readmeLower", "readmeRst", "readmePlain")
+
+
+class QueryBatcher:
+    """
+    Coalesces lookups made within `window` seconds (or `max_batch` of
+    them) into a single call of `execute`, which receives the distinct keys
+    and returns a result, or an exception, per key. Used to fold concurrent
+    GraphQL lookups into one aliased query.
+    """
+
+    def __init__(self, execute: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                 max_batch: int = 10, window: float = 0.01):
+        self.execute = execute
+        self.max_batch = max_batch
+        self.window = window
+        self.queries = 0
+        self.keys = 0
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        keys = list(dict.fromkeys(key for key, _ in batch))
+        self.queries += 1
+        self.keys += len(keys)
+        try:
+            results = await self.execute(keys)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch:
+            if future.done():
+                continue
+            value = results.get(key)
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def stats(self) -> Dict:
+        return {
+            "queries": self.queries,
+            "keys": self.keys,
+            "avg_batch_size": round(self.keys / self.queries, 2) if self.queries else 0.0
+        }
+
+
+def build_repository_query(count: int) -> str:
+    """Aliased query fetching `count` repositories (r0, r1, ...) in one round-trip"""
+    variables = ", ".join(f"$o{i}: String!, $n{i}: String!" for i in range(count))
+    selections = "\n".join(
+        f"  r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepositoryFields }}" for i in range(count)
+    )
+    return f"query({variables}, $commits: Int!) {{\n{selections}\n}}\n{REPOSITORY_FIELDS}"
+
+
+def repository_bundle(node: Dict) -> Dict:
+    """Convert a RepositoryFields node to the REST-shaped payloads /analyze consumes"""
+    branch = node.get('defaultBranchRef') or {}
+    history = ((branch.get('target') or {}).get('history') or {}).get('nodes') or []
+    readme = next(
+        (node[alias]['text'] for alias in README_ALIASES if node.get(alias) and node[alias].get('text') is not None),
+        None
+    )
+    return {
+        "repository": {
+            "name": node.get('name'),
+            "full_name": node.get('nameWithOwner'),
+            "description": node.get('description'),
+            "stargazers_count": node.get('stargazerCount', 0),
+            "forks_count": node.get('forkCount', 0),
+            # REST counts open pull requests as issues too
+            "open_issues_count": node['issues']['totalCount'] + node['pullRequests']['totalCount'],
+            "watchers_count": node['watchers']['totalCount'],
+            "license": node.get('licenseInfo'),
+            "default_branch": branch.get('name'),
+            "created_at": node.get('createdAt'),
+            "updated_at": node.get('updatedAt'),
+            "size": node.get('diskUsage') or 0,
+            "language": (node.get('primaryLanguage') or {}).get('name')
+        },
+        "languages": {edge['node']['name']: edge['size'] for edge in node['languages']['edges']},
+        "readme": readme,
+        "commits": [
+            {
+                "sha": commit['oid'],
+                "commit": {
+                    "message": commit.get('message', ''),
+                    "author": {
+                        "name": (commit.get('author') or {}).get('name'),
+                        "email": (commit.get('author') or {}).get('email'),
+                        "date": (commit.get('author') or {}).get('date')
+                    }
+                },
+                "author": {"login": ((commit.get('author') or {}).get('user') or {}).get('login')}
+            }
+            for commit in history
+        ]
+    }
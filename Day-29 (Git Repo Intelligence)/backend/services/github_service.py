@@ -1,100 +1,564 @@
+import asyncio
 import httpx
 import base64
 import os
-from typing import Dict, List, Optional
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
 from fastapi import HTTPException
 
+from services.blob_store import BlobStore, blob_store_from_env
+from services.github_graphql import QueryBatcher, build_repository_query, repository_bundle
+from services.http_cache import HTTPCache, cache_from_env
+from services.rate_limiter import RateLimitExceeded, RateLimitScheduler, TokenBudget, scheduler_from_env
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 support in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
 class GitHubService:
-    def __init__(self):
-        self.api_url = "https://api.github.com"
-        self.token = os.getenv('GITHUB_TOKEN')
-        self.headers = {
-            "Authorization": f"token {self.token}",
-            "Accept": "application/vnd.github.v3+json"
-        } if self.token else {"Accept": "application/vnd.github.v3+json"}
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        http2: Optional[bool] = None,
+        cache: Optional[HTTPCache] = None,
+        blobs: Optional[BlobStore] = None,
+        scheduler: Optional[RateLimitScheduler] = None,
+    ):
+        self.api_url = os.getenv('GITHUB_API_URL', "https://api.github.com").rstrip('/')
+        # Tokens (GITHUB_TOKENS or GITHUB_TOKEN) are attached per request by the scheduler
+        self.scheduler = scheduler if scheduler is not None else scheduler_from_env()
+        self.headers = {"Accept": "application/vnd.github.v3+json"}
+
+        # Connection pool settings (constructor arguments win over environment)
+        self.limits = httpx.Limits(
+            max_connections=max_connections or int(os.getenv('GITHUB_MAX_CONNECTIONS', 20)),
+            max_keepalive_connections=max_keepalive_connections or int(os.getenv('GITHUB_MAX_KEEPALIVE', 10)),
+            keepalive_expiry=keepalive_expiry or float(os.getenv('GITHUB_KEEPALIVE_EXPIRY', 30.0)),
+        )
+        self.timeout = httpx.Timeout(
+            timeout or float(os.getenv('GITHUB_TIMEOUT', 30.0)),
+            connect=connect_timeout or float(os.getenv('GITHUB_CONNECT_TIMEOUT', 10.0)),
+        )
+        if http2 is None:
+            http2 = os.getenv('GITHUB_HTTP2', 'true').lower() in ('1', 'true', 'yes')
+        self.http2 = http2 and HTTP2_AVAILABLE
+
+        # Conditional-request cache shared by every GET (None disables caching)
+        self.cache = cache if cache is not None else cache_from_env()
+        # Content-addressed store for file contents, keyed by git blob SHA
+        self.blobs = blobs if blobs is not None else blob_store_from_env()
+
+        # Pages fetched at once when walking paginated listings
+        self.page_concurrency = int(os.getenv('GITHUB_PAGE_CONCURRENCY', 4))
+
+        # GITHUB_FETCH_MODE=graphql fetches repository bundles through GraphQL;
+        # concurrent lookups are folded into one aliased query
+        self.use_graphql = os.getenv('GITHUB_FETCH_MODE', 'rest').lower() == 'graphql'
+        self.graphql_url = os.getenv('GITHUB_GRAPHQL_URL', f"{self.api_url}/graphql")
+        self.graphql_commits = int(os.getenv('GITHUB_GRAPHQL_COMMITS', 100))
+        self.repository_batcher = QueryBatcher(
+            self._fetch_repository_bundles,
+            max_batch=int(os.getenv('GITHUB_GRAPHQL_BATCH_SIZE', 10)),
+            window=float(os.getenv('GITHUB_GRAPHQL_BATCH_WINDOW_MS', 10)) / 1000,
+        )
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self._request_count = 0
+        self._connection_count = 0
+
+    async def start(self) -> None:
+        """Open the shared connection pool (called at app startup)"""
+        if self._client is not None:
+            return
+        self._transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=self.limits)
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            transport=self._transport,
+        )
+
+    async def close(self) -> None:
+        """Close the shared connection pool (called at app shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._transport = None
+
+    async def _trace(self, event_name: str, info: Dict) -> None:
+        """httpcore trace hook used to count newly opened connections"""
+        if event_name == "connection.connect_tcp.complete":
+            self._connection_count += 1
+
+    async def _get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+                   use_cache: bool = True, revalidate: bool = False, attempts: int = 3) -> httpx.Response:
+        """
+        Send a GET request through the response cache and shared connection
+        pool; `revalidate` skips the cache TTL and always asks GitHub (a 304
+        does not count against the rate limit)
+        """
+        if self._client is None:
+            await self.start()
+        request = self._client.build_request("GET", url, params=params, headers=headers)
+        if self.cache is None or not use_cache:
+            return await self._send(request)
+
+        # Cache keys include Authorization, so the token is chosen before the
+        # lookup and the call is pinned to it; a throttled token moves the
+        # whole lookup over to the next token's cache entry
+        for attempt in range(attempts):
+            budget = self.scheduler.preferred()
+            self._authorize(request, budget)
+            throttled = False
+
+            async def send(conditional_headers: Dict[str, str]) -> httpx.Response:
+                nonlocal throttled
+                for name in ("If-None-Match", "If-Modified-Since"):
+                    request.headers.pop(name, None)
+                request.headers.update(conditional_headers)
+                response, throttled = await self._send_once(request, pinned=budget)
+                return response
+
+            response = await self.cache.fetch(request, send, revalidate=revalidate)
+            if not throttled or attempt == attempts - 1:
+                return response
+            await response.aclose()
+        return response
+
+    async def _send(self, request: httpx.Request, attempts: int = 3, resource: str = "core") -> httpx.Response:
+        """Send on whichever token has budget; rate-limited responses are retried"""
+        for attempt in range(attempts):
+            response, throttled = await self._send_once(request, resource)
+            # A rate-limited response is retried on another token or once the budget resets
+            if not throttled or attempt == attempts - 1:
+                return response
+            await response.aclose()
+        return response
+
+    async def _send_once(self, request: httpx.Request, resource: str = "core",
+                         pinned: Optional[TokenBudget] = None) -> Tuple[httpx.Response, bool]:
+        """Send once the scheduler grants budget; returns the response and whether it was throttled"""
+        request.extensions["trace"] = self._trace
+        try:
+            budget = await self.scheduler.acquire(resource=resource, pinned=pinned)
+        except RateLimitExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e),
+                                headers={"Retry-After": str(int(e.retry_after) + 1)})
+        self._authorize(request, budget)
+        self._request_count += 1
+        response = None
+        try:
+            response = await self._client.send(request)
+        finally:
+            throttled = await self.scheduler.release(
+                budget, response.headers if response is not None else None,
+                response.status_code if response is not None else None
+            )
+        return response, throttled
+
+    @staticmethod
+    def _authorize(request: httpx.Request, budget: TokenBudget) -> None:
+        if budget.token:
+            request.headers["Authorization"] = f"token {budget.token}"
+        else:
+            request.headers.pop("Authorization", None)
+
+    def pool_stats(self) -> Dict:
+        """Connection pool statistics"""
+        open_connections = 0
+        idle_connections = 0
+        pool = getattr(self._transport, "_pool", None)
+        if pool is not None:
+            connections = list(pool.connections)
+            open_connections = len(connections)
+            idle_connections = sum(1 for conn in connections if conn.is_idle())
+
+        reused = max(self._request_count - self._connection_count, 0)
+        return {
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "total_requests": self._request_count,
+            "connections_opened": self._connection_count,
+            "reuse_ratio": round(reused / self._request_count, 4) if self._request_count else 0.0
+        }
 
     async def get_repository(self, owner: str, repo: str) -> Dict:
         """Get basic repository information"""
         url = f"{self.api_url}/repos/{owner}/{repo}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code, 
-                    detail=f"Repository not found: {response.text}"
-                )
-            return response.json()
+        response = await self._get(url)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Repository not found: {response.text}"
+            )
+        return response.json()
+
+    async def _graphql(self, query: str, variables: Dict) -> Dict:
+        """POST a GraphQL query; returns the full response body (data and errors)"""
+        if self._client is None:
+            await self.start()
+        request = self._client.build_request(
+            "POST", self.graphql_url, json={"query": query, "variables": variables}
+        )
+        response = await self._send(request, resource="graphql")
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"GraphQL request failed: {response.text}"
+            )
+        return response.json()
+
+    async def get_repository_bundle(self, owner: str, repo: str) -> Dict:
+        """
+        Repository info, languages, README and recent commits in REST shapes,
+        from one GraphQL round-trip shared with any concurrent lookups
+        """
+        return await self.repository_batcher.load((owner, repo))
+
+    async def _fetch_repository_bundles(self, keys: List[tuple]) -> Dict[tuple, object]:
+        variables: Dict = {"commits": min(self.graphql_commits, 100)}
+        for i, (owner, repo) in enumerate(keys):
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = repo
+        body = await self._graphql(build_repository_query(len(keys)), variables)
+
+        data = body.get('data') or {}
+        if not data and body.get('errors'):
+            raise HTTPException(status_code=502, detail=f"GraphQL query failed: {body['errors'][0].get('message')}")
+        errors = {}
+        for error in body.get('errors') or []:
+            path = error.get('path') or []
+            if path:
+                errors[path[0]] = error.get('message', 'GraphQL error')
+        results = {}
+        for i, key in enumerate(keys):
+            node = data.get(f"r{i}")
+            if node is None:
+                message = errors.get(f"r{i}", "Could not resolve to a Repository")
+                results[key] = HTTPException(status_code=404, detail=f"Repository not found: {message}")
+            else:
+                results[key] = repository_bundle(node)
+        return results
+
+    async def get_head_sha(self, owner: str, repo: str, ref: str = "HEAD") -> Optional[str]:
+        """SHA `ref` (default branch head by default) points at; None for empty or missing repositories"""
+        url = f"{self.api_url}/repos/{owner}/{repo}/commits/{ref}"
+        # The sha media type returns just the 40-character SHA. Always revalidated:
+        # result caches key on it, so a TTL-cached head would serve results from before a push
+        response = await self._get(url, headers={"Accept": "application/vnd.github.sha"}, revalidate=True)
+        if response.status_code != 200:
+            return None
+        return response.text.strip() or None
 
     async def get_languages(self, owner: str, repo: str) -> Dict[str, int]:
         """Get programming languages used in repository"""
         url = f"{self.api_url}/repos/{owner}/{repo}/languages"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            return response.json() if response.status_code == 200 else {}
+        response = await self._get(url)
+        return response.json() if response.status_code == 200 else {}
 
     async def get_commits(self, owner: str, repo: str, per_page: int = 100, page: int = 1) -> List[Dict]:
         """Get repository commits"""
+        commits, _ = await self._get_commit_page(owner, repo, {"per_page": min(per_page, 100), "page": page})
+        return commits
+
+    async def _get_commit_page(self, owner: str, repo: str, params: Dict) -> tuple:
+        """Fetch one page of commits, returning the commits and the parsed Link header"""
         url = f"{self.api_url}/repos/{owner}/{repo}/commits"
-        params = {"per_page": per_page, "page": page}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
+        response = await self._get(url, params=params)
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail="Failed to fetch commits"
+            )
+        return response.json(), parse_link_header(response.headers.get('link'))
+
+    async def iter_commits(
+        self,
+        owner: str,
+        repo: str,
+        limit: Optional[int] = None,
+        sha: Optional[str] = None,
+        since: Optional[str] = None,
+        concurrent: bool = True,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Yield pages of commits (newest first) until `limit` commits or the end
+        of history. Once the last page number is known from the Link header the
+        remaining pages are fetched `page_concurrency` at a time, still yielded
+        in order, so at most that many pages are held in memory. With
+        `concurrent=False` pages are fetched one by one, which suits callers
+        that may stop early.
+        """
+        per_page = min(limit, 100) if limit else 100
+        params = {"per_page": per_page}
+        if sha:
+            params["sha"] = sha
+        if since:
+            params["since"] = since
+
+        remaining = limit if limit else float('inf')
+        commits, links = await self._get_commit_page(owner, repo, {**params, "page": 1})
+        if not commits:
+            return
+        yield commits[:remaining] if limit else commits
+        remaining -= len(commits)
+
+        last_page = page_number(links.get('last'))
+        if concurrent and last_page:
+            if limit:
+                last_page = min(last_page, -(-limit // per_page))
+            pending = deque()
+            next_page = 2
+            try:
+                while next_page <= last_page or pending:
+                    while next_page <= last_page and len(pending) < self.page_concurrency:
+                        pending.append(asyncio.create_task(
+                            self._get_commit_page(owner, repo, {**params, "page": next_page})
+                        ))
+                        next_page += 1
+                    commits, _ = await pending.popleft()
+                    if not commits or remaining <= 0:
+                        break
+                    yield commits[:remaining] if limit else commits
+                    remaining -= len(commits)
+            finally:
+                for task in pending:
+                    task.cancel()
+            return
+
+        page = 2
+        while links.get('next') and remaining > 0:
+            commits, links = await self._get_commit_page(owner, repo, {**params, "page": page})
+            if not commits:
+                break
+            yield commits[:remaining] if limit else commits
+            remaining -= len(commits)
+            page += 1
+
+    async def compare_commits(self, owner: str, repo: str, base: str, head: str) -> Optional[List[Dict]]:
+        """
+        Commits reachable from `head` but not from `base` (merged branches
+        included). None when `head` does not descend from `base` (force push)
+        or `base` no longer exists.
+        """
+        url = f"{self.api_url}/repos/{owner}/{repo}/compare/{base}...{head}"
+        commits = []
+        page = 1
+        while True:
+            response = await self._get(url, params={"per_page": 100, "page": page})
+            if response.status_code == 404:
+                return None
             if response.status_code != 200:
                 raise HTTPException(
                     status_code=response.status_code,
-                    detail="Failed to fetch commits"
+                    detail="Failed to compare commits"
                 )
-            return response.json()
+            data = response.json()
+            if data.get('status') not in ('ahead', 'identical'):
+                return None
+            batch = data.get('commits') or []
+            commits.extend(batch)
+            if not batch or len(commits) >= data.get('total_commits', 0):
+                return commits
+            page += 1
 
     async def get_readme(self, owner: str, repo: str) -> Optional[str]:
         """Get repository README content"""
         url = f"{self.api_url}/repos/{owner}/{repo}/readme"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            if response.status_code != 200:
-                return None
-            data = response.json()
-            try:
-                content = base64.b64decode(data['content']).decode('utf-8')
-                return content
-            except Exception:
-                return None
+        response = await self._get(url)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        try:
+            content = base64.b64decode(data['content']).decode('utf-8')
+            return content
+        except Exception:
+            return None
+
+    async def get_file_content(self, owner: str, repo: str, path: str, sha: Optional[str] = None) -> Optional[str]:
+        """Get file content as text; pass the blob `sha` (from the tree) to skip the contents lookup"""
+        if sha is not None:
+            content = await self.get_blob(owner, repo, sha)
+        else:
+            entry = await self._get_file_entry(owner, repo, path)
+            content = entry[1] if entry else None
+        if content is None:
+            return None
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            # Handle binary files
+            return f"[Binary file - {len(content)} bytes]"
+
+    async def _get_file_entry(self, owner: str, repo: str, path: str) -> Optional[tuple]:
+        """Resolve a path to (blob sha, bytes), decoding the contents API only on a store miss"""
+        resolved = await self._resolve_file(owner, repo, path)
+        if resolved is None:
+            return None
+        sha, data = resolved
+        stored = self.blobs.get(sha) if self.blobs else None
+        if stored is not None:
+            return sha, stored
 
-    async def get_file_content(self, owner: str, repo: str, path: str) -> Optional[str]:
+        content = await self._file_bytes(owner, repo, sha, data)
+        if content is None:
+            return None
+        if self.blobs:
+            self.blobs.put(sha, content)
+        return sha, content
+
+    async def _resolve_file(self, owner: str, repo: str, path: str) -> Optional[tuple]:
+        """(blob sha, contents API entry) for a file path, None for missing paths and directories"""
         url = f"{self.api_url}/repos/{owner}/{repo}/contents/{path}"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            if response.status_code != 200:
-                return None
-            data = response.json()
-            
-            if 'content' in data and data['encoding'] == 'base64':
-                try:
-                    content = base64.b64decode(data['content']).decode('utf-8')
-                    return content
-                except UnicodeDecodeError:
-                    # Handle binary files
-                    return f"[Binary file - {data.get('size', 0)} bytes]"
+        response = await self._get(url)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if not isinstance(data, dict) or data.get('type') != 'file':
             return None
+        return data.get('sha'), data
+
+    async def _file_bytes(self, owner: str, repo: str, sha: str, data: Dict) -> Optional[bytes]:
+        """Content of a contents API entry, decoded inline or fetched as a blob"""
+        if data.get('encoding') == 'base64' and data.get('content'):
+            return base64.b64decode(data['content'])
+        # Files over 1 MB come back without inline content
+        return await self._fetch_blob(owner, repo, sha)
+
+    async def get_blob(self, owner: str, repo: str, sha: str) -> Optional[bytes]:
+        """Get raw blob bytes by SHA, from the blob store when possible"""
+        stored = self.blobs.get(sha) if self.blobs else None
+        if stored is not None:
+            return stored
+        content = await self._fetch_blob(owner, repo, sha)
+        if content is not None and self.blobs:
+            self.blobs.put(sha, content)
+        return content
+
+    async def _fetch_blob(self, owner: str, repo: str, sha: str) -> Optional[bytes]:
+        url = f"{self.api_url}/repos/{owner}/{repo}/git/blobs/{sha}"
+        # Blobs are immutable and go to the blob store, so skip the HTTP cache
+        response = await self._get(url, headers={"Accept": "application/vnd.github.raw+json"}, use_cache=False)
+        return response.content if response.status_code == 200 else None
 
+    async def open_file_blob(self, owner: str, repo: str, path: str) -> Optional[tuple]:
+        """
+        Resolve a path to (blob sha, buffer). The buffer is a read-only memory
+        map from the blob store when available (caller closes it), else bytes.
+        A stored blob is mapped directly and never read into memory.
+        """
+        resolved = await self._resolve_file(owner, repo, path)
+        if resolved is None:
+            return None
+        sha, data = resolved
+
+        content = None
+        if self.blobs is None or not self.blobs.has(sha):
+            content = await self._file_bytes(owner, repo, sha, data)
+            if content is None:
+                return None
+            if self.blobs:
+                self.blobs.put(sha, content)
+        view = self.blobs.open(sha) if self.blobs else None
+        if view is not None:
+            return sha, view
+        if content is None:
+            # Evicted between the check and the mapping
+            content = await self._file_bytes(owner, repo, sha, data)
+            if content is None:
+                return None
+        # Store disabled, or the blob is larger than the store
+        return sha, content
 
     async def get_contributors(self, owner: str, repo: str) -> List[Dict]:
         """Get repository contributors"""
         url = f"{self.api_url}/repos/{owner}/{repo}/contributors"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            return response.json() if response.status_code == 200 else []
+        response = await self._get(url)
+        return response.json() if response.status_code == 200 else []
 
     async def get_issues(self, owner: str, repo: str, state: str = "all") -> List[Dict]:
         """Get repository issues"""
         url = f"{self.api_url}/repos/{owner}/{repo}/issues"
         params = {"state": state, "per_page": 100}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            return response.json() if response.status_code == 200 else []
+        response = await self._get(url, params=params)
+        return response.json() if response.status_code == 200 else []
 
-    async def get_tree(self, owner: str, repo: str, sha: str = "HEAD") -> Dict:
+    async def get_tree(self, owner: str, repo: str, sha: str = "HEAD", recursive: bool = True) -> Dict:
         """Get repository file tree"""
-        url = f"{self.api_url}/repos/{owner}/{repo}/git/trees/{sha}?recursive=1"
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            return response.json() if response.status_code == 200 else {}
+        url = f"{self.api_url}/repos/{owner}/{repo}/git/trees/{sha}"
+        response = await self._get(url, params={"recursive": 1} if recursive else None)
+        return response.json() if response.status_code == 200 else {}
+
+    async def walk_tree(self, owner: str, repo: str, sha: str = "HEAD", prefix: str = "") -> AsyncIterator[Dict]:
+        """
+        Yield tree entries (paths relative to the repository root) whose path
+        starts with `prefix`. The directory part of the prefix is resolved
+        level by level so only the matching subtree is listed, and subtrees
+        are walked one by one when GitHub truncates a recursive listing.
+        """
+        base_path = ""
+        directory = prefix.rsplit('/', 1)[0] if '/' in prefix else ""
+        for part in filter(None, directory.split('/')):
+            level = await self.get_tree(owner, repo, sha, recursive=False)
+            entry = next(
+                (item for item in level.get('tree', []) if item['path'] == part and item['type'] == 'tree'),
+                None
+            )
+            if entry is None:
+                return
+            sha = entry['sha']
+            base_path += part + '/'
+
+        async for item in self._walk_subtree(owner, repo, sha, base_path):
+            if item['path'].startswith(prefix):
+                yield item
+
+    async def _walk_subtree(self, owner: str, repo: str, sha: str, base_path: str) -> AsyncIterator[Dict]:
+        tree = await self.get_tree(owner, repo, sha)
+        if not tree.get('truncated'):
+            for item in tree.get('tree', []):
+                yield {**item, 'path': base_path + item['path']}
+            return
+
+        # Recursive listing was cut off: list this level and descend per subtree
+        level = await self.get_tree(owner, repo, sha, recursive=False)
+        for item in level.get('tree', []):
+            path = base_path + item['path']
+            yield {**item, 'path': path}
+            if item['type'] == 'tree':
+                async for child in self._walk_subtree(owner, repo, item['sha'], path + '/'):
+                    yield child
+
+
+def parse_link_header(header: Optional[str]) -> Dict[str, str]:
+    """Parse a GitHub Link header into {rel: url}"""
+    links = {}
+    if not header:
+        return links
+    for part in header.split(','):
+        segments = part.split(';')
+        url = segments[0].strip().strip('<>')
+        for segment in segments[1:]:
+            name, _, value = segment.strip().partition('=')
+            if name == 'rel':
+                links[value.strip('"')] = url
+    return links
+
+
+def page_number(url: Optional[str]) -> Optional[int]:
+    """Extract the page query parameter from a pagination URL"""
+    if not url:
+        return None
+    pages = parse_qs(urlparse(url).query).get('page')
+    return int(pages[0]) if pages else None
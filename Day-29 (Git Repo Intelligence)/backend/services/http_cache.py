@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+# Headers that describe the transfer rather than the body we store
+_SKIPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CacheEntry:
+    def __init__(self, key: str, etag: Optional[str], last_modified: Optional[str],
+                 headers: str, body: bytes, stored_at: float):
+        self.key = key
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def to_response(self, request: httpx.Request, cache_status: str) -> httpx.Response:
+        headers = json.loads(self.headers)
+        headers.append(["x-cache", cache_status])
+        return httpx.Response(200, headers=headers, content=self.body, request=request)
+
+
+class HTTPCache:
+    """
+    Disk-backed (SQLite) cache for GitHub GET responses.
+
+    Bodies are stored with their ETag / Last-Modified validators. Entries
+    younger than `ttl` seconds are served without a request; older entries
+    are revalidated with If-None-Match / If-Modified-Since, and GitHub does
+    not count a 304 against the rate limit. The cache is kept under
+    `max_bytes` by evicting least-recently-used entries, and entries not
+    used for `max_age` seconds are dropped.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024,
+                 ttl: float = 60.0, max_age: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_age = max_age
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+        self.total_size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(url: str, headers: Dict[str, str]) -> str:
+        """Cache key for a request: full URL plus the headers that change the response"""
+        vary = "|".join(f"{name}={headers.get(name, '')}" for name in ("authorization", "accept"))
+        return hashlib.sha256(f"{url}|{vary}".encode()).hexdigest()
+
+    async def fetch(
+        self,
+        request: httpx.Request,
+        send: Callable[[Dict[str, str]], Awaitable[httpx.Response]],
+        revalidate: bool = False,
+    ) -> httpx.Response:
+        """
+        Serve `request` from the cache, revalidating or fetching with `send`
+        (called with any extra conditional headers) when needed. With
+        `revalidate` a stored entry is always revalidated, even within `ttl`.
+        """
+        key = self.make_key(str(request.url), {k.lower(): v for k, v in request.headers.items()})
+        entry = await asyncio.to_thread(self._lookup, key)
+
+        if entry is not None and not revalidate and time.time() - entry.stored_at < self.ttl:
+            self.hits += 1
+            return entry.to_response(request, "HIT")
+
+        conditional = {}
+        if entry is not None:
+            if entry.etag:
+                conditional["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                conditional["If-Modified-Since"] = entry.last_modified
+
+        response = await send(conditional)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            await asyncio.to_thread(self._touch, key)
+            return entry.to_response(request, "REVALIDATED")
+
+        self.misses += 1
+        if response.status_code == 200 and (response.headers.get("etag") or response.headers.get("last-modified")):
+            await response.aread()
+            await asyncio.to_thread(self._store, key, response)
+        return response
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, etag, last_modified, headers, body, stored_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return CacheEntry(*row)
+
+    def _touch(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+            self._db.commit()
+
+    def _store(self, key: str, response: httpx.Response) -> None:
+        body = response.content
+        if len(body) > self.max_bytes:
+            return
+        headers = json.dumps([
+            [name, value] for name, value in response.headers.multi_items()
+            if name.lower() not in _SKIPPED_HEADERS
+        ])
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.headers.get("etag"), response.headers.get("last-modified"),
+                 headers, body, len(body), now, now)
+            )
+            self.total_size += len(body) - (previous[0] if previous else 0)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        """Drop entries past max_age, then least-recently-used entries until under max_bytes"""
+        cutoff = time.time() - self.max_age
+        expired = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE accessed_at < ?", (cutoff,)
+        ).fetchone()
+        if expired[0]:
+            self._db.execute("DELETE FROM responses WHERE accessed_at < ?", (cutoff,))
+            self.evictions += expired[0]
+            self.total_size -= expired[1]
+
+        while self.total_size > self.max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self.total_size = 0
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                self.evictions += 1
+                self.total_size -= size
+                if self.total_size <= self.max_bytes:
+                    break
+            self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self.total_size = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.revalidated + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "entries": entries,
+            "size_bytes": self.total_size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.revalidated) / lookups, 4) if lookups else 0.0
+        }
+
+
+def cache_from_env() -> Optional[HTTPCache]:
+    """Build the GitHub response cache from GITHUB_CACHE_* settings (None when disabled)"""
+    if os.getenv("GITHUB_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return HTTPCache(
+        path=os.getenv("GITHUB_CACHE_PATH", ".cache/github_http.sqlite"),
+        max_bytes=int(float(os.getenv("GITHUB_CACHE_MAX_MB", 256)) * 1024 * 1024),
+        ttl=float(os.getenv("GITHUB_CACHE_TTL", 60)),
+        max_age=float(os.getenv("GITHUB_CACHE_MAX_AGE", 7 * 24 * 3600)),
+    )
@@ -0,0 +1,17 @@
+# Extension -> language name (GitHub linguist spelling), for local language stats
+# and the per-language code metrics breakdown
+EXTENSION_LANGUAGES = {
+    "py": "Python", "pyi": "Python", "ipynb": "Jupyter Notebook",
+    "js": "JavaScript", "mjs": "JavaScript", "cjs": "JavaScript", "jsx": "JavaScript",
+    "ts": "TypeScript", "tsx": "TypeScript", "mts": "TypeScript",
+    "java": "Java", "kt": "Kotlin", "kts": "Kotlin", "scala": "Scala", "groovy": "Groovy",
+    "go": "Go", "rs": "Rust", "rb": "Ruby", "php": "PHP", "swift": "Swift",
+    "c": "C", "h": "C", "cc": "C++", "cpp": "C++", "cxx": "C++", "hpp": "C++", "hh": "C++",
+    "cs": "C#", "fs": "F#", "m": "Objective-C", "mm": "Objective-C++",
+    "dart": "Dart", "lua": "Lua", "pl": "Perl", "r": "R", "jl": "Julia",
+    "ex": "Elixir", "exs": "Elixir", "erl": "Erlang", "hs": "Haskell", "clj": "Clojure",
+    "sh": "Shell", "bash": "Shell", "zsh": "Shell", "ps1": "PowerShell",
+    "html": "HTML", "htm": "HTML", "css": "CSS", "scss": "SCSS", "sass": "Sass", "less": "Less",
+    "vue": "Vue", "svelte": "Svelte", "sql": "SQL", "tf": "HCL", "nix": "Nix",
+    "zig": "Zig", "nim": "Nim", "ml": "OCaml", "elm": "Elm", "sol": "Solidity", "xml": "XML",
+}
@@ -0,0 +1,378 @@
+import asyncio
+import os
+import re
+import time
+from collections import Counter
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from services.languages import EXTENSION_LANGUAGES
+
+# Record/field separators for machine-readable `git log` output
+RECORD_SEP = "\x1e"
+FIELD_SEP = "\x1f"
+LOG_FORMAT = f"%H{FIELD_SEP}%an{FIELD_SEP}%ae{FIELD_SEP}%ad{FIELD_SEP}%cd{FIELD_SEP}%B{RECORD_SEP}"
+UTC_DATE = "--date=format-local:%Y-%m-%dT%H:%M:%SZ"
+
+# Characters GitHub allows in owner and repository names
+NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class LocalGitService:
+    """
+    Repository source backed by local bare clones instead of the REST API.
+
+    Each repository is cloned once into `cache_dir` (as a partial
+    `--filter=blob:none` clone by default, so blobs are only downloaded
+    when read) and refreshed with `git fetch` at most every
+    `refresh_interval` seconds. Commits, trees, blobs and language stats
+    are read straight from the object database, with no pagination or
+    rate limits. Implements the same methods as GitHubService.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        remote: Optional[str] = None,
+        clone_filter: Optional[str] = None,
+        refresh_interval: Optional[float] = None,
+    ):
+        self.cache_dir = cache_dir or os.getenv('LOCAL_GIT_CACHE_DIR', '.cache/repos')
+        self.remote = (remote or os.getenv('LOCAL_GIT_REMOTE', 'https://github.com')).rstrip('/')
+        self.clone_filter = clone_filter if clone_filter is not None else os.getenv('LOCAL_GIT_FILTER', 'blob:none')
+        self.refresh_interval = refresh_interval if refresh_interval is not None else float(
+            os.getenv('LOCAL_GIT_REFRESH_SECONDS', 60)
+        )
+        # GitHubService-compatible attributes
+        self.cache = None
+        self.blobs = None
+        self.scheduler = None
+        self.use_graphql = False
+        self.page_concurrency = 1
+
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._fetched_at: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    async def close(self) -> None:
+        pass
+
+    def pool_stats(self) -> Dict:
+        return {
+            "source": "local",
+            "cache_dir": os.path.abspath(self.cache_dir),
+            "partial_clone_filter": self.clone_filter or None,
+            "repositories": len(self._fetched_at)
+        }
+
+    # Plumbing
+
+    def _git_dir(self, owner: str, repo: str) -> str:
+        # Names come from URL paths: anything else could escape cache_dir
+        for name in (owner, repo):
+            if not NAME_PATTERN.match(name) or name in (".", ".."):
+                raise HTTPException(status_code=400, detail=f"Invalid repository name: {name!r}")
+        return os.path.join(self.cache_dir, owner.lower(), f"{repo.lower()}.git")
+
+    async def _run(self, *args: str, git_dir: Optional[str] = None, check: bool = True) -> bytes:
+        command = ["git"] + (["--git-dir", git_dir] if git_dir else []) + list(args)
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env={**os.environ, "TZ": "UTC", "GIT_TERMINAL_PROMPT": "0"},
+        )
+        stdout, stderr = await process.communicate()
+        if check and process.returncode != 0:
+            raise RuntimeError(f"git {args[0]} failed: {stderr.decode(errors='replace').strip()}")
+        return stdout
+
+    async def _ensure(self, owner: str, repo: str) -> str:
+        """Clone the repository on first use and fetch when the copy is stale"""
+        git_dir = self._git_dir(owner, repo)
+        lock = self._locks.setdefault(git_dir, asyncio.Lock())
+        async with lock:
+            fetched_at = self._fetched_at.get(git_dir)
+            if fetched_at is not None and time.time() - fetched_at < self.refresh_interval:
+                return git_dir
+
+            try:
+                if not os.path.isdir(git_dir):
+                    os.makedirs(os.path.dirname(git_dir), exist_ok=True)
+                    args = ["clone", "--bare", "--quiet"]
+                    if self.clone_filter:
+                        args.append(f"--filter={self.clone_filter}")
+                    await self._run(*args, f"{self.remote}/{owner}/{repo}.git", git_dir)
+                else:
+                    await self._run(
+                        "fetch", "--quiet", "--prune", "origin", "+refs/heads/*:refs/heads/*",
+                        git_dir=git_dir
+                    )
+            except RuntimeError as e:
+                if fetched_at is None and not os.path.isdir(git_dir):
+                    raise HTTPException(status_code=404, detail=f"Repository not found: {e}")
+                # Serve the existing copy when a refresh fails
+
+            self._fetched_at[git_dir] = time.time()
+            return git_dir
+
+    async def _ls_tree(self, git_dir: str, treeish: str, recursive: bool = True) -> List[Dict]:
+        args = ["ls-tree", "-z", "--full-tree"]
+        if recursive:
+            args += ["-r", "-t"]
+        # Object sizes need the blobs themselves, which a partial clone lacks
+        with_sizes = not self.clone_filter
+        if with_sizes:
+            args.append("-l")
+        output = await self._run(*args, treeish, git_dir=git_dir)
+
+        entries = []
+        for record in output.decode(errors='replace').split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            fields = meta.split()
+            entry = {"path": path, "mode": fields[0], "type": fields[1], "sha": fields[2]}
+            if fields[1] == "blob":
+                entry["size"] = int(fields[3]) if with_sizes and fields[3] != "-" else None
+            entries.append(entry)
+        return entries
+
+    async def _read_blob(self, git_dir: str, object_name: str) -> Optional[bytes]:
+        process = await asyncio.create_subprocess_exec(
+            "git", "--git-dir", git_dir, "cat-file", "blob", object_name,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        stdout, _ = await process.communicate()
+        return stdout if process.returncode == 0 else None
+
+    @staticmethod
+    def _parse_commit(record: str) -> Optional[Dict]:
+        record = record.lstrip("\n")
+        if not record:
+            return None
+        sha, name, email, author_date, committer_date, message = record.split(FIELD_SEP, 5)
+        return {
+            "sha": sha,
+            "commit": {
+                "message": message.rstrip("\n"),
+                "author": {"name": name, "email": email, "date": author_date},
+                "committer": {"date": committer_date}
+            }
+        }
+
+    # GitHubService interface
+
+    async def get_repository(self, owner: str, repo: str) -> Dict:
+        """Get basic repository information"""
+        git_dir = await self._ensure(owner, repo)
+        branch = (await self._run("symbolic-ref", "--short", "HEAD", git_dir=git_dir)).decode().strip()
+        dates = (await self._run(
+            "log", "--format=%ad", UTC_DATE, "-1", "HEAD", git_dir=git_dir
+        )).decode().split()
+        roots = (await self._run("rev-list", "--max-parents=0", "HEAD", git_dir=git_dir)).decode().split()
+        created = (await self._run(
+            "log", "--format=%ad", UTC_DATE, "-1", roots[-1], git_dir=git_dir
+        )).decode().split() if roots else []
+
+        size_kb = 0
+        for line in (await self._run("count-objects", "-v", git_dir=git_dir)).decode().splitlines():
+            key, _, value = line.partition(":")
+            if key in ("size", "size-pack"):
+                size_kb += int(value.strip() or 0)
+
+        languages = await self.get_languages(owner, repo)
+        return {
+            "name": repo,
+            "full_name": f"{owner}/{repo}",
+            "description": None,
+            "stargazers_count": 0,
+            "forks_count": 0,
+            "open_issues_count": 0,
+            "watchers_count": 0,
+            "license": None,
+            "default_branch": branch,
+            "created_at": created[0] if created else None,
+            "updated_at": dates[0] if dates else None,
+            "size": size_kb,
+            "language": max(languages, key=languages.get) if languages else None
+        }
+
+    async def get_head_sha(self, owner: str, repo: str, ref: str = "HEAD") -> Optional[str]:
+        """SHA `ref` (default branch head by default) points at; None for empty repositories"""
+        git_dir = await self._ensure(owner, repo)
+        output = await self._run(
+            "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}", git_dir=git_dir, check=False
+        )
+        return output.decode().strip() or None
+
+    async def get_languages(self, owner: str, repo: str) -> Dict[str, int]:
+        """
+        Bytes per language by file extension. Partial clones have no blob
+        sizes, so files are counted instead.
+        """
+        git_dir = await self._ensure(owner, repo)
+        languages = Counter()
+        for entry in await self._ls_tree(git_dir, "HEAD"):
+            if entry["type"] != "blob" or "." not in entry["path"]:
+                continue
+            language = EXTENSION_LANGUAGES.get(entry["path"].rsplit(".", 1)[-1].lower())
+            if language:
+                languages[language] += entry["size"] if entry["size"] is not None else 1
+        return dict(languages.most_common())
+
+    async def get_commits(self, owner: str, repo: str, per_page: int = 100, page: int = 1) -> List[Dict]:
+        """Get repository commits"""
+        git_dir = await self._ensure(owner, repo)
+        output = await self._run(
+            "log", f"--format={LOG_FORMAT}", UTC_DATE,
+            f"--skip={(page - 1) * per_page}", f"--max-count={per_page}", "HEAD",
+            git_dir=git_dir
+        )
+        commits = (self._parse_commit(record) for record in output.decode(errors='replace').split(RECORD_SEP))
+        return [commit for commit in commits if commit]
+
+    async def iter_commits(
+        self,
+        owner: str,
+        repo: str,
+        limit: Optional[int] = None,
+        sha: Optional[str] = None,
+        since: Optional[str] = None,
+        concurrent: bool = True,
+        page_size: int = 1000,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Stream `git log` output as pages of commits (newest first).
+        `concurrent` is accepted for GitHubService compatibility only: one
+        `git log` process streams the history, so there are no pages to
+        fetch in parallel.
+        """
+        git_dir = await self._ensure(owner, repo)
+        args = ["git", "--git-dir", git_dir, "log", f"--format={LOG_FORMAT}", UTC_DATE]
+        if limit:
+            args.append(f"--max-count={limit}")
+        if since:
+            args.append(f"--since={since}")
+        args.append(sha or "HEAD")
+
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            env={**os.environ, "TZ": "UTC"},
+        )
+        try:
+            buffer = ""
+            page = []
+            while True:
+                chunk = await process.stdout.read(256 * 1024)
+                if not chunk:
+                    break
+                buffer += chunk.decode(errors='replace')
+                records = buffer.split(RECORD_SEP)
+                buffer = records.pop()
+                for record in records:
+                    commit = self._parse_commit(record)
+                    if commit:
+                        page.append(commit)
+                if len(page) >= page_size:
+                    yield page
+                    page = []
+            commit = self._parse_commit(buffer)
+            if commit:
+                page.append(commit)
+            if page:
+                yield page
+        finally:
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+
+    async def compare_commits(self, owner: str, repo: str, base: str, head: str) -> Optional[List[Dict]]:
+        """
+        Commits in `base..head` (merged branches included). None when `head`
+        does not descend from `base` (force push) or `base` no longer exists.
+        """
+        git_dir = await self._ensure(owner, repo)
+        try:
+            await self._run("merge-base", "--is-ancestor", base, head, git_dir=git_dir)
+        except RuntimeError:
+            return None
+        output = await self._run("log", f"--format={LOG_FORMAT}", UTC_DATE, f"{base}..{head}", git_dir=git_dir)
+        commits = (self._parse_commit(record) for record in output.decode(errors='replace').split(RECORD_SEP))
+        return [commit for commit in commits if commit]
+
+    async def get_readme(self, owner: str, repo: str) -> Optional[str]:
+        """Get repository README content"""
+        git_dir = await self._ensure(owner, repo)
+        for entry in await self._ls_tree(git_dir, "HEAD", recursive=False):
+            if entry["type"] == "blob" and entry["path"].lower().startswith("readme"):
+                content = await self._read_blob(git_dir, entry["sha"])
+                try:
+                    return content.decode('utf-8') if content is not None else None
+                except UnicodeDecodeError:
+                    return None
+        return None
+
+    async def get_file_content(self, owner: str, repo: str, path: str, sha: Optional[str] = None) -> Optional[str]:
+        git_dir = await self._ensure(owner, repo)
+        content = await self._read_blob(git_dir, sha or f"HEAD:{path}")
+        if content is None:
+            return None
+        try:
+            return content.decode('utf-8')
+        except UnicodeDecodeError:
+            # Handle binary files
+            return f"[Binary file - {len(content)} bytes]"
+
+    async def get_blob(self, owner: str, repo: str, sha: str) -> Optional[bytes]:
+        git_dir = await self._ensure(owner, repo)
+        return await self._read_blob(git_dir, sha)
+
+    async def open_file_blob(self, owner: str, repo: str, path: str) -> Optional[tuple]:
+        """Resolve a path to (blob sha, bytes); the clone already is the blob store"""
+        git_dir = await self._ensure(owner, repo)
+        output = await self._run("rev-parse", "--verify", "--quiet", f"HEAD:{path}", git_dir=git_dir, check=False)
+        sha = output.decode().strip()
+        if not sha:
+            return None
+        content = await self._read_blob(git_dir, sha)
+        return (sha, content) if content is not None else None
+
+    async def get_contributors(self, owner: str, repo: str) -> List[Dict]:
+        """Get repository contributors (commit authors by commit count)"""
+        git_dir = await self._ensure(owner, repo)
+        output = await self._run("shortlog", "-sne", "HEAD", git_dir=git_dir)
+        contributors = []
+        for line in output.decode(errors='replace').splitlines():
+            count, _, author = line.strip().partition("\t")
+            name, _, email = author.partition(" <")
+            contributors.append({
+                "login": name,
+                "email": email.rstrip(">"),
+                "contributions": int(count)
+            })
+        return contributors
+
+    async def get_issues(self, owner: str, repo: str, state: str = "all") -> List[Dict]:
+        """Issues are not part of the git object database"""
+        return []
+
+    async def get_tree(self, owner: str, repo: str, sha: str = "HEAD", recursive: bool = True) -> Dict:
+        """Get repository file tree"""
+        git_dir = await self._ensure(owner, repo)
+        try:
+            tree_sha = (await self._run("rev-parse", f"{sha}^{{tree}}", git_dir=git_dir)).decode().strip()
+            entries = await self._ls_tree(git_dir, tree_sha, recursive)
+        except RuntimeError:
+            return {}
+        return {"sha": tree_sha, "tree": entries, "truncated": False}
+
+    async def walk_tree(self, owner: str, repo: str, sha: str = "HEAD", prefix: str = "") -> AsyncIterator[Dict]:
+        """Yield tree entries whose path starts with `prefix`"""
+        tree = await self.get_tree(owner, repo, sha)
+        for item in tree.get('tree', []):
+            if item['path'].startswith(prefix):
+                yield item
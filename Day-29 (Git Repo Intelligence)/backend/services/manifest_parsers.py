@@ -0,0 +1,142 @@
+"""
+Incremental readers used by the DependencyService analyzers.
+
+Lockfiles can be tens of megabytes, so instead of materializing the whole
+document these helpers hand out one entry at a time: JSON objects are
+walked member by member with `raw_decode` (skipped members are only
+scanned, never decoded), XML is fed to a pull parser in chunks, and TOML lockfiles are split into their
+`[[package]]` tables and parsed in small batches.
+"""
+import json
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from xml.etree import ElementTree
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Strings (with escapes) and brackets; everything else is skipped by the regex engine
+_STRUCTURE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+
+MemberHandler = Callable[[str, int], int]
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()
+
+
+def skip_json_value(text: str, pos: int) -> int:
+    """End offset of the JSON value starting at `pos`, without decoding it"""
+    if text[pos] not in '{[':
+        return _decoder.raw_decode(text, pos)[1]
+    depth = 0
+    for match in _STRUCTURE.finditer(text, pos):
+        token = match.group()
+        if token in '{[':
+            depth += 1
+        elif token in '}]':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated JSON value")
+
+
+def decode_json_value(text: str, pos: int) -> tuple:
+    """(value, end offset) of the JSON value starting at `pos`"""
+    return _decoder.raw_decode(text, pos)
+
+
+def read_json_object(text: str, pos: int, on_member: MemberHandler) -> int:
+    """
+    Walk the JSON object starting at `pos`. `on_member(key, value_pos)` is
+    called for each member and must return the offset where that value
+    ends (by decoding, skipping or recursing into it). Returns the offset
+    just past the closing brace.
+    """
+    pos = _skip_whitespace(text, pos)
+    if text[pos] != '{':
+        raise ValueError(f"Expected a JSON object at offset {pos}")
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos] == '}':
+        return pos + 1
+    while True:
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if text[pos] != ':':
+            raise ValueError(f"Expected ':' at offset {pos}")
+        pos = _skip_whitespace(text, on_member(key, _skip_whitespace(text, pos + 1)))
+        if text[pos] == ',':
+            pos = _skip_whitespace(text, pos + 1)
+        elif text[pos] == '}':
+            return pos + 1
+        else:
+            raise ValueError(f"Expected ',' or '}}' at offset {pos}")
+
+
+def iter_lines(content: str) -> Iterator[str]:
+    """Lines of `content` (with line endings) as slices, without copying the whole text"""
+    start = 0
+    length = len(content)
+    while start < length:
+        end = content.find('\n', start)
+        end = length if end == -1 else end + 1
+        yield content[start:end]
+        start = end
+
+
+def iter_toml_tables(content: str, header: str = "[[package]]", skip_arrays: Iterable[str] = (),
+                     batch_size: int = 64 * 1024) -> Iterator[Dict]:
+    """
+    Parse a TOML lockfile a few array-of-tables entries at a time. Entries
+    starting at `header` (with sub-tables such as `[package.dependencies]`)
+    are buffered up to about `batch_size` characters and parsed together;
+    any other table (e.g. poetry's `[metadata]` hashes) is skipped, as are
+    multi-line arrays whose key is in `skip_arrays`.
+    """
+    prefix = header.strip('[]')
+    skipped = tuple(f"{key} = [" for key in skip_arrays)
+    buffer: List[str] = []
+    buffered = 0
+    collecting = False
+    in_skipped_array = False
+    for line in iter_lines(content):
+        if in_skipped_array:
+            in_skipped_array = line.strip() != ']'
+            continue
+        if line.startswith('['):
+            stripped = line.strip()
+            name = stripped.strip('[]').strip()
+            if stripped == header or not (name == prefix or name.startswith(prefix + '.')):
+                if buffered >= batch_size or (buffer and stripped != header):
+                    yield from tomllib.loads("".join(buffer)).get(prefix, [])
+                    buffer, buffered = [], 0
+                collecting = stripped == header
+        elif skipped and line.startswith(skipped):
+            in_skipped_array = not line.rstrip().endswith(']')
+            continue
+        if collecting:
+            buffer.append(line)
+            buffered += len(line)
+    if buffer:
+        yield from tomllib.loads("".join(buffer)).get(prefix, [])
+
+
+def iter_xml_events(content: str, chunk_size: int = 64 * 1024) -> Iterator[tuple]:
+    """(event, element) pairs for start/end events, feeding the parser in chunks"""
+    parser = ElementTree.XMLPullParser(events=("start", "end"))
+    for offset in range(0, len(content), chunk_size):
+        parser.feed(content[offset:offset + chunk_size])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def parse_toml(content: str) -> Optional[Dict]:
+    try:
+        return tomllib.loads(content)
+    except tomllib.TOMLDecodeError:
+        return None
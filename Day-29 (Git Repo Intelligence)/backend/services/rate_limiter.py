@@ -0,0 +1,245 @@
+import asyncio
+import contextvars
+import os
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Priority of the GitHub calls made by the current task; batch workers set BATCH
+request_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=INTERACTIVE)
+
+
+class UsageCounter:
+    """Number of upstream calls admitted while set as `request_usage`"""
+
+    def __init__(self):
+        self.requests = 0
+
+
+# Meters the calls made by the current task (and tasks it spawns) when set
+request_usage: contextvars.ContextVar[Optional[UsageCounter]] = contextvars.ContextVar("request_usage", default=None)
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"GitHub rate limit exhausted, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBudget:
+    """Request budget of one API token for one rate limit resource, as last reported by GitHub"""
+
+    def __init__(self, token: Optional[str], resource: str = "core"):
+        self.token = token
+        self.resource = resource
+        # Unknown until the first response carries X-RateLimit-* headers
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+
+    def available(self, now: float) -> float:
+        if now < self.blocked_until:
+            return 0
+        if self.remaining is None or now >= self.reset_at:
+            # Unknown budget or a window that has already reset
+            return float(self.limit or 5000) - self.in_flight
+        return self.remaining - self.in_flight
+
+    def ready_at(self, now: float) -> float:
+        """When this token next gets budget back"""
+        return max(self.blocked_until, self.reset_at if self.remaining is not None else now)
+
+    def stats(self, now: float) -> Dict:
+        return {
+            "token": f"...{self.token[-4:]}" if self.token else None,
+            "resource": self.resource,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "resets_in": round(max(self.reset_at - now, 0), 1) if self.remaining is not None else None,
+            "blocked_for": round(max(self.blocked_until - now, 0), 1),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "throttled": self.throttled
+        }
+
+
+class RateLimitScheduler:
+    """
+    Central scheduler for GitHub API calls across one or more tokens.
+
+    Each token's budget is tracked from the X-RateLimit-Remaining/Reset
+    headers (and Retry-After on throttled responses), separately for every
+    X-RateLimit-Resource ("core" for REST, "graphql", ...) since GitHub
+    meters those independently. A call is admitted on
+    the token with the most budget left; when none has budget the call
+    waits for the earliest reset. Interactive calls always go first, and
+    batch calls leave `batch_reserve` of each token's limit untouched so
+    interactive users are not starved by background jobs. Interactive calls
+    that would wait longer than `max_wait` fail fast with RateLimitExceeded.
+    """
+
+    def __init__(self, tokens: List[Optional[str]], batch_reserve: float = 0.2, max_wait: float = 30.0):
+        self.tokens = list(tokens or [None])
+        # (token, resource) -> budget, created on first use of a resource
+        self.budgets: Dict[Tuple[Optional[str], str], TokenBudget] = {}
+        for token in self.tokens:
+            self._budget(token, "core")
+        self.batch_reserve = batch_reserve
+        self.max_wait = max_wait
+        self._changed: Optional[asyncio.Condition] = None
+        self._waiting = {INTERACTIVE: 0, BATCH: 0}
+        self._admitted = {INTERACTIVE: 0, BATCH: 0}
+        self._wait_total = {INTERACTIVE: 0.0, BATCH: 0.0}
+        self._wait_max = {INTERACTIVE: 0.0, BATCH: 0.0}
+
+    def _condition(self) -> asyncio.Condition:
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _budget(self, token: Optional[str], resource: str) -> TokenBudget:
+        budget = self.budgets.get((token, resource))
+        if budget is None:
+            budget = self.budgets[(token, resource)] = TokenBudget(token, resource)
+        return budget
+
+    def _candidates(self, resource: str) -> List[TokenBudget]:
+        return [self._budget(token, resource) for token in self.tokens]
+
+    def _pick(self, priority: int, now: float, candidates: List[TokenBudget]) -> Optional[TokenBudget]:
+        best = max(candidates, key=lambda budget: budget.available(now))
+        floor = 0.0
+        if priority == BATCH:
+            if self._waiting[INTERACTIVE]:
+                return None
+            floor = (best.limit or 0) * self.batch_reserve
+        return best if best.available(now) > floor else None
+
+    def preferred(self, resource: str = "core") -> TokenBudget:
+        """
+        Budget the next call of `resource` would be admitted on, without
+        reserving it: the most budget left, else the earliest to reset
+        """
+        now = time.time()
+        return max(self._candidates(resource), key=lambda budget: (budget.available(now), -budget.ready_at(now)))
+
+    async def acquire(self, priority: Optional[int] = None, resource: str = "core",
+                      pinned: Optional[TokenBudget] = None) -> TokenBudget:
+        """
+        Wait for budget and reserve one request of `resource` on the chosen
+        token, or only on `pinned` (e.g. a token a cache key was built for)
+        """
+        priority = request_priority.get() if priority is None else priority
+        candidates = [pinned] if pinned is not None else self._candidates(resource)
+        changed = self._condition()
+        started = time.monotonic()
+        async with changed:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.time()
+                    budget = self._pick(priority, now, candidates)
+                    if budget is not None:
+                        break
+                    ready_at = min(budget.ready_at(now) for budget in candidates)
+                    delay = max(ready_at - now, 0.05)
+                    if priority == INTERACTIVE and time.monotonic() - started + delay > self.max_wait:
+                        raise RateLimitExceeded(delay)
+                    try:
+                        # Woken early by responses that update the budget
+                        await asyncio.wait_for(changed.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiting[priority] -= 1
+
+            budget.in_flight += 1
+            budget.requests += 1
+            usage = request_usage.get()
+            if usage is not None:
+                usage.requests += 1
+            waited = time.monotonic() - started
+            self._admitted[priority] += 1
+            self._wait_total[priority] += waited
+            self._wait_max[priority] = max(self._wait_max[priority], waited)
+            if self._waiting[INTERACTIVE] or self._waiting[BATCH]:
+                changed.notify_all()
+            return budget
+
+    async def release(self, budget: TokenBudget, headers=None, status_code: Optional[int] = None) -> bool:
+        """
+        Record a finished call. Returns True when the response was a rate
+        limit rejection, so the caller can retry on another token or later.
+        """
+        now = time.time()
+        budget.in_flight -= 1
+        throttled = False
+        if headers is not None:
+            # The headers describe the bucket GitHub charged, which may not be the one reserved
+            resource = headers.get("x-ratelimit-resource")
+            if resource and resource != budget.resource:
+                budget = self._budget(budget.token, resource)
+            if headers.get("x-ratelimit-limit"):
+                budget.limit = int(headers["x-ratelimit-limit"])
+            if headers.get("x-ratelimit-remaining"):
+                budget.remaining = int(headers["x-ratelimit-remaining"])
+            if headers.get("x-ratelimit-reset"):
+                budget.reset_at = float(headers["x-ratelimit-reset"])
+
+            retry_after = parse_retry_after(headers.get("retry-after"), now)
+            if status_code in (403, 429) and (retry_after is not None or budget.remaining == 0):
+                throttled = True
+                budget.throttled += 1
+                budget.blocked_until = now + retry_after if retry_after is not None else budget.reset_at
+
+        changed = self._condition()
+        async with changed:
+            changed.notify_all()
+        return throttled
+
+    def stats(self) -> Dict:
+        now = time.time()
+        return {
+            "queue_depth": {PRIORITY_NAMES[p]: count for p, count in self._waiting.items()},
+            "admitted": {PRIORITY_NAMES[p]: count for p, count in self._admitted.items()},
+            "avg_wait_seconds": {
+                PRIORITY_NAMES[p]: round(self._wait_total[p] / self._admitted[p], 4) if self._admitted[p] else 0.0
+                for p in self._admitted
+            },
+            "max_wait_seconds": {PRIORITY_NAMES[p]: round(wait, 4) for p, wait in self._wait_max.items()},
+            "tokens": [budget.stats(now) for budget in self.budgets.values()]
+        }
+
+
+def parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """Retry-After as seconds from now (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - now, 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def scheduler_from_env() -> RateLimitScheduler:
+    """Build the scheduler from GITHUB_TOKENS (comma separated) or GITHUB_TOKEN"""
+    tokens = [token.strip() for token in os.getenv("GITHUB_TOKENS", "").split(",") if token.strip()]
+    if not tokens and os.getenv("GITHUB_TOKEN"):
+        tokens = [os.getenv("GITHUB_TOKEN")]
+    return RateLimitScheduler(
+        tokens=tokens or [None],
+        batch_reserve=float(os.getenv("RATE_LIMIT_BATCH_RESERVE", 0.2)),
+        max_wait=float(os.getenv("RATE_LIMIT_MAX_WAIT", 30)),
+    )
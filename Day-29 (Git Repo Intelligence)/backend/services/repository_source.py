@@ -0,0 +1,17 @@
+import os
+
+from services.github_service import GitHubService
+from services.local_git_service import LocalGitService
+
+
+def create_repository_source(source: str = None):
+    """
+    Build the repository source selected by REPO_SOURCE: "github" (REST
+    API, default) or "local" (bare clones read from the object database)
+    """
+    source = (source or os.getenv('REPO_SOURCE', 'github')).lower()
+    if source == 'local':
+        return LocalGitService()
+    if source == 'github':
+        return GitHubService()
+    raise ValueError(f"Unknown REPO_SOURCE '{source}', expected 'github' or 'local'")
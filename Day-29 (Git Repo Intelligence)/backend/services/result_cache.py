@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class ResultCache:
+    """
+    Cache for computed endpoint responses, keyed by repository head SHA.
+
+    Keys include the default branch head, so a push simply makes the old
+    entries unreachable and they age out of the LRU. The in-process tier
+    holds up to `max_entries` results; the optional SQLite tier at `path`
+    (WAL, shared by every uvicorn worker on the host) is kept under
+    `max_bytes`. Concurrent requests for the same key within a process are
+    coalesced into a single computation.
+    """
+
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None,
+                 max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    body TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, owner: str, repo: str, head_sha: str, params: Optional[Dict] = None) -> str:
+        """Cache key for one endpoint response at a given head commit"""
+        encoded_params = json.dumps(params or {}, sort_keys=True, default=str)
+        raw = f"{endpoint}|{owner.lower()}/{repo.lower()}|{head_sha}|{encoded_params}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Cached result for `key`, or the result of `compute()`. Results are
+        stored unless `cacheable(result)` is false; errors are never cached.
+        """
+        if key in self._entries:
+            self.memory_hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._load(key, compute, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a disconnecting client does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]],
+                    cacheable: Optional[Callable[[Any], bool]]) -> Any:
+        if self._db is not None:
+            body = await asyncio.to_thread(self._lookup, key)
+            if body is not None:
+                self.disk_hits += 1
+                result = json.loads(body)
+                self._remember(key, result)
+                return result
+
+        self.misses += 1
+        result = await compute()
+        if cacheable is None or cacheable(result):
+            self._remember(key, result)
+            if self._db is not None:
+                await asyncio.to_thread(self._store, key, json.dumps(result, default=str))
+        return result
+
+    def _remember(self, key: str, result: Any) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _lookup(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT body FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            return row[0]
+
+    def _store(self, key: str, body: str) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (key, body, len(body), time.time())
+            )
+            # Other workers write to the same file, so the total is re-read rather than tracked
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            while total > self.max_bytes:
+                rows = self._db.execute("SELECT key, size FROM results ORDER BY accessed_at LIMIT 64").fetchall()
+                if not rows:
+                    break
+                for evicted_key, size in rows:
+                    self._db.execute("DELETE FROM results WHERE key = ?", (evicted_key,))
+                    total -= size
+                    if total <= self.max_bytes:
+                        break
+            self._db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        disk = None
+        if self._db is not None:
+            with self._lock:
+                entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            disk = {"path": self.path, "entries": entries, "size_bytes": size, "max_bytes": self.max_bytes}
+        return {
+            "memory_entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk": disk,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+def result_cache_from_env() -> Optional[ResultCache]:
+    """Endpoint result cache from RESULT_CACHE_* settings (None when disabled)"""
+    if os.getenv("RESULT_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ResultCache(
+        max_entries=int(os.getenv("RESULT_CACHE_SIZE", 256)),
+        # An empty path keeps the cache in memory only
+        path=os.getenv("RESULT_CACHE_PATH", ".cache/results.sqlite") or None,
+        max_bytes=int(float(os.getenv("RESULT_CACHE_MAX_MB", 256)) * 1024 * 1024),
+    )
@@ -0,0 +1,219 @@
+import heapq
+import os
+from collections import Counter, OrderedDict
+from typing import Dict, Iterator, List, Optional
+
+
+class DirectoryNode:
+    __slots__ = ("name", "path", "depth", "children", "files", "file_count", "dir_count", "size")
+
+    def __init__(self, name: str, path: str, depth: int):
+        self.name = name
+        self.path = path
+        self.depth = depth
+        self.children: Dict[str, "DirectoryNode"] = {}
+        # Direct files as (extension, size) pairs
+        self.files: List[tuple] = []
+        # Subtree totals, filled in once the index is built
+        self.file_count = 0
+        self.dir_count = 0
+        self.size = 0
+
+    def walk(self) -> Iterator["DirectoryNode"]:
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.children.values())
+
+    def stats(self) -> Dict:
+        return {
+            "path": self.path,
+            "file_count": self.file_count,
+            "directory_count": self.dir_count,
+            "size": self.size,
+            "direct_files": len(self.files),
+            "subdirectories": len(self.children)
+        }
+
+
+def file_extension(name: str) -> Optional[str]:
+    """Lowercased extension of a file name, if it has one"""
+    if '.' not in name:
+        return None
+    return name.rsplit('.', 1)[-1].lower()
+
+
+class TreeIndex:
+    """
+    Path trie over a recursive git tree listing. Subtree totals (files,
+    directories, bytes) are aggregated once at build time; extension,
+    depth and largest-directory queries only visit the requested subtree.
+    """
+
+    def __init__(self, sha: Optional[str], entries: List[Dict]):
+        self.sha = sha
+        self.root = DirectoryNode("", "", 0)
+        for entry in entries:
+            parts = entry['path'].split('/')
+            if entry['type'] == 'tree':
+                self._directory(parts)
+            elif entry['type'] == 'blob':
+                parent = self._directory(parts[:-1])
+                parent.files.append((file_extension(parts[-1]), entry.get('size') or 0))
+        self._aggregate(self.root)
+
+    def _directory(self, parts: List[str]) -> DirectoryNode:
+        node = self.root
+        for part in parts:
+            child = node.children.get(part)
+            if child is None:
+                path = f"{node.path}/{part}" if node.path else part
+                child = node.children[part] = DirectoryNode(part, path, node.depth + 1)
+            node = child
+        return node
+
+    def _aggregate(self, root: DirectoryNode) -> None:
+        # Post-order without recursion: children are finalized before parents
+        for node in reversed(list(root.walk())):
+            node.file_count = len(node.files)
+            node.size = sum(size for _, size in node.files)
+            node.dir_count = len(node.children)
+            for child in node.children.values():
+                node.file_count += child.file_count
+                node.size += child.size
+                node.dir_count += child.dir_count
+
+    def node(self, path: str = "") -> Optional[DirectoryNode]:
+        node = self.root
+        for part in filter(None, path.strip('/').split('/')):
+            node = node.children.get(part)
+            if node is None:
+                return None
+        return node
+
+    def directory(self, path: str = "") -> Optional[Dict]:
+        node = self.node(path)
+        return node.stats() if node else None
+
+    def extensions(self, path: str = "") -> Dict[str, Dict[str, int]]:
+        """File count and total bytes per extension under `path`"""
+        counts = Counter()
+        sizes = Counter()
+        node = self.node(path)
+        if node is None:
+            return {}
+        for directory in node.walk():
+            for extension, size in directory.files:
+                if extension:
+                    counts[extension] += 1
+                    sizes[extension] += size
+        return {
+            extension: {"count": count, "size": sizes[extension]}
+            for extension, count in counts.most_common()
+        }
+
+    def depth_histogram(self, path: str = "") -> Dict[int, int]:
+        """Number of files at each depth (relative to the repository root) under `path`"""
+        histogram = Counter()
+        node = self.node(path)
+        if node is None:
+            return {}
+        for directory in node.walk():
+            if directory.files:
+                histogram[directory.depth + 1] += len(directory.files)
+        return dict(sorted(histogram.items()))
+
+    def largest_directories(self, n: int = 10, path: str = "", by: str = "size") -> List[Dict]:
+        """The N largest directories under `path`, by total bytes or file count"""
+        node = self.node(path)
+        if node is None:
+            return []
+        key = (lambda d: d.size) if by == "size" else (lambda d: d.file_count)
+        candidates = (directory for directory in node.walk() if directory is not node)
+        return [directory.stats() for directory in heapq.nlargest(n, candidates, key=key)]
+
+    def summary(self) -> Dict:
+        """Repository-wide structure summary used by /analyze and /code-quality"""
+        extensions = self.extensions()
+        return {
+            "file_count": self.root.file_count,
+            "directory_count": self.root.dir_count,
+            "file_types": {extension: stats["count"] for extension, stats in list(extensions.items())[:10]},
+            "total_size": self.root.size
+        }
+
+
+class TreeIndexCache:
+    """LRU of TreeIndex objects keyed by tree SHA (trees are immutable)"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv('TREE_INDEX_CACHE_SIZE', 32))
+        self._indexes: "OrderedDict[str, TreeIndex]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, tree: Dict) -> TreeIndex:
+        sha = tree.get('sha')
+        # Truncated listings are incomplete, so they are never cached
+        cacheable = sha is not None and not tree.get('truncated')
+        if cacheable and sha in self._indexes:
+            self.hits += 1
+            self._indexes.move_to_end(sha)
+            return self._indexes[sha]
+
+        self.misses += 1
+        index = TreeIndex(sha, tree.get('tree', []))
+        if cacheable:
+            self._indexes[sha] = index
+            while len(self._indexes) > self.max_entries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._indexes), "hits": self.hits, "misses": self.misses}
+
+
+class TreeListing:
+    """
+    Flattened tree walk as (path, type, size, sha) tuples in walk order,
+    with a path -> position map so a page cursor resumes with one lookup
+    """
+
+    def __init__(self, entries: List[tuple]):
+        self.entries = entries
+        self.positions = {entry[0]: position for position, entry in enumerate(entries)}
+
+    def after(self, path: str) -> Optional[int]:
+        """Position following `path`, or None if it is not in the listing"""
+        position = self.positions.get(path)
+        return None if position is None else position + 1
+
+
+class TreeListingCache:
+    """LRU of TreeListing objects keyed by (owner, repo, tree SHA, prefix)"""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv('TREE_LISTING_CACHE_SIZE', 4))
+        self._listings: "OrderedDict[tuple, TreeListing]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[TreeListing]:
+        listing = self._listings.get(key)
+        if listing is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._listings.move_to_end(key)
+        return listing
+
+    def put(self, key: tuple, listing: TreeListing) -> TreeListing:
+        self._listings[key] = listing
+        self._listings.move_to_end(key)
+        while len(self._listings) > self.max_entries:
+            self._listings.popitem(last=False)
+        return listing
+
+    def stats(self) -> Dict:
+        return {"entries": len(self._listings), "hits": self.hits, "misses": self.misses}
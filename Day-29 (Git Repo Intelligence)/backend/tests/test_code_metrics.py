@@ -0,0 +1,58 @@
+"""
+CodeMetricsEngine over an in-memory tree, with blobs served by a stub source.
+"""
+import asyncio
+
+from services.code_metrics import CodeMetricsEngine
+
+SOURCES = {
+    "src/main.c": "#include \"util.h\"\n\n// entry point\nint main(void) {\n    if (ready()) { return 0; }\n    return 1;\n}\n",
+    "src/util.h": "int ready(void);\n",
+    "src/engine.hpp": "/* engine */\nclass Engine {};\n",
+    "src/engine.cpp": "#include \"engine.hpp\"\n\nint spin(int n) { return n && n > 1 ? 1 : 0; }\n",
+    "app/run.py": "# runner\n\ndef run(x):\n    if x or not x:\n        return x\n",
+    "app/Main.java": "class Main {\n  // noop\n}\n",
+    "vendor/lib.c": "int ignored;\n",
+}
+
+
+class StubSource:
+    def __init__(self):
+        self.fetched = []
+
+    async def get_file_content(self, owner, repo, path, sha=None):
+        self.fetched.append(path)
+        return SOURCES[path]
+
+
+def tree(paths):
+    return {"tree": [{"path": path, "type": "blob", "sha": f"{i:040x}", "size": len(SOURCES[path])}
+                     for i, path in enumerate(paths, start=1)]}
+
+
+def test_breakdown_is_keyed_by_language_and_cached_per_blob(tmp_path):
+    engine = CodeMetricsEngine(cache_path=str(tmp_path / "metrics.sqlite"), max_workers=1)
+    source = StubSource()
+
+    async def run():
+        first = await engine.analyze(source, "acme", "widgets", tree(SOURCES))
+        second = await engine.analyze(source, "acme", "widgets", tree(SOURCES))
+        return first, second
+
+    try:
+        first, second = asyncio.run(run())
+    finally:
+        engine.close()
+
+    languages = first["languages"]
+    # Headers count with their language, not as languages of their own
+    assert sorted(languages) == ["C", "C++", "Java", "Python"]
+    assert languages["C"]["files"] == 2 and languages["C++"]["files"] == 2
+    assert languages["Python"] == {"total_lines": 5, "code_lines": 3, "comment_lines": 1, "blank_lines": 1, "files": 1}
+    assert first["file_count"] == 6
+    assert first["total_lines"] == sum(stats["total_lines"] for stats in languages.values())
+    assert "vendor/lib.c" not in source.fetched
+
+    assert second["files_from_cache"] == 6
+    assert second["languages"] == languages
+    assert len(source.fetched) == 6
@@ -0,0 +1,176 @@
+"""
+QueryBatcher and the GraphQL repository bundles against a mock GraphQL
+endpoint (an httpx.MockTransport answering aliased repository queries).
+"""
+import asyncio
+import json
+
+import httpx
+from fastapi import HTTPException
+
+from services.blob_store import BlobStore
+from services.github_graphql import QueryBatcher
+from services.github_service import GitHubService
+from services.http_cache import HTTPCache
+from services.rate_limiter import RateLimitScheduler
+
+
+def repository_node(owner, name):
+    return {
+        "name": name,
+        "nameWithOwner": f"{owner}/{name}",
+        "description": None,
+        "stargazerCount": 7,
+        "forkCount": 2,
+        "issues": {"totalCount": 3},
+        "pullRequests": {"totalCount": 1},
+        "watchers": {"totalCount": 4},
+        "licenseInfo": None,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "updatedAt": "2024-02-01T00:00:00Z",
+        "diskUsage": 120,
+        "primaryLanguage": {"name": "Python"},
+        "languages": {"edges": [{"size": 900, "node": {"name": "Python"}}]},
+        "defaultBranchRef": {"name": "main", "target": {"history": {"nodes": [
+            {"oid": "a" * 40, "message": "feat: start",
+             "author": {"name": "Ada", "email": "ada@example.com", "date": "2024-01-01T00:00:00Z",
+                        "user": {"login": "ada"}}}
+        ]}}},
+        "readmeMd": {"text": f"# {name}\n"},
+        "readmeLower": None,
+        "readmeRst": None,
+        "readmePlain": None,
+    }
+
+
+class MockGraphQL:
+    """Resolves every rN alias; repositories named "missing" come back null with an error"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        variables = body["variables"]
+        self.queries.append(body)
+        data, errors = {}, []
+        for i in range(sum(1 for name in variables if name.startswith("n"))):
+            alias, owner, name = f"r{i}", variables[f"o{i}"], variables[f"n{i}"]
+            assert f"{alias}: repository(" in body["query"]
+            if name == "missing":
+                data[alias] = None
+                errors.append({"path": [alias], "message": f"Could not resolve to a Repository with the name '{name}'."})
+            else:
+                data[alias] = repository_node(owner, name)
+        return httpx.Response(200, json={"data": data, **({"errors": errors} if errors else {})})
+
+
+def make_service(tmp_path, handler, max_batch=10):
+    service = GitHubService(
+        cache=HTTPCache(str(tmp_path / "http.sqlite")),
+        blobs=BlobStore(str(tmp_path / "blobs")),
+        scheduler=RateLimitScheduler([None]),
+    )
+    service._client = httpx.AsyncClient(headers=service.headers, transport=httpx.MockTransport(handler))
+    service.repository_batcher.max_batch = max_batch
+    return service
+
+
+def load_all(service, keys):
+    async def run():
+        try:
+            return await asyncio.gather(*(service.get_repository_bundle(*key) for key in keys),
+                                        return_exceptions=True)
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+def test_concurrent_lookups_share_one_aliased_query(tmp_path):
+    graphql = MockGraphQL()
+    service = make_service(tmp_path, graphql)
+    bundles = load_all(service, [("acme", "widgets"), ("acme", "gadgets"), ("acme", "widgets")])
+
+    # One round-trip, with the repeated repository asked for once
+    assert len(graphql.queries) == 1
+    assert graphql.queries[0]["variables"]["n1"] == "gadgets" and "n2" not in graphql.queries[0]["variables"]
+    assert service.repository_batcher.stats() == {"queries": 1, "keys": 2, "avg_batch_size": 2.0}
+    widgets, gadgets, again = bundles
+    assert widgets is again
+    assert widgets["repository"]["full_name"] == "acme/widgets"
+    assert widgets["repository"]["open_issues_count"] == 4
+    assert widgets["languages"] == {"Python": 900}
+    assert widgets["readme"] == "# widgets\n"
+    assert widgets["commits"][0]["author"] == {"login": "ada"}
+    assert gadgets["repository"]["full_name"] == "acme/gadgets"
+
+
+def test_batches_are_split_at_max_batch(tmp_path):
+    graphql = MockGraphQL()
+    service = make_service(tmp_path, graphql, max_batch=2)
+    bundles = load_all(service, [("acme", f"repo{i}") for i in range(5)])
+
+    assert [len([name for name in query["variables"] if name.startswith("n")]) for query in graphql.queries] == [2, 2, 1]
+    assert [bundle["repository"]["name"] for bundle in bundles] == [f"repo{i}" for i in range(5)]
+
+
+def test_alias_errors_fail_only_their_lookup(tmp_path):
+    service = make_service(tmp_path, MockGraphQL())
+    found, missing = load_all(service, [("acme", "widgets"), ("acme", "missing")])
+
+    assert found["repository"]["full_name"] == "acme/widgets"
+    assert isinstance(missing, HTTPException)
+    assert missing.status_code == 404
+    assert "Could not resolve to a Repository with the name 'missing'" in missing.detail
+
+
+def test_a_query_without_data_fails_every_lookup(tmp_path):
+    def handler(request):
+        return httpx.Response(200, json={"data": None, "errors": [{"message": "Something went wrong"}]})
+
+    results = load_all(make_service(tmp_path, handler), [("acme", "widgets"), ("acme", "gadgets")])
+    assert [(error.status_code, error.detail) for error in results] == \
+        [(502, "GraphQL query failed: Something went wrong")] * 2
+
+
+def test_batcher_hands_execute_failures_to_every_waiter():
+    async def execute(keys):
+        raise RuntimeError("upstream down")
+
+    async def run():
+        batcher = QueryBatcher(execute, window=0.01)
+        return await asyncio.gather(batcher.load("a"), batcher.load("b"), return_exceptions=True)
+
+    assert [str(error) for error in asyncio.run(run())] == ["upstream down"] * 2
+
+
+def test_batcher_flushes_after_the_window():
+    calls = []
+
+    async def execute(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys}
+
+    async def run():
+        batcher = QueryBatcher(execute, window=0.01)
+        first = await batcher.load("a")
+        second = await batcher.load("b")
+        return first, second
+
+    assert asyncio.run(run()) == ("A", "B")
+    assert calls == [["a"], ["b"]]
+
+
+def test_batcher_folds_lookups_made_within_the_window():
+    calls = []
+
+    async def execute(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys}
+
+    async def run():
+        batcher = QueryBatcher(execute, window=0.05)
+        return await asyncio.gather(batcher.load("a"), batcher.load("b"), batcher.load("a"))
+
+    assert asyncio.run(run()) == ["A", "B", "A"]
+    assert calls == [["a", "b"]]
@@ -0,0 +1,117 @@
+"""
+GitHubService against an httpx.MockTransport standing in for the GitHub API,
+so token rotation and the response cache run without network access.
+"""
+import asyncio
+import base64
+import hashlib
+import mmap
+import time
+
+import httpx
+import pytest
+
+from services.blob_store import BlobStore
+from services.github_service import GitHubService
+from services.http_cache import HTTPCache
+from services.rate_limiter import RateLimitScheduler
+
+
+class MockGitHub:
+    """Answers /repos/acme/widgets per token with an ETag, and logs the headers of every request"""
+
+    def __init__(self, remaining):
+        self.remaining = dict(remaining)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        # Retries resend the same Request object, so keep a copy of what was sent
+        self.requests.append(dict(request.headers))
+        token = request.headers.get("authorization", "").split()[-1]
+        etag = f'"{token}-v1"'
+        headers = {
+            "etag": etag,
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": str(self.remaining[token]),
+            "x-ratelimit-reset": str(int(time.time()) + 3600),
+            "x-ratelimit-resource": "core",
+        }
+        if self.remaining[token] == 0:
+            return httpx.Response(403, headers=headers, json={"message": "API rate limit exceeded"})
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, headers=headers, json={"full_name": "acme/widgets", "visible_to": token})
+
+
+def make_service(tmp_path, handler, tokens, ttl=0.0):
+    service = GitHubService(
+        cache=HTTPCache(str(tmp_path / "http.sqlite"), ttl=ttl),
+        blobs=BlobStore(str(tmp_path / "blobs")),
+        scheduler=RateLimitScheduler(tokens),
+    )
+    service._client = httpx.AsyncClient(headers=service.headers, transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_cache_entries_are_kept_per_token(tmp_path):
+    github = MockGitHub({"alpha": 10, "beta": 4000})
+    service = make_service(tmp_path, github, ["alpha", "beta"])
+
+    async def run():
+        first = await service.get_repository("acme", "widgets")
+        # alpha reported 10 calls left, so beta is preferred from here on
+        second = await service.get_repository("acme", "widgets")
+        third = await service.get_repository("acme", "widgets")
+        await service.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first["visible_to"] == "alpha"
+    # beta never receives alpha's body or revalidates alpha's ETag
+    assert second["visible_to"] == "beta"
+    assert "if-none-match" not in github.requests[1]
+    assert third["visible_to"] == "beta"
+    assert github.requests[2]["authorization"] == "token beta"
+    assert github.requests[2]["if-none-match"] == '"beta-v1"'
+    assert service.cache.stats()["revalidated"] == 1
+
+
+def test_throttled_token_moves_the_lookup_to_the_next_token(tmp_path):
+    github = MockGitHub({"alpha": 0, "beta": 4000})
+    service = make_service(tmp_path, github, ["alpha", "beta"], ttl=60)
+
+    async def run():
+        first = await service.get_repository("acme", "widgets")
+        # alpha is now blocked until its reset, and beta's entry is fresh
+        second = await service.get_repository("acme", "widgets")
+        await service.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [headers["authorization"] for headers in github.requests] == ["token alpha", "token beta"]
+    assert first == second
+    assert first["visible_to"] == "beta"
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_ranges_map_stored_blobs_without_reading_them(tmp_path, monkeypatch):
+    content = b"0123456789" * 1000
+    sha = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+    entry = {"type": "file", "sha": sha, "encoding": "base64", "content": base64.b64encode(content).decode()}
+    service = make_service(tmp_path, lambda request: httpx.Response(200, json=entry), [None])
+
+    async def open_twice():
+        first = await service.open_file_blob("acme", "widgets", "data.bin")
+        # A stored blob must be mapped, not loaded whole
+        monkeypatch.setattr(service.blobs, "get", lambda sha: pytest.fail("blob read into memory"))
+        second = await service.open_file_blob("acme", "widgets", "data.bin")
+        await service.close()
+        return first, second
+
+    (first_sha, first), (second_sha, second) = asyncio.run(open_twice())
+    assert first_sha == second_sha == sha
+    assert isinstance(first, mmap.mmap) and isinstance(second, mmap.mmap)
+    assert second[10:20] == b"0123456789"
+    assert len(second) == len(content)
+    first.close()
+    second.close()
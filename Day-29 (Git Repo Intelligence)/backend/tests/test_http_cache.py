@@ -0,0 +1,129 @@
+"""
+HTTPCache in front of an httpx.MockTransport origin that serves versioned
+bodies with ETags.
+"""
+import asyncio
+
+import httpx
+
+from services.http_cache import HTTPCache
+
+
+class Origin:
+    """Answers every path with its current version, honouring If-None-Match"""
+
+    def __init__(self, padding: int = 0):
+        self.version = 1
+        self.padding = padding
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(dict(request.headers))
+        etag = f'"v{self.version}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, headers={"etag": etag}, json={
+            "path": request.url.path,
+            "version": self.version,
+            "authorization": request.headers.get("authorization"),
+            "accept": request.headers.get("accept"),
+            "padding": "x" * self.padding,
+        })
+
+
+def fetch_all(cache, origin, calls):
+    """Run (path, headers, revalidate) lookups in order; returns the responses"""
+    async def run():
+        responses = []
+        async with httpx.AsyncClient(base_url="https://api.test", transport=httpx.MockTransport(origin)) as client:
+            for path, headers, revalidate in calls:
+                request = client.build_request("GET", path, headers=headers)
+
+                async def send(conditional_headers):
+                    request.headers.update(conditional_headers)
+                    return await client.send(request)
+
+                responses.append(await cache.fetch(request, send, revalidate=revalidate))
+        return responses
+    return asyncio.run(run())
+
+
+def get(path, headers=None, revalidate=False):
+    return path, headers or {}, revalidate
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path):
+    cache, origin = HTTPCache(str(tmp_path / "http.sqlite"), ttl=60), Origin()
+    first, second = fetch_all(cache, origin, [get("/repos/a"), get("/repos/a")])
+
+    assert len(origin.requests) == 1
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_entries_are_revalidated_with_their_etag(tmp_path):
+    cache, origin = HTTPCache(str(tmp_path / "http.sqlite"), ttl=0), Origin()
+    first, revalidated = fetch_all(cache, origin, [get("/repos/a"), get("/repos/a")])
+    origin.version = 2
+    (changed,) = fetch_all(cache, origin, [get("/repos/a")])
+
+    assert origin.requests[1]["if-none-match"] == '"v1"'
+    assert revalidated.headers["x-cache"] == "REVALIDATED"
+    assert revalidated.json() == first.json()
+    assert changed.json()["version"] == 2
+    assert cache.stats()["revalidated"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_revalidate_skips_the_ttl(tmp_path):
+    cache, origin = HTTPCache(str(tmp_path / "http.sqlite"), ttl=60), Origin()
+    _, forced = fetch_all(cache, origin, [get("/repos/a"), get("/repos/a", revalidate=True)])
+
+    assert len(origin.requests) == 2
+    assert forced.headers["x-cache"] == "REVALIDATED"
+
+
+def test_entries_unused_past_max_age_are_dropped(tmp_path):
+    cache, origin = HTTPCache(str(tmp_path / "http.sqlite"), ttl=60, max_age=3600), Origin()
+    fetch_all(cache, origin, [get("/repos/old")])
+    # Pretend /repos/old was last used two hours ago
+    cache._db.execute("UPDATE responses SET accessed_at = accessed_at - 7200")
+    fetch_all(cache, origin, [get("/repos/new"), get("/repos/old")])
+
+    assert cache.evictions == 1
+    assert len(origin.requests) == 3
+    assert "if-none-match" not in origin.requests[2]
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(tmp_path):
+    origin = Origin(padding=100)
+    body_size = len(fetch_all(HTTPCache(str(tmp_path / "probe.sqlite")), origin, [get("/repos/a")])[0].content)
+    cache = HTTPCache(str(tmp_path / "http.sqlite"), ttl=60, max_bytes=int(body_size * 2.5))
+    origin.requests.clear()
+
+    # /repos/a is used again after /repos/b, so b is the one evicted for c
+    fetch_all(cache, origin, [get("/repos/a"), get("/repos/b"), get("/repos/a"), get("/repos/c")])
+    assert cache.stats()["evictions"] == 1
+    assert cache.total_size <= cache.max_bytes
+
+    a, b = fetch_all(cache, origin, [get("/repos/a"), get("/repos/b")])
+    assert a.headers["x-cache"] == "HIT"
+    assert "x-cache" not in b.headers
+    assert len(origin.requests) == 4
+
+
+def test_keys_vary_by_authorization_and_accept(tmp_path):
+    cache, origin = HTTPCache(str(tmp_path / "http.sqlite"), ttl=60), Origin()
+    variants = [
+        {"Authorization": "token alpha"},
+        {"Authorization": "token beta"},
+        {"Authorization": "token alpha", "Accept": "application/vnd.github.raw+json"},
+    ]
+    responses = fetch_all(cache, origin, [get("/repos/a", headers) for headers in variants * 2])
+
+    assert len(origin.requests) == 3
+    assert [response.json()["authorization"] for response in responses[3:]] == \
+        ["token alpha", "token beta", "token alpha"]
+    assert responses[5].json()["accept"] == "application/vnd.github.raw+json"
+    assert all(response.headers["x-cache"] == "HIT" for response in responses[3:])
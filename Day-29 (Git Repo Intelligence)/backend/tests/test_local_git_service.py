@@ -0,0 +1,112 @@
+"""
+LocalGitService against a fixture repository built with git in a temp
+directory and cloned over file://, so no network is needed.
+"""
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+from fastapi import HTTPException
+
+from services.local_git_service import LocalGitService
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(cwd, *args, date=None):
+    env = {**os.environ, "GIT_AUTHOR_NAME": "Ada", "GIT_AUTHOR_EMAIL": "ada@example.com",
+           "GIT_COMMITTER_NAME": "Ada", "GIT_COMMITTER_EMAIL": "ada@example.com"}
+    if date:
+        env.update(GIT_AUTHOR_DATE=date, GIT_COMMITTER_DATE=date)
+    return subprocess.run(["git", *args], cwd=cwd, env=env, check=True, capture_output=True, text=True).stdout
+
+
+def commit(cwd, files, message, date):
+    for path, content in files.items():
+        full_path = os.path.join(cwd, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(content)
+    git(cwd, "add", "-A")
+    git(cwd, "commit", "-q", "-m", message, date=date)
+
+
+@pytest.fixture
+def fixture_repo(tmp_path):
+    """Remote root containing acme/widgets with a merged, older-dated side branch"""
+    work = tmp_path / "remote" / "acme" / "widgets.git"
+    work.mkdir(parents=True)
+    git(work, "init", "-q", "-b", "main")
+    commit(work, {"README.md": "# Widgets\n", "src/app.py": "print('hi')\n"}, "feat: initial import",
+           "2024-01-01T10:00:00Z")
+    commit(work, {"src/util.js": "export const x = 1\n"}, "fix: export util", "2024-01-02T10:00:00Z")
+    git(work, "checkout", "-q", "-b", "side")
+    commit(work, {"docs/guide.md": "guide\n"}, "docs: add guide", "2023-06-01T10:00:00Z")
+    git(work, "checkout", "-q", "main")
+    commit(work, {"src/app.py": "print('hello')\n"}, "chore: tweak", "2024-01-03T10:00:00Z")
+    return tmp_path, work
+
+
+def make_service(tmp_path):
+    return LocalGitService(
+        cache_dir=str(tmp_path / "cache"),
+        remote=f"file://{tmp_path / 'remote'}",
+        clone_filter="",
+        refresh_interval=0,
+    )
+
+
+def test_reads_commits_tree_blobs_and_languages(fixture_repo):
+    tmp_path, _ = fixture_repo
+    service = make_service(tmp_path)
+
+    async def run():
+        commits = [commit async for page in service.iter_commits("acme", "widgets") for commit in page]
+        tree = await service.get_tree("acme", "widgets")
+        return (
+            commits,
+            tree,
+            await service.get_languages("acme", "widgets"),
+            await service.get_file_content("acme", "widgets", "src/app.py"),
+            await service.get_readme("acme", "widgets"),
+            await service.get_repository("acme", "widgets"),
+        )
+
+    commits, tree, languages, content, readme, repository = asyncio.run(run())
+    assert [c["commit"]["message"] for c in commits] == ["chore: tweak", "fix: export util", "feat: initial import"]
+    assert commits[-1]["commit"]["author"] == {"name": "Ada", "email": "ada@example.com",
+                                               "date": "2024-01-01T10:00:00Z"}
+    paths = {entry["path"]: entry for entry in tree["tree"]}
+    assert paths["src"]["type"] == "tree"
+    assert paths["src/app.py"]["size"] == len("print('hello')\n")
+    assert languages == {"Python": len("print('hello')\n"), "JavaScript": len("export const x = 1\n")}
+    assert content == "print('hello')\n"
+    assert readme == "# Widgets\n"
+    assert repository["default_branch"] == "main"
+    assert repository["created_at"] == "2024-01-01T10:00:00Z"
+
+
+def test_compare_includes_merged_commits_and_detects_rewrites(fixture_repo):
+    tmp_path, work = fixture_repo
+    service = make_service(tmp_path)
+    old_head = asyncio.run(service.get_head_sha("acme", "widgets"))
+
+    git(work, "merge", "-q", "--no-ff", "side", "-m", "Merge side", date="2024-01-04T10:00:00Z")
+    new_commits = asyncio.run(service.compare_commits("acme", "widgets", old_head,
+                                                      git(work, "rev-parse", "HEAD").strip()))
+    assert sorted(c["commit"]["message"] for c in new_commits) == ["Merge side", "docs: add guide"]
+
+    git(work, "reset", "-q", "--hard", "HEAD~2")
+    commit(work, {"src/new.py": "x = 1\n"}, "feat: rewrite", "2024-01-05T10:00:00Z")
+    rewritten_head = asyncio.run(service.get_head_sha("acme", "widgets"))
+    assert asyncio.run(service.compare_commits("acme", "widgets", old_head, rewritten_head)) is None
+
+
+@pytest.mark.parametrize("owner, repo", [("..", "widgets"), ("acme", ".."), ("acme/../..", "x"), ("acme", "a b")])
+def test_rejects_names_outside_the_cache_dir(tmp_path, owner, repo):
+    service = make_service(tmp_path)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(service.get_tree(owner, repo))
+    assert error.value.status_code == 400
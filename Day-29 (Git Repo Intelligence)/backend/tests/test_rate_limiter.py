@@ -0,0 +1,150 @@
+"""
+RateLimitScheduler budgets and priorities, and GitHubService retries against
+an httpx.MockTransport that emits rate-limit headers.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from services.blob_store import BlobStore
+from services.github_service import GitHubService
+from services.http_cache import HTTPCache
+from services.rate_limiter import BATCH, INTERACTIVE, RateLimitExceeded, RateLimitScheduler
+
+
+def rate_headers(remaining, limit=5000, reset_in=3600, resource="core", **extra):
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(time.time() + reset_in),
+        "x-ratelimit-resource": resource,
+        **extra,
+    }
+
+
+def test_budgets_are_tracked_per_token_and_resource():
+    scheduler = RateLimitScheduler(["alpha", "beta"])
+
+    async def run():
+        graphql = await scheduler.acquire(resource="graphql")
+        await scheduler.release(graphql, rate_headers(0, resource="graphql"), 200)
+        # alpha's GraphQL bucket is empty; its REST bucket is untouched
+        core = await scheduler.acquire()
+        await scheduler.release(core, rate_headers(4000), 200)
+        # A response can report a different bucket than the one reserved
+        search = await scheduler.acquire()
+        await scheduler.release(search, rate_headers(29, limit=30, resource="search"), 200)
+        return graphql, core, (await scheduler.acquire(resource="graphql"))
+
+    graphql, core, next_graphql = asyncio.run(run())
+    assert (graphql.token, core.token, next_graphql.token) == ("alpha", "alpha", "beta")
+    assert scheduler.budgets[("alpha", "graphql")].remaining == 0
+    assert scheduler.budgets[("alpha", "core")].remaining == 4000
+    assert scheduler.budgets[("beta", "search")].remaining == 29
+    assert scheduler.budgets[("beta", "core")].remaining is None
+
+
+def test_batch_calls_leave_the_reserve_to_interactive_calls():
+    scheduler = RateLimitScheduler(["alpha"], batch_reserve=0.2)
+
+    async def run():
+        budget = await scheduler.acquire()
+        await scheduler.release(budget, rate_headers(20, limit=100), 200)
+        # 20 of 100 left is exactly the batch reserve
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.acquire(BATCH), timeout=0.2)
+        return await asyncio.wait_for(scheduler.acquire(INTERACTIVE), timeout=0.2)
+
+    assert asyncio.run(run()).token == "alpha"
+
+
+def test_interactive_calls_are_admitted_before_waiting_batch_calls():
+    scheduler = RateLimitScheduler(["alpha"])
+    admitted = []
+
+    async def call(priority, name):
+        await scheduler.acquire(priority)
+        admitted.append(name)
+
+    async def run():
+        budget = await scheduler.acquire()
+        await scheduler.release(budget, rate_headers(0, reset_in=0.3), 200)
+        batch = asyncio.create_task(call(BATCH, "batch"))
+        await asyncio.sleep(0.05)
+        await asyncio.gather(batch, call(INTERACTIVE, "interactive"))
+
+    asyncio.run(run())
+    assert admitted == ["interactive", "batch"]
+    assert scheduler.stats()["admitted"] == {"interactive": 2, "batch": 1}
+
+
+def test_interactive_calls_fail_fast_past_max_wait():
+    scheduler = RateLimitScheduler(["alpha"], max_wait=1)
+
+    async def run():
+        budget = await scheduler.acquire()
+        await scheduler.release(budget, rate_headers(0), 200)
+        await scheduler.acquire()
+
+    with pytest.raises(RateLimitExceeded) as error:
+        asyncio.run(run())
+    assert error.value.retry_after > 3500
+
+
+def make_service(tmp_path, handler, scheduler):
+    service = GitHubService(
+        cache=HTTPCache(str(tmp_path / "http.sqlite")),
+        blobs=BlobStore(str(tmp_path / "blobs")),
+        scheduler=scheduler,
+    )
+    service._client = httpx.AsyncClient(headers=service.headers, transport=httpx.MockTransport(handler))
+    return service
+
+
+@pytest.mark.parametrize("status", [403, 429])
+def test_throttled_response_is_retried_on_another_token(tmp_path, status):
+    tokens = []
+
+    def handler(request):
+        token = request.headers["authorization"].split()[-1]
+        tokens.append(token)
+        if token == "alpha":
+            return httpx.Response(status, headers=rate_headers(0, **{"retry-after": "60"}))
+        return httpx.Response(200, headers=rate_headers(4999), json={"full_name": "acme/widgets"})
+
+    scheduler = RateLimitScheduler(["alpha", "beta"])
+    service = make_service(tmp_path, handler, scheduler)
+
+    async def run():
+        response = await service._get(f"{service.api_url}/repos/acme/widgets", use_cache=False)
+        await service.close()
+        return response
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert tokens == ["alpha", "beta"]
+    alpha = scheduler.budgets[("alpha", "core")]
+    assert alpha.throttled == 1
+    assert alpha.blocked_until > time.time() + 50
+
+
+def test_exhausted_budget_surfaces_as_429(tmp_path):
+    def handler(request):
+        return httpx.Response(200, headers=rate_headers(0), json={"full_name": "acme/widgets"})
+
+    service = make_service(tmp_path, handler, RateLimitScheduler(["alpha"], max_wait=1))
+
+    async def run():
+        await service.get_repository("acme", "widgets")
+        try:
+            await service._get(f"{service.api_url}/repos/acme/gadgets")
+        finally:
+            await service.close()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run())
+    assert error.value.status_code == 429
+    assert int(error.value.headers["Retry-After"]) > 3500
@@ -0,0 +1,141 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+# Profile plus public repositories (what /users/{login} and /users/{login}/repos return)
+USER_FIELDS = """
+fragment UserFields on User {
+  login
+  name
+  avatarUrl
+  bio
+  company
+  location
+  email
+  websiteUrl
+  createdAt
+  followers { totalCount }
+  following { totalCount }
+  repositories(first: 100, privacy: PUBLIC, ownerAffiliations: OWNER,
+               orderBy: {field: UPDATED_AT, direction: DESC}) {
+    totalCount
+    nodes {
+      name
+      description
+      primaryLanguage { name }
+      stargazerCount
+      forkCount
+      diskUsage
+      createdAt
+      updatedAt
+    }
+  }
+}
+"""
+
+
+class QueryBatcher:
+    """
+    Coalesces lookups made within `window` seconds (or `max_batch` of
+    them) into a single call of `execute`, which receives the distinct keys
+    and returns a result, or an exception, per key. Used to fold concurrent
+    GraphQL lookups into one aliased query.
+    """
+
+    def __init__(self, execute: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                 max_batch: int = 10, window: float = 0.01):
+        self.execute = execute
+        self.max_batch = max_batch
+        self.window = window
+        self.queries = 0
+        self.keys = 0
+        self._pending: List[Tuple[Hashable, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((key, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Hashable, asyncio.Future]]) -> None:
+        keys = list(dict.fromkeys(key for key, _ in batch))
+        self.queries += 1
+        self.keys += len(keys)
+        try:
+            results = await self.execute(keys)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch:
+            if future.done():
+                continue
+            value = results.get(key)
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def stats(self) -> Dict:
+        return {
+            "queries": self.queries,
+            "keys": self.keys,
+            "avg_batch_size": round(self.keys / self.queries, 2) if self.queries else 0.0
+        }
+
+
+def build_user_query(count: int) -> str:
+    """Aliased query fetching `count` users (u0, u1, ...) in one round-trip"""
+    variables = ", ".join(f"$l{i}: String!" for i in range(count))
+    selections = "\n".join(f"  u{i}: user(login: $l{i}) {{ ...UserFields }}" for i in range(count))
+    return f"query({variables}) {{\n{selections}\n}}\n{USER_FIELDS}"
+
+
+def user_bundle(node: Dict) -> Tuple[Dict, List[Dict]]:
+    """Convert a UserFields node to REST-shaped profile and repository payloads"""
+    repositories = node.get('repositories') or {}
+    profile = {
+        "login": node['login'],
+        "name": node.get('name'),
+        "avatar_url": node.get('avatarUrl'),
+        "bio": node.get('bio'),
+        "company": node.get('company'),
+        "location": node.get('location'),
+        # GraphQL returns "" rather than null for hidden emails and blogs
+        "email": node.get('email') or None,
+        "blog": node.get('websiteUrl') or None,
+        "public_repos": repositories.get('totalCount', 0),
+        "followers": node['followers']['totalCount'],
+        "following": node['following']['totalCount'],
+        "created_at": node.get('createdAt')
+    }
+    repos = [
+        {
+            "name": repo['name'],
+            "description": repo.get('description'),
+            "language": (repo.get('primaryLanguage') or {}).get('name'),
+            "stargazers_count": repo.get('stargazerCount', 0),
+            "forks_count": repo.get('forkCount', 0),
+            "size": repo.get('diskUsage') or 0,
+            "created_at": repo.get('createdAt'),
+            "updated_at": repo.get('updatedAt')
+        }
+        for repo in repositories.get('nodes') or []
+    ]
+    return profile, repos
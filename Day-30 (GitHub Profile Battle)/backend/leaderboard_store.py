@@ -0,0 +1,160 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+# ProfileScore fields that can be ranked
+METRICS = ("total", "activity", "quality", "impact", "consistency")
+
+
+class LeaderboardStore:
+    """
+    Every computed profile score, persisted in SQLite and ranked in memory.
+
+    SQLite (one row per login, indexed on each metric) is the durable copy.
+    On startup it is loaded into one sorted list per metric of
+    (-score, login) keys, so a page is a bisect plus a slice and a rank or
+    percentile is a single bisect. Re-scoring a login moves its key in each
+    list instead of re-sorting.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(f"""
+            CREATE TABLE IF NOT EXISTS scores (
+                login_key TEXT PRIMARY KEY,
+                login TEXT NOT NULL,
+                name TEXT,
+                avatar_url TEXT NOT NULL,
+                {", ".join(f"{metric} REAL NOT NULL" for metric in METRICS)},
+                breakdown TEXT NOT NULL,
+                languages TEXT NOT NULL,
+                scored_at REAL NOT NULL
+            )
+        """)
+        for metric in METRICS:
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_scores_{metric} ON scores ({metric} DESC, login_key)")
+        self._db.commit()
+
+        # login_key -> (login, name, avatar_url, {metric: score}, breakdown, languages)
+        self._entries: Dict[str, Tuple] = {}
+        self._index: Dict[str, List[Tuple[float, str]]] = {metric: [] for metric in METRICS}
+        self._load()
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            f"SELECT login_key, login, name, avatar_url, {', '.join(METRICS)}, breakdown, languages FROM scores"
+        ).fetchall()
+        for row in rows:
+            scores = dict(zip(METRICS, row[4:4 + len(METRICS)]))
+            self._entries[row[0]] = (row[1], row[2], row[3], scores, json.loads(row[-2]), json.loads(row[-1]))
+        for metric in METRICS:
+            self._index[metric] = sorted((-entry[3][metric], key) for key, entry in self._entries.items())
+
+    def record(self, login: str, name: Optional[str], avatar_url: str, scores: Dict[str, float],
+               breakdown: Dict[str, int], languages: List[str]) -> None:
+        """Store a (re)computed score and move the login to its new rank"""
+        key = login.lower()
+        scores = {metric: float(scores[metric]) for metric in METRICS}
+        with self._lock:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, {', '.join('?' * len(METRICS))}, ?, ?, ?)",
+                (key, login, name, avatar_url, *(scores[metric] for metric in METRICS),
+                 json.dumps(breakdown), json.dumps(languages), time.time())
+            )
+            self._db.commit()
+
+            previous = self._entries.get(key)
+            for metric in METRICS:
+                index = self._index[metric]
+                if previous is not None:
+                    old = (-previous[3][metric], key)
+                    position = bisect_left(index, old)
+                    if position < len(index) and index[position] == old:
+                        del index[position]
+                insort(index, (-scores[metric], key))
+            self._entries[key] = (login, name, avatar_url, scores, breakdown, languages)
+
+    def breakdowns(self) -> Tuple[List[str], List[Dict[str, int]]]:
+        """(login keys, score breakdowns) of every stored profile"""
+        with self._lock:
+            keys = list(self._entries)
+            return keys, [self._entries[key][4] for key in keys]
+
+    def rescore(self, keys: List[str], scores: List[Dict[str, float]]) -> None:
+        """Replace the scores of many logins at once and rebuild the rankings"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                f"UPDATE scores SET {', '.join(f'{metric} = ?' for metric in METRICS)}, scored_at = ? "
+                "WHERE login_key = ?",
+                [(*(float(row[metric]) for metric in METRICS), now, key) for key, row in zip(keys, scores)]
+            )
+            self._db.commit()
+            for key, row in zip(keys, scores):
+                login, name, avatar_url, _, breakdown, languages = self._entries[key]
+                self._entries[key] = (login, name, avatar_url, {metric: float(row[metric]) for metric in METRICS},
+                                      breakdown, languages)
+            for metric in METRICS:
+                self._index[metric] = sorted((-entry[3][metric], key) for key, entry in self._entries.items())
+
+    def page(self, metric: str, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Entries ranked `offset + 1` onwards by `metric`"""
+        with self._lock:
+            keys = self._index[metric][offset:offset + limit]
+            return [self._entry(key, offset + position + 1) for position, (_, key) in enumerate(keys)]
+
+    def rank(self, login: str, metric: str) -> Optional[Dict]:
+        """Rank and percentile (share of users scoring lower) of one login by `metric`"""
+        key = login.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            index = self._index[metric]
+            score = -entry[3][metric]
+            # Ties are ordered by login; the percentile counts users with a strictly lower score
+            below = len(index) - bisect_left(index, (score, "\uffff"))
+            return {
+                **self._entry(key, bisect_left(index, (score, key)) + 1),
+                "percentile": round(below / len(index) * 100, 2)
+            }
+
+    def _entry(self, key: str, rank: int) -> Dict:
+        login, name, avatar_url, scores, breakdown, languages = self._entries[key]
+        return {
+            "rank": rank,
+            "login": login,
+            "name": name,
+            "avatar_url": avatar_url,
+            "scores": scores,
+            "breakdown": breakdown,
+            "top_languages": languages
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> Dict:
+        return {"path": self.path, "users": len(self._entries)}
+
+
+def leaderboard_from_env() -> Optional[LeaderboardStore]:
+    """Leaderboard store at LEADERBOARD_PATH (None when LEADERBOARD_ENABLED is false)"""
+    if os.getenv("LEADERBOARD_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return LeaderboardStore(os.getenv("LEADERBOARD_PATH", ".cache/leaderboard.sqlite"))
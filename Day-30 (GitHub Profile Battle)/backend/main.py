@@ -1,14 +1,33 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import httpx
 import os
 import json
+import secrets
 from datetime import datetime
 import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs, urlparse
 
-app = FastAPI(title="GitHub Profile Battle API")
+from http_cache import HTTPCache, cache_from_env
+from rate_limiter import BATCH, RateLimitExceeded, RateLimitScheduler, TokenBudget, request_priority, scheduler_from_env
+from github_graphql import QueryBatcher, build_user_query, user_bundle
+from profile_cache import ProfileCache, profile_cache_from_env
+from leaderboard_store import METRICS, LeaderboardStore, leaderboard_from_env
+from scoring import ProfileBatch, ScoringEngine, population_reference, score_rows, scoring_engine_from_env
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await github_service.close()
+    if github_service.leaderboard:
+        github_service.leaderboard.close()
+
+app = FastAPI(title="GitHub Profile Battle API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -74,41 +93,259 @@ class BattleRequest(BaseModel):
 class ProfileRequest(BaseModel):
     username: str
 
+class TournamentRequest(BaseModel):
+    logins: List[str]
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    login: str
+    name: Optional[str]
+    avatar_url: str
+    score: ProfileScore
+    top_languages: List[str]
+
+class BracketMatch(BaseModel):
+    round: int
+    winner: str
+    loser: Optional[str]  # None when the winner had a bye
+    winner_score: float
+    loser_score: Optional[float]
+
+class RankedProfile(BaseModel):
+    rank: int
+    login: str
+    name: Optional[str]
+    avatar_url: str
+    scores: Dict[str, float]
+    breakdown: Dict[str, int]
+    top_languages: List[str]
+    percentile: Optional[float] = None
+
+class LeaderboardPage(BaseModel):
+    metric: str
+    total_users: int
+    offset: int
+    entries: List[RankedProfile]
+
+class ScoringConfig(BaseModel):
+    points: Optional[Dict[str, float]] = None
+    saturation: Optional[Dict[str, float]] = None
+    normalization: str = "absolute"
+
+class TournamentResult(BaseModel):
+    champion: Optional[str]
+    participants: int
+    leaderboard: List[LeaderboardEntry]
+    rounds: List[List[BracketMatch]]
+    failed: Dict[str, str]
+    summary: List[str]
+
+def parse_link_header(header: Optional[str]) -> Dict[str, str]:
+    """Parse a GitHub Link header into {rel: url}"""
+    links = {}
+    if not header:
+        return links
+    for part in header.split(','):
+        segments = part.split(';')
+        url = segments[0].strip().strip('<>')
+        for segment in segments[1:]:
+            name, _, value = segment.strip().partition('=')
+            if name == 'rel':
+                links[value.strip('"')] = url
+    return links
+
+def page_number(url: Optional[str]) -> Optional[int]:
+    """Extract the page query parameter from a pagination URL"""
+    if not url:
+        return None
+    pages = parse_qs(urlparse(url).query).get('page')
+    return int(pages[0]) if pages else None
+
 # GitHub Service
 class GitHubService:
-    def __init__(self, token: Optional[str] = None):
-        self.token = token
-        self.base_url = "https://api.github.com"
-        
-    async def get_profile(self, username: str) -> GitHubProfile:
+    def __init__(self, token: Optional[str] = None, cache: Optional[HTTPCache] = None,
+                 scheduler: Optional[RateLimitScheduler] = None, profiles: Optional[ProfileCache] = None,
+                 leaderboard: Optional[LeaderboardStore] = None, scoring: Optional[ScoringEngine] = None):
+        self.base_url = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+        self.cache = cache if cache is not None else cache_from_env()
+        # Stale-while-revalidate cache of ProfileAnalysis objects by login
+        self.profiles = profiles if profiles is not None else profile_cache_from_env()
+        # Every computed score, ranked per metric (None when disabled)
+        self.leaderboard = leaderboard if leaderboard is not None else leaderboard_from_env()
+        # Score formula (weights and normalization); percentiles are taken against the stored population
+        self.scoring = scoring or scoring_engine_from_env()
+        # The percentile reference is refit once the leaderboard grows by this fraction
+        self.refit_growth = float(os.getenv("SCORE_REFIT_GROWTH", 0.05))
+        self._fitted_size = 0
+        self._refitting = False
+        if self.scoring.normalization == "percentile" and self.leaderboard is not None:
+            self.scoring.fit(ProfileBatch.from_breakdowns(self.leaderboard.breakdowns()[1]))
+            self._fitted_size = len(self.leaderboard)
+        # Rotates GITHUB_TOKENS (or the single token) and tracks their rate limits
+        if scheduler is None:
+            scheduler = RateLimitScheduler([token]) if token else scheduler_from_env()
+        self.scheduler = scheduler
+        # Repository pages fetched at once for accounts with more than 100 repos
+        self.page_concurrency = int(os.getenv("GITHUB_PAGE_CONCURRENCY", 4))
+        # GITHUB_FETCH_MODE=graphql loads profile and repositories in one query,
+        # folding concurrent lookups (e.g. both sides of a battle) together
+        self.use_graphql = os.getenv("GITHUB_FETCH_MODE", "rest").lower() == "graphql"
+        self.graphql_url = os.getenv("GITHUB_GRAPHQL_URL", f"{self.base_url}/graphql")
+        self.user_batcher = QueryBatcher(
+            self._fetch_user_bundles,
+            max_batch=int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", 10)),
+            window=float(os.getenv("GITHUB_GRAPHQL_BATCH_WINDOW_MS", 10)) / 1000,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        """
+        Shared connection pool, created on first use. Building a client costs
+        tens of milliseconds of CPU, which would stall every request on the
+        event loop (including cached battles during a background refresh).
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    async def _get(self, url: str, params: Optional[Dict] = None, attempts: int = 3) -> httpx.Response:
+        """GET through the conditional-request cache (ETag / Last-Modified)"""
         headers = {"Accept": "application/vnd.github.v3+json"}
-        if self.token:
-            headers["Authorization"] = f"token {self.token}"
-            
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/users/{username}", headers=headers)
-            if response.status_code == 404:
-                raise HTTPException(status_code=404, detail="User not found")
-            elif response.status_code != 200:
-                raise HTTPException(status_code=400, detail="GitHub API error")
-            return GitHubProfile(**response.json())
+
+        client = self.client()
+        request = client.build_request("GET", url, params=params, headers=headers)
+        if self.cache is None:
+            return await self._send(client, request)
+
+        # Cache keys include Authorization, so the token is chosen before the
+        # lookup and the call is pinned to it; a throttled token moves the
+        # whole lookup over to the next token's cache entry
+        for attempt in range(attempts):
+            budget = self.scheduler.preferred()
+            self._authorize(request, budget)
+            throttled = False
+
+            async def send(conditional_headers: Dict[str, str]) -> httpx.Response:
+                nonlocal throttled
+                for name in ("If-None-Match", "If-Modified-Since"):
+                    request.headers.pop(name, None)
+                request.headers.update(conditional_headers)
+                response, throttled = await self._send_once(client, request, pinned=budget)
+                return response
+
+            response = await self.cache.fetch(request, send)
+            if not throttled or attempt == attempts - 1:
+                return response
+            await response.aclose()
+        return response
+
+    async def _send(self, client: httpx.AsyncClient, request: httpx.Request, attempts: int = 3,
+                    resource: str = "core") -> httpx.Response:
+        """Send once the scheduler grants `resource` budget; rate-limited responses are retried"""
+        for attempt in range(attempts):
+            response, throttled = await self._send_once(client, request, resource)
+            if not throttled or attempt == attempts - 1:
+                return response
+            await response.aclose()
+        return response
+
+    async def _send_once(self, client: httpx.AsyncClient, request: httpx.Request, resource: str = "core",
+                         pinned: Optional[TokenBudget] = None) -> Tuple[httpx.Response, bool]:
+        """One send on a granted token; returns the response and whether it was throttled"""
+        try:
+            budget = await self.scheduler.acquire(resource=resource, pinned=pinned)
+        except RateLimitExceeded as e:
+            raise HTTPException(status_code=429, detail=str(e),
+                                headers={"Retry-After": str(int(e.retry_after) + 1)})
+        self._authorize(request, budget)
+        response = None
+        try:
+            response = await client.send(request)
+        finally:
+            throttled = await self.scheduler.release(
+                budget, response.headers if response is not None else None,
+                response.status_code if response is not None else None
+            )
+        return response, throttled
+
+    @staticmethod
+    def _authorize(request: httpx.Request, budget: TokenBudget) -> None:
+        if budget.token:
+            request.headers["Authorization"] = f"token {budget.token}"
+        else:
+            request.headers.pop("Authorization", None)
+
+    async def _fetch_user_bundles(self, logins: List[str]) -> Dict[str, object]:
+        query = {
+            "query": build_user_query(len(logins)),
+            "variables": {f"l{i}": login for i, login in enumerate(logins)}
+        }
+        client = self.client()
+        request = client.build_request("POST", self.graphql_url, json=query)
+        response = await self._send(client, request, resource="graphql")
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail="GitHub API error")
+
+        data = response.json().get("data") or {}
+        results = {}
+        for i, login in enumerate(logins):
+            node = data.get(f"u{i}")
+            results[login] = user_bundle(node) if node else HTTPException(status_code=404, detail="User not found")
+        return results
+
+    async def get_profile_and_repositories(self, username: str) -> Tuple[GitHubProfile, List[Repository]]:
+        if self.use_graphql:
+            profile, repos = await self.user_batcher.load(username)
+            profile = GitHubProfile(**profile)
+            # The query returns the first 100 repositories; page through REST for the rest
+            if len(repos) < profile.public_repos:
+                return profile, await self.get_repositories(username)
+            return profile, [Repository(**repo) for repo in repos]
+        return await asyncio.gather(self.get_profile(username), self.get_repositories(username))
+
+    async def get_profile(self, username: str) -> GitHubProfile:
+        response = await self._get(f"{self.base_url}/users/{username}")
+        if response.status_code == 404:
+            raise HTTPException(status_code=404, detail="User not found")
+        elif response.status_code != 200:
+            raise HTTPException(status_code=400, detail="GitHub API error")
+        return GitHubProfile(**response.json())
     
+    async def _get_repository_page(self, username: str, page: int) -> Tuple[List[Repository], Dict[str, str]]:
+        response = await self._get(
+            f"{self.base_url}/users/{username}/repos",
+            params={"per_page": 100, "sort": "updated", "page": page}
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail="Failed to fetch repositories")
+        return [Repository(**repo) for repo in response.json()], parse_link_header(response.headers.get("link"))
+
     async def get_repositories(self, username: str) -> List[Repository]:
-        headers = {"Accept": "application/vnd.github.v3+json"}
-        if self.token:
-            headers["Authorization"] = f"token {self.token}"
-            
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/users/{username}/repos",
-                headers=headers,
-                params={"per_page": 100, "sort": "updated"}
-            )
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail="Failed to fetch repositories")
-            
-            repos_data = response.json()
-            return [Repository(**repo) for repo in repos_data]
+        """
+        All public repositories, most recently updated first. The Link header
+        of the first page gives the page count; the remaining pages are
+        fetched `page_concurrency` at a time and converted as they arrive.
+        """
+        repositories, links = await self._get_repository_page(username, 1)
+        last_page = page_number(links.get("last"))
+        if not last_page or last_page < 2:
+            return repositories
+
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+
+        async def fetch(page: int) -> List[Repository]:
+            async with semaphore:
+                return (await self._get_repository_page(username, page))[0]
+
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, last_page + 1)))
+        for page_repositories in pages:
+            repositories.extend(page_repositories)
+        return repositories
     
     def calculate_languages(self, repositories: List[Repository]) -> Dict[str, int]:
         languages = {}
@@ -125,20 +362,12 @@ class GitHubService:
         total_forks = sum(repo.forks_count for repo in repositories)
         language_count = len(languages)
         
-        # Scoring algorithm (0-100 scale)
-        activity = min((len(repositories) / 20) * 25, 25)  # Max 25 points
-        quality = min((total_stars / 100) * 30, 30)        # Max 30 points  
-        impact = min((profile.followers / 50) * 25, 25)    # Max 25 points
-        consistency = min((language_count / 8) * 20, 20)   # Max 20 points
-        
-        total = activity + quality + impact + consistency
+        # Scoring algorithm (0-100 scale by default), shared with batch re-scoring
+        batch = ProfileBatch([len(repositories)], [total_stars], [total_forks], [profile.followers], [language_count])
+        scores = score_rows(self.scoring.score(batch))[0]
         
         return ProfileScore(
-            total=total,
-            activity=activity,
-            quality=quality,
-            impact=impact,
-            consistency=consistency,
+            **scores,
             breakdown={
                 "repos": len(repositories),
                 "followers": profile.followers,
@@ -149,14 +378,24 @@ class GitHubService:
         )
     
     async def analyze_profile(self, username: str) -> ProfileAnalysis:
-        profile, repositories = await asyncio.gather(
-            self.get_profile(username),
-            self.get_repositories(username)
-        )
+        """Profile analysis, served from the profile cache when it is enabled"""
+        if self.profiles is None:
+            return await self._build_analysis(username)
+        return await self.profiles.get(username, lambda: self._build_analysis(username))
+
+    async def _build_analysis(self, username: str) -> ProfileAnalysis:
+        profile, repositories = await self.get_profile_and_repositories(username)
         
         languages = self.calculate_languages(repositories)
         top_repos = self.get_top_repositories(repositories)
         score = self.calculate_score(profile, repositories, languages)
+        if self.leaderboard is not None:
+            await asyncio.to_thread(
+                self.leaderboard.record, profile.login, profile.name, profile.avatar_url,
+                score.model_dump(include=set(METRICS)), score.breakdown,
+                sorted(languages, key=languages.get, reverse=True)[:3]
+            )
+            await self.refresh_reference()
         
         return ProfileAnalysis(
             profile=profile,
@@ -166,11 +405,46 @@ class GitHubService:
             top_repos=top_repos
         )
 
+    async def refresh_reference(self) -> None:
+        """
+        Refit percentile normalization on the leaderboard once it has grown
+        by `refit_growth` since the last fit. The population is sorted in a
+        thread and the engine updated on the event loop, unless /api/rescore
+        swapped in another engine meanwhile.
+        """
+        engine = self.scoring
+        if engine.normalization != "percentile" or self.leaderboard is None or self._refitting:
+            return
+        size = len(self.leaderboard)
+        if size - self._fitted_size < max(1, self._fitted_size * self.refit_growth):
+            return
+        def fit_population() -> Tuple[int, Optional[Dict]]:
+            breakdowns = self.leaderboard.breakdowns()[1]
+            return len(breakdowns), population_reference(ProfileBatch.from_breakdowns(breakdowns))
+
+        self._refitting = True
+        try:
+            size, reference = await asyncio.to_thread(fit_population)
+        finally:
+            self._refitting = False
+        if self.scoring is engine:
+            engine.reference = reference
+            self._fitted_size = size
+
+    def use_scoring(self, engine: ScoringEngine, population: int) -> None:
+        """Make `engine` the active formula; `population` is the number of profiles it was fitted on"""
+        self.scoring = engine
+        self._fitted_size = population
+
 # AI Service
 class AIService:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_cached: int = 256):
         self.api_key = api_key
         self.base_url = "https://openrouter.ai/api/v1"
+        # (login, login, score, score) -> (insights, recommendations); the same
+        # matchups recur, and their insights only change when a score does
+        self.max_cached = max_cached
+        self._insights: "OrderedDict[tuple, tuple]" = OrderedDict()
     
     async def generate_battle_insights(self, profile1: ProfileAnalysis, profile2: ProfileAnalysis) -> BattleResult:
         winner = profile1.profile.login if profile1.score.total > profile2.score.total else profile2.profile.login
@@ -178,13 +452,27 @@ class AIService:
         winner_analysis = profile1 if winner == profile1.profile.login else profile2
         loser_analysis = profile2 if winner == profile1.profile.login else profile1
         
-        try:
-            insights = await self._call_openrouter_for_insights(profile1, profile2)
-            recommendations = await self._call_openrouter_for_recommendations(winner_analysis, loser_analysis)
-        except:
-            # Fallback insights if AI fails
-            insights = self._generate_fallback_insights(profile1, profile2)
-            recommendations = self._generate_fallback_recommendations(winner_analysis, loser_analysis)
+        key = (profile1.profile.login.lower(), profile2.profile.login.lower(),
+               round(profile1.score.total, 2), round(profile2.score.total, 2))
+        cached = self._insights.get(key)
+        if cached is not None:
+            self._insights.move_to_end(key)
+            insights, recommendations = cached
+        else:
+            try:
+                if not self.api_key:
+                    raise Exception("OPENROUTER_API_KEY is not set")
+                insights, recommendations = await asyncio.gather(
+                    self._call_openrouter_for_insights(profile1, profile2),
+                    self._call_openrouter_for_recommendations(winner_analysis, loser_analysis)
+                )
+                self._insights[key] = (insights, recommendations)
+                if len(self._insights) > self.max_cached:
+                    self._insights.popitem(last=False)
+            except:
+                # Fallback insights if AI fails
+                insights = self._generate_fallback_insights(profile1, profile2)
+                recommendations = self._generate_fallback_recommendations(winner_analysis, loser_analysis)
         
         return BattleResult(
             winner=winner,
@@ -277,6 +565,78 @@ class AIService:
             else:
                 raise Exception("API call failed")
     
+    async def generate_tournament_summary(self, leaderboard: List[LeaderboardEntry], champion: Optional[str]) -> List[str]:
+        """One summary for the whole tournament (never one call per match)"""
+        if not leaderboard:
+            return []
+        try:
+            if not self.api_key:
+                raise Exception("OPENROUTER_API_KEY is not set")
+            return await self._call_openrouter_for_tournament(leaderboard, champion)
+        except:
+            return self._generate_fallback_tournament_summary(leaderboard, champion)
+
+    async def _call_openrouter_for_tournament(self, leaderboard: List[LeaderboardEntry], champion: Optional[str]) -> List[str]:
+        standings = "\n".join(
+            f"        {entry.rank}. {entry.login} - Score: {entry.score.total:.1f}, "
+            f"Repositories: {entry.score.breakdown['repos']}, Stars: {entry.score.breakdown['stars']}, "
+            f"Followers: {entry.score.breakdown['followers']}, Languages: {', '.join(entry.top_languages)}"
+            for entry in leaderboard[:10]
+        )
+        prompt = f"""
+        Summarize this GitHub profile tournament of {len(leaderboard)} developers in 3-5 insights.
+        Champion: {champion}
+
+        Top standings:
+{standings}
+
+        Provide insights as a JSON array of strings.
+        """
+
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": "openai/gpt-3.5-turbo",
+                    "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": 500
+                }
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                content = result['choices'][0]['message']['content']
+                try:
+                    return json.loads(content)
+                except:
+                    return content.split('\n')[:5]
+            else:
+                raise Exception("API call failed")
+
+    def _generate_fallback_tournament_summary(self, leaderboard: List[LeaderboardEntry], champion: Optional[str]) -> List[str]:
+        leader = leaderboard[0]
+        insights = [f"{champion or leader.login} wins the tournament of {len(leaderboard)} developers"]
+        insights.append(f"{leader.login} tops the leaderboard with a score of {leader.score.total:.1f}")
+
+        most_stars = max(leaderboard, key=lambda entry: entry.score.breakdown['stars'])
+        insights.append(f"{most_stars.login} has the most stars ({most_stars.score.breakdown['stars']})")
+
+        languages = {}
+        for entry in leaderboard:
+            for language in entry.top_languages:
+                languages[language] = languages.get(language, 0) + 1
+        if languages:
+            language = max(languages, key=languages.get)
+            insights.append(f"{language} is the most common top language ({languages[language]} developers)")
+
+        average = sum(entry.score.total for entry in leaderboard) / len(leaderboard)
+        insights.append(f"The average score is {average:.1f}")
+        return insights
+
     def _generate_fallback_insights(self, profile1: ProfileAnalysis, profile2: ProfileAnalysis) -> List[str]:
         insights = []
         
@@ -308,15 +668,139 @@ class AIService:
             ]
         }
 
+# Tournament Service
+class TournamentService:
+    def __init__(self, github: GitHubService, ai: AIService):
+        self.github = github
+        self.ai = ai
+        self.max_logins = int(os.getenv("TOURNAMENT_MAX_LOGINS", 300))
+        # Profiles analyzed at once; every fetch still goes through the shared rate limit scheduler
+        self.concurrency = int(os.getenv("TOURNAMENT_CONCURRENCY", 8))
+
+    @staticmethod
+    def unique_logins(logins: List[str]) -> List[str]:
+        """Logins stripped and deduplicated case-insensitively, first spelling kept"""
+        unique: Dict[str, str] = {}
+        for login in logins:
+            if login.strip():
+                unique.setdefault(login.strip().lower(), login.strip())
+        return list(unique.values())
+
+    async def run(self, logins: List[str]) -> TournamentResult:
+        logins = self.unique_logins(logins)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def analyze(login: str) -> ProfileAnalysis:
+            async with semaphore:
+                return await self.github.analyze_profile(login)
+
+        # Bulk scoring draws on the batch share of the rate limit, keeping the reserve for battles
+        priority = request_priority.set(BATCH)
+        try:
+            results = await asyncio.gather(*(analyze(login) for login in logins), return_exceptions=True)
+        finally:
+            request_priority.reset(priority)
+
+        analyses = []
+        failed = {}
+        for login, result in zip(logins, results):
+            if isinstance(result, HTTPException):
+                failed[login] = str(result.detail)
+            elif isinstance(result, Exception):
+                failed[login] = str(result) or type(result).__name__
+            else:
+                analyses.append(result)
+
+        ranked = sorted(analyses, key=lambda analysis: (-analysis.score.total, analysis.profile.login.lower()))
+        leaderboard = [
+            LeaderboardEntry(
+                rank=rank,
+                login=analysis.profile.login,
+                name=analysis.profile.name,
+                avatar_url=analysis.profile.avatar_url,
+                score=analysis.score,
+                top_languages=sorted(analysis.languages, key=analysis.languages.get, reverse=True)[:3]
+            )
+            for rank, analysis in enumerate(ranked, start=1)
+        ]
+        rounds = self.build_brackets(leaderboard)
+        champion = rounds[-1][0].winner if rounds else (leaderboard[0].login if leaderboard else None)
+
+        return TournamentResult(
+            champion=champion,
+            participants=len(leaderboard),
+            leaderboard=leaderboard,
+            rounds=rounds,
+            failed=failed,
+            summary=await self.ai.generate_tournament_summary(leaderboard, champion)
+        )
+
+    @staticmethod
+    def seed_order(size: int) -> List[int]:
+        """Standard bracket seeding for a power-of-two field (1 v 16, 8 v 9, ...)"""
+        order = [1]
+        while len(order) < size:
+            order = [seed for top in order for seed in (top, len(order) * 2 + 1 - top)]
+        return order
+
+    def build_brackets(self, leaderboard: List[LeaderboardEntry]) -> List[List[BracketMatch]]:
+        """
+        Single-elimination rounds seeded by leaderboard rank. Matches are
+        decided locally by score (ties go to the higher seed); missing
+        seeds in a field that is not a power of two become byes.
+        """
+        if len(leaderboard) < 2:
+            return []
+        size = 1
+        while size < len(leaderboard):
+            size *= 2
+        field = [leaderboard[seed - 1] if seed <= len(leaderboard) else None for seed in self.seed_order(size)]
+
+        rounds = []
+        while len(field) > 1:
+            matches = []
+            next_field = []
+            for first, second in zip(field[::2], field[1::2]):
+                if second is None or first is None:
+                    winner, loser = first or second, None
+                elif (second.score.total, -second.rank) > (first.score.total, -first.rank):
+                    winner, loser = second, first
+                else:
+                    winner, loser = first, second
+                matches.append(BracketMatch(
+                    round=len(rounds) + 1,
+                    winner=winner.login,
+                    loser=loser.login if loser else None,
+                    winner_score=winner.score.total,
+                    loser_score=loser.score.total if loser else None
+                ))
+                next_field.append(winner)
+            rounds.append(matches)
+            field = next_field
+        return rounds
+
 # Initialize services
-github_service = GitHubService(os.getenv("GITHUB_TOKEN"))
+github_service = GitHubService()
 ai_service = AIService(os.getenv("OPENROUTER_API_KEY"))
+tournament_service = TournamentService(github_service, ai_service)
 
 # Routes
 @app.get("/")
 async def root():
     return {"message": "GitHub Profile Battle API"}
 
+@app.get("/api/stats")
+async def service_stats():
+    return {
+        "http_cache": github_service.cache.stats() if github_service.cache else None,
+        "rate_limit": github_service.scheduler.stats(),
+        "profile_cache": github_service.profiles.stats() if github_service.profiles else None,
+        "leaderboard": github_service.leaderboard.stats() if github_service.leaderboard else None,
+        "scoring": github_service.scoring.config(),
+        "graphql_batching": github_service.user_batcher.stats() if github_service.use_graphql else None
+    }
+
 @app.post("/api/battle", response_model=BattleResult)
 async def battle_profiles(request: BattleRequest):
     try:
@@ -328,13 +812,108 @@ async def battle_profiles(request: BattleRequest):
         result = await ai_service.generate_battle_insights(profile1, profile2)
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/api/tournament", response_model=TournamentResult)
+async def run_tournament(request: TournamentRequest):
+    """
+    Rank up to TOURNAMENT_MAX_LOGINS users by profile score and play out
+    seeded brackets locally; the LLM is asked once for the summary
+    """
+    logins = TournamentService.unique_logins(request.logins)
+    if len(logins) < 2:
+        raise HTTPException(status_code=400, detail="A tournament needs at least two logins")
+    if len(logins) > tournament_service.max_logins:
+        raise HTTPException(status_code=400, detail=f"At most {tournament_service.max_logins} logins per tournament")
+    try:
+        return await tournament_service.run(logins)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def check_leaderboard(metric: str) -> LeaderboardStore:
+    if github_service.leaderboard is None:
+        raise HTTPException(status_code=404, detail="Leaderboard is disabled")
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+    return github_service.leaderboard
+
+@app.get("/api/leaderboard", response_model=LeaderboardPage)
+async def leaderboard(metric: str = "total", offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=200)):
+    """Every scored profile ranked by `metric` (total or one of the sub-scores)"""
+    store = check_leaderboard(metric)
+    return LeaderboardPage(
+        metric=metric,
+        total_users=len(store),
+        offset=offset,
+        entries=store.page(metric, offset, limit)
+    )
+
+@app.get("/api/leaderboard/{login}", response_model=RankedProfile)
+async def leaderboard_rank(login: str, metric: str = "total"):
+    """Rank and percentile of one scored profile"""
+    entry = check_leaderboard(metric).rank(login, metric)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile has not been scored yet")
+    return entry
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Admin endpoints need the X-Admin-Token header to match ADMIN_TOKEN; they are disabled when it is unset"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+def score_population(engine: ScoringEngine, breakdowns: List[Dict[str, int]]) -> List[Dict[str, float]]:
+    """Score stored breakdowns with `engine` in one vectorized pass (fitting it first for percentile normalization)"""
+    batch = ProfileBatch.from_breakdowns(breakdowns)
+    if engine.normalization == "percentile":
+        engine.fit(batch)
+    return score_rows(engine.score(batch))
+
+# Serializes rescoring so two formulas can't interleave their writes
+rescore_lock = asyncio.Lock()
+
+@app.post("/api/rescore", dependencies=[Depends(require_admin)])
+async def rescore(config: ScoringConfig):
+    """
+    Switch to new scoring weights / normalization and re-score every
+    profile on the leaderboard from its stored breakdown (no GitHub calls)
+    """
+    store = check_leaderboard("total")
+    try:
+        engine = ScoringEngine(config.points, config.saturation, config.normalization)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    started = time.perf_counter()
+    async with rescore_lock:
+        keys, breakdowns = await asyncio.to_thread(store.breakdowns)
+        rows = await asyncio.to_thread(score_population, engine, breakdowns)
+        # The engine is only swapped here on the event loop, once fully fitted,
+        # so in-flight analyses never see a half-configured formula
+        github_service.use_scoring(engine, len(keys))
+        await asyncio.to_thread(store.rescore, keys, rows)
+    # Cached analyses carry scores from the old formula
+    if github_service.profiles:
+        github_service.profiles.clear()
+    return {
+        "rescored": len(keys),
+        "seconds": round(time.perf_counter() - started, 3),
+        "scoring": engine.config()
+    }
+
 @app.post("/api/analyze", response_model=ProfileAnalysis)
 async def analyze_profile(request: ProfileRequest):
     try:
         return await github_service.analyze_profile(request.username)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+
+class ProfileCache:
+    """
+    In-memory stale-while-revalidate cache of profile analyses keyed by login.
+
+    Entries younger than `ttl` seconds are served as is. Older entries, up
+    to `max_stale` seconds, are still served immediately while one
+    background task reloads them; anything older is loaded before
+    answering. Concurrent loads of the same login share one fetch. The
+    cache is kept under `max_bytes` (measured on the serialized analysis)
+    by evicting least-recently-used logins.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_stale: float = 24 * 3600,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.max_bytes = max_bytes
+        self.total_size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+        # login -> (value, size, stored_at)
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def get(self, login: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = login.lower()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, _, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self.refreshes += 1
+                    task = self._load(key, load)
+                    # Keep a reference until done and swallow its error (the stale value stays)
+                    self._background.add(task)
+                    task.add_done_callback(self._refresh_done)
+                return value
+
+        if key in self._inflight:
+            self.coalesced += 1
+            return await asyncio.shield(self._inflight[key])
+        self.misses += 1
+        return await asyncio.shield(self._load(key, load))
+
+    def _load(self, key: str, load: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        async def run() -> Any:
+            value = await load()
+            self._store(key, value)
+            return value
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.refresh_failures += 1
+
+    def _store(self, key: str, value: Any) -> None:
+        dump = getattr(value, "model_dump_json", None)
+        size = len(dump()) if dump else len(repr(value))
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.total_size -= previous[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size, time.monotonic())
+        self.total_size += size
+        while self.total_size > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.total_size -= evicted_size
+            self.evictions += 1
+
+    def invalidate(self, login: str) -> None:
+        entry = self._entries.pop(login.lower(), None)
+        if entry is not None:
+            self.total_size -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_size = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.total_size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+def profile_cache_from_env() -> Optional[ProfileCache]:
+    """Profile analysis cache from PROFILE_CACHE_* settings (None when disabled)"""
+    if os.getenv("PROFILE_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ProfileCache(
+        ttl=float(os.getenv("PROFILE_CACHE_TTL", 300)),
+        max_stale=float(os.getenv("PROFILE_CACHE_MAX_STALE", 24 * 3600)),
+        max_bytes=int(float(os.getenv("PROFILE_CACHE_MAX_MB", 64)) * 1024 * 1024),
+    )
@@ -0,0 +1,150 @@
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Score component -> the profile statistic it is computed from
+COMPONENTS = {
+    "activity": "repos",
+    "quality": "stars",
+    "impact": "followers",
+    "consistency": "languages",
+}
+DEFAULT_POINTS = {"activity": 25.0, "quality": 30.0, "impact": 25.0, "consistency": 20.0}
+# Statistic value at which a component reaches its full points
+DEFAULT_SATURATION = {"repos": 20.0, "stars": 100.0, "followers": 50.0, "languages": 8.0}
+NORMALIZATIONS = ("absolute", "percentile")
+
+
+class ProfileBatch:
+    """Per-user statistics as parallel NumPy arrays (one row per user)"""
+
+    def __init__(self, repos, stars, forks, followers, languages):
+        self.repos = np.asarray(repos, dtype=np.float64)
+        self.stars = np.asarray(stars, dtype=np.float64)
+        self.forks = np.asarray(forks, dtype=np.float64)
+        self.followers = np.asarray(followers, dtype=np.float64)
+        self.languages = np.asarray(languages, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.repos)
+
+    @classmethod
+    def from_repositories(cls, followers, owners, stars, forks, languages) -> "ProfileBatch":
+        """
+        Aggregate flat per-repository arrays in one pass: `owners[i]` is the
+        user row of repository i and `languages[i]` its language code
+        (negative for none). Distinct languages are counted per user.
+        """
+        followers = np.asarray(followers)
+        owners = np.asarray(owners, dtype=np.int64)
+        languages = np.asarray(languages, dtype=np.int64)
+        users = len(followers)
+
+        known = languages >= 0
+        width = int(languages.max(initial=0)) + 1
+        pairs = np.unique(owners[known] * width + languages[known])
+        return cls(
+            repos=np.bincount(owners, minlength=users),
+            stars=np.bincount(owners, weights=np.asarray(stars, dtype=np.float64), minlength=users),
+            forks=np.bincount(owners, weights=np.asarray(forks, dtype=np.float64), minlength=users),
+            followers=followers,
+            languages=np.bincount(pairs // width, minlength=users),
+        )
+
+    @classmethod
+    def from_breakdowns(cls, breakdowns: Iterable[Dict[str, int]]) -> "ProfileBatch":
+        """Batch from ProfileScore.breakdown dicts (as kept by the leaderboard)"""
+        rows = np.array(
+            [[b.get("repos", 0), b.get("stars", 0), b.get("forks", 0), b.get("followers", 0), b.get("languages", 0)]
+             for b in breakdowns],
+            dtype=np.float64
+        ).reshape(-1, 5)
+        return cls(*rows.T)
+
+
+def percentile_ranks(values: np.ndarray, reference: np.ndarray) -> np.ndarray:
+    """Mid-rank percentile (0..1) of each value within the sorted `reference`"""
+    if len(reference) == 0:
+        return np.zeros(len(values))
+    below = np.searchsorted(reference, values, side="left")
+    at_or_below = np.searchsorted(reference, values, side="right")
+    return (below + at_or_below) / (2.0 * len(reference))
+
+
+def population_reference(batch: ProfileBatch) -> Optional[Dict[str, np.ndarray]]:
+    """Sorted statistic arrays of a population to take percentiles against (None when it is empty)"""
+    if len(batch) == 0:
+        return None
+    return {stat: np.sort(getattr(batch, stat)) for stat in COMPONENTS.values()}
+
+
+class ScoringEngine:
+    """
+    Vectorized ProfileScore calculation.
+
+    `points` is the maximum of each component and `saturation` the
+    statistic value that earns it. With absolute normalization a component
+    is min(value / saturation, 1) * points; with percentile normalization it
+    is the user's percentile within the reference population set by `fit`
+    times points. Until it is fitted on a non-empty population a percentile
+    engine scores absolutely, since ranks within nothing are meaningless.
+    """
+
+    def __init__(self, points: Optional[Dict[str, float]] = None, saturation: Optional[Dict[str, float]] = None,
+                 normalization: str = "absolute"):
+        if normalization not in NORMALIZATIONS:
+            raise ValueError(f"normalization must be one of: {', '.join(NORMALIZATIONS)}")
+        unknown = set(points or {}) - set(DEFAULT_POINTS) | set(saturation or {}) - set(DEFAULT_SATURATION)
+        if unknown:
+            raise ValueError(f"Unknown scoring weights: {', '.join(sorted(unknown))}")
+        self.points = {**DEFAULT_POINTS, **(points or {})}
+        self.saturation = {**DEFAULT_SATURATION, **(saturation or {})}
+        self.normalization = normalization
+        # Sorted statistic -> values of the population that percentiles are taken against
+        self.reference: Optional[Dict[str, np.ndarray]] = None
+
+    def fit(self, batch: ProfileBatch) -> None:
+        """Use `batch` as the population for percentile normalization (an empty batch leaves it unfitted)"""
+        self.reference = population_reference(batch)
+
+    def score(self, batch: ProfileBatch) -> Dict[str, np.ndarray]:
+        """Component scores and total for every user in the batch"""
+        scores = {}
+        for component, stat in COMPONENTS.items():
+            values = getattr(batch, stat)
+            if self.normalization == "percentile" and self.reference is not None:
+                fraction = percentile_ranks(values, self.reference[stat])
+            else:
+                fraction = np.minimum(values / self.saturation[stat], 1.0)
+            scores[component] = fraction * self.points[component]
+        scores["total"] = sum(scores[component] for component in COMPONENTS)
+        return scores
+
+    def config(self) -> Dict:
+        return {"points": self.points, "saturation": self.saturation, "normalization": self.normalization}
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    """Parse "activity=25,quality=30" into {"activity": 25.0, "quality": 30.0}"""
+    weights = {}
+    for item in value.split(","):
+        name, _, number = item.partition("=")
+        if name.strip():
+            weights[name.strip()] = float(number)
+    return weights
+
+
+def scoring_engine_from_env() -> ScoringEngine:
+    """Scoring engine from SCORE_POINTS, SCORE_SATURATION and SCORE_NORMALIZATION"""
+    return ScoringEngine(
+        points=parse_weights(os.getenv("SCORE_POINTS", "")),
+        saturation=parse_weights(os.getenv("SCORE_SATURATION", "")),
+        normalization=os.getenv("SCORE_NORMALIZATION", "absolute").lower(),
+    )
+
+
+def score_rows(scores: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+    """Per-user {component: score} dicts from the column arrays"""
+    names = list(scores)
+    return [dict(zip(names, row)) for row in np.column_stack([scores[name] for name in names]).tolist()]
@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Importing main builds the app's services; keep their disk stores out of the working tree
+os.environ.setdefault("GITHUB_CACHE_ENABLED", "false")
+os.environ.setdefault("LEADERBOARD_ENABLED", "false")
@@ -0,0 +1,138 @@
+"""
+QueryBatcher and GraphQL profile loading against a mock GraphQL endpoint
+(an httpx.MockTransport answering aliased user queries, plus the REST
+repository listing used as a fallback).
+"""
+import asyncio
+import json
+
+import httpx
+from fastapi import HTTPException
+
+from github_graphql import QueryBatcher
+from main import GitHubService
+from rate_limiter import RateLimitScheduler
+
+
+def repository(name, stars):
+    return {"name": name, "description": None, "primaryLanguage": {"name": "Go"}, "stargazerCount": stars,
+            "forkCount": 0, "diskUsage": 10, "createdAt": "2021-01-01T00:00:00Z", "updatedAt": "2024-01-01T00:00:00Z"}
+
+
+def user_node(login, repositories, total=None):
+    return {
+        "login": login, "name": login.title(), "avatarUrl": f"https://example.com/{login}.png", "bio": None,
+        "company": None, "location": None, "email": "", "websiteUrl": "", "createdAt": "2020-01-01T00:00:00Z",
+        "followers": {"totalCount": 12}, "following": {"totalCount": 3},
+        "repositories": {"totalCount": len(repositories) if total is None else total, "nodes": repositories},
+    }
+
+
+# "grace" owns more public repositories than the GraphQL page returned
+USERS = {
+    "ada": user_node("ada", [repository("engine", 40), repository("notes", 2)]),
+    "grace": user_node("grace", [repository("cobol", 9)], total=2),
+}
+REST_REPOSITORIES = {
+    "grace": [
+        {"name": name, "description": None, "language": "COBOL", "stargazers_count": stars, "forks_count": 0,
+         "size": 1, "created_at": "2021-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z"}
+        for name, stars in (("cobol", 9), ("compiler", 30))
+    ]
+}
+
+
+class MockGitHub:
+    """Aliased uN user queries on /graphql (unknown logins resolve to null), REST repository pages elsewhere"""
+
+    def __init__(self):
+        self.queries = []
+        self.rest = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/graphql":
+            body = json.loads(request.content)
+            self.queries.append(body)
+            data, errors = {}, []
+            for name, login in body["variables"].items():
+                alias = "u" + name[1:]
+                assert f"{alias}: user(login: ${name})" in body["query"]
+                data[alias] = USERS.get(login)
+                if data[alias] is None:
+                    errors.append({"path": [alias], "message": f"Could not resolve to a User with the login of '{login}'."})
+            return httpx.Response(200, json={"data": data, **({"errors": errors} if errors else {})})
+        self.rest.append(request.url.path)
+        login = request.url.path.split("/")[2]
+        return httpx.Response(200, json=REST_REPOSITORIES[login])
+
+
+def make_service(handler):
+    service = GitHubService(scheduler=RateLimitScheduler([None]))
+    service.use_graphql = True
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def load_all(service, logins):
+    async def run():
+        try:
+            return await asyncio.gather(*(service.get_profile_and_repositories(login) for login in logins),
+                                        return_exceptions=True)
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+def test_concurrent_profiles_share_one_aliased_query():
+    github = MockGitHub()
+    service = make_service(github)
+    (ada, ada_repos), (again, _) = load_all(service, ["ada", "ada"])
+
+    assert len(github.queries) == 1
+    assert github.queries[0]["variables"] == {"l0": "ada"}
+    assert service.user_batcher.stats()["keys"] == 1
+    assert ada == again
+    assert ada.login == "ada" and ada.public_repos == 2 and ada.followers == 12
+    # GraphQL's empty strings become nulls, as REST returns them
+    assert ada.email is None and ada.blog is None
+    assert [(repo.name, repo.stargazers_count, repo.language) for repo in ada_repos] == \
+        [("engine", 40, "Go"), ("notes", 2, "Go")]
+    assert github.rest == []
+
+
+def test_unknown_login_fails_only_its_lookup():
+    github = MockGitHub()
+    (ada, _), missing = load_all(make_service(github), ["ada", "nobody"])
+
+    assert len(github.queries) == 1
+    assert ada.login == "ada"
+    assert isinstance(missing, HTTPException) and missing.status_code == 404
+
+
+def test_repositories_past_the_graphql_page_come_from_rest():
+    github = MockGitHub()
+    ((grace, repositories),) = load_all(make_service(github), ["grace"])
+
+    assert grace.public_repos == 2
+    assert github.rest == ["/users/grace/repos"]
+    assert [repo.name for repo in repositories] == ["cobol", "compiler"]
+
+
+def test_batches_are_split_at_max_batch():
+    github = MockGitHub()
+    service = make_service(github)
+    service.user_batcher.max_batch = 1
+    load_all(service, ["ada", "grace"])
+
+    assert [query["variables"] for query in github.queries] == [{"l0": "ada"}, {"l0": "grace"}]
+
+
+def test_batcher_hands_execute_failures_to_every_waiter():
+    async def execute(keys):
+        raise RuntimeError("upstream down")
+
+    async def run():
+        batcher = QueryBatcher(execute, window=0.01)
+        return await asyncio.gather(batcher.load("a"), batcher.load("b"), return_exceptions=True)
+
+    assert [str(error) for error in asyncio.run(run())] == ["upstream down"] * 2
@@ -0,0 +1,92 @@
+"""
+GitHubService against an httpx.MockTransport standing in for the GitHub API,
+so token rotation and the response cache run without network access.
+"""
+import asyncio
+import time
+
+import httpx
+
+from http_cache import HTTPCache
+from main import GitHubService
+from rate_limiter import RateLimitScheduler
+
+PROFILE = {"login": "ada", "name": "Ada", "avatar_url": "https://example.com/ada.png", "bio": None,
+           "company": None, "location": None, "email": None, "blog": None,
+           "public_repos": 0, "followers": 5, "following": 1, "created_at": "2020-01-01T00:00:00Z"}
+
+
+class MockGitHub:
+    """Answers /users/ada per token with an ETag, and logs the headers of every request"""
+
+    def __init__(self, remaining):
+        self.remaining = dict(remaining)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        # Retries resend the same Request object, so keep a copy of what was sent
+        self.requests.append(dict(request.headers))
+        token = request.headers.get("authorization", "").split()[-1]
+        etag = f'"{token}-v1"'
+        headers = {
+            "etag": etag,
+            "x-ratelimit-limit": "5000",
+            "x-ratelimit-remaining": str(self.remaining[token]),
+            "x-ratelimit-reset": str(int(time.time()) + 3600),
+            "x-ratelimit-resource": "core",
+        }
+        if self.remaining[token] == 0:
+            return httpx.Response(403, headers=headers, json={"message": "API rate limit exceeded"})
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers=headers)
+        return httpx.Response(200, headers=headers, json={**PROFILE, "bio": f"seen by {token}"})
+
+
+def make_service(tmp_path, handler, tokens, ttl=0.0):
+    service = GitHubService(
+        cache=HTTPCache(str(tmp_path / "http.sqlite"), ttl=ttl),
+        scheduler=RateLimitScheduler(tokens),
+    )
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_cache_entries_are_kept_per_token(tmp_path):
+    github = MockGitHub({"alpha": 10, "beta": 4000})
+    service = make_service(tmp_path, github, ["alpha", "beta"])
+
+    async def run():
+        first = await service.get_profile("ada")
+        # alpha reported 10 calls left, so beta is preferred from here on
+        second = await service.get_profile("ada")
+        third = await service.get_profile("ada")
+        await service.close()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first.bio == "seen by alpha"
+    # beta never receives alpha's body or revalidates alpha's ETag
+    assert second.bio == "seen by beta"
+    assert "if-none-match" not in github.requests[1]
+    assert third.bio == "seen by beta"
+    assert github.requests[2]["authorization"] == "token beta"
+    assert github.requests[2]["if-none-match"] == '"beta-v1"'
+    assert service.cache.stats()["revalidated"] == 1
+
+
+def test_throttled_token_moves_the_lookup_to_the_next_token(tmp_path):
+    github = MockGitHub({"alpha": 0, "beta": 4000})
+    service = make_service(tmp_path, github, ["alpha", "beta"], ttl=60)
+
+    async def run():
+        first = await service.get_profile("ada")
+        # alpha is now blocked until its reset, and beta's entry is fresh
+        second = await service.get_profile("ada")
+        await service.close()
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [headers["authorization"] for headers in github.requests] == ["token alpha", "token beta"]
+    assert first == second
+    assert first.bio == "seen by beta"
+    assert service.cache.stats()["hits"] == 1
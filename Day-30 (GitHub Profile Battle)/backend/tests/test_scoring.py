@@ -0,0 +1,31 @@
+import numpy as np
+
+from scoring import ProfileBatch, ScoringEngine, score_rows
+
+
+def test_percentile_engine_fitted_on_an_empty_population_scores_absolutely():
+    percentile = ScoringEngine(normalization="percentile")
+    percentile.fit(ProfileBatch.from_breakdowns([]))
+    batch = ProfileBatch([10, 40], [50, 500], [0, 0], [25, 5], [4, 8])
+
+    assert percentile.reference is None
+    expected = ScoringEngine().score(batch)
+    scores = percentile.score(batch)
+    for name in expected:
+        np.testing.assert_allclose(scores[name], expected[name])
+    # Different profiles must not tie at zero
+    assert scores["total"][0] > 0 and scores["total"][0] != scores["total"][1]
+
+
+def test_percentile_engine_ranks_against_the_fitted_population():
+    engine = ScoringEngine(normalization="percentile")
+    engine.fit(ProfileBatch.from_breakdowns(
+        [{"repos": n, "stars": n, "followers": n, "languages": n} for n in range(1, 5)]
+    ))
+    row = score_rows(engine.score(ProfileBatch([4], [0], [0], [3], [10])))[0]
+
+    # repos=4 is the top of four (mid-rank 7/8), stars=0 below all of them
+    assert row["activity"] == 25 * 7 / 8
+    assert row["quality"] == 0
+    assert row["impact"] == 25 * 5 / 8
+    assert row["consistency"] == 20